@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""Agent sensor: kirim alert Snort gateway ini ke dashboard pusat.
+
+Mengikuti file alert lokal (default alert_json.txt beserta salinan per
+queue <dir>/<queue>/alert_json.txt dari topologi multi-queue), mengelompokkan
+baris baru menjadi batch NDJSON ber-gzip dan mengirimnya ke endpoint
+/snort/api/ingest/ server pusat dengan token sensor (`manage.py sensor_token`).
+
+- Tiap batch ditulis dulu ke spool di disk (write-ahead), baru offset file
+  disimpan, lalu spool dikirim berurutan. Server mati atau sibuk (429/503)
+  tidak menghilangkan alert: batch menunggu di spool dan dikirim ulang dengan
+  backoff eksponensial (Retry-After dihormati).
+- Batch membawa id agent + nomor urut sehingga kiriman ulang setelah respons
+  hilang dibuang server, bukan disimpan dua kali.
+- Backpressure: bila spool melewati --spool-max-bytes, file log tidak dibaca
+  sampai spool terkuras; baris tetap aman di file log Snort.
+
+Hanya butuh pustaka standar Python 3:
+
+    SNORT_AGENT_TOKEN=... python3 snort_agent.py --url https://ids-pusat/snort/api/ingest/ \\
+        --path /var/log/snort/alert_json.txt
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import random
+import signal
+import ssl
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+DEFAULT_PATH = "/var/log/snort/alert_json.txt"
+DEFAULT_STATE = "/var/lib/snort-agent/state.json"
+DEFAULT_SPOOL = "/var/lib/snort-agent/spool"
+BATCH_SUFFIX = ".batch"
+# Status yang layak dicoba lagi; 4xx lain berarti batch ditolak permanen
+RETRY_STATUS = (401, 403, 408, 429, 500, 502, 503, 504)
+MAX_BACKOFF = 60.0
+
+log = logging.getLogger("snort-agent")
+
+
+class SendError(Exception):
+    def __init__(self, message, retry=True, retry_after=None):
+        super().__init__(message)
+        self.retry = retry
+        self.retry_after = retry_after
+
+
+def expand_paths(paths):
+    """File yang dikonfigurasi + salinan per queue NFQUEUE (<dir>/<angka>/<nama>)."""
+    expanded = []
+    for path in paths:
+        expanded.append(path)
+        directory, name = os.path.split(path)
+        try:
+            entries = sorted((entry for entry in os.listdir(directory) if entry.isdigit()), key=int)
+        except OSError:
+            continue
+        for entry in entries:
+            candidate = os.path.join(directory, entry, name)
+            if os.path.isfile(candidate):
+                expanded.append(candidate)
+    return expanded
+
+
+def write_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+
+
+class TailedFile:
+    """Posisi baca satu file log (inode + offset), tahan rotasi dan truncate."""
+
+    def __init__(self, path, state=None):
+        state = state or {}
+        self.path = path
+        self.device = state.get("device")
+        self.inode = state.get("inode")
+        self.offset = state.get("offset", 0)
+
+    def as_dict(self):
+        return {"device": self.device, "inode": self.inode, "offset": self.offset}
+
+    def read(self, max_bytes, max_lines):
+        """(bytes baris lengkap, offset akhir) sejak offset tersimpan; offset belum dimajukan.
+
+        Saat file dirotasi dengan rename (rotate_logs atau `limit` Snort) sisa
+        file lama '<nama>.<angka>' (inode yang sama) dihabiskan dulu, baru
+        pindah ke file baru setelah penulis mulai mengisinya.
+        """
+        try:
+            stats = os.stat(self.path)
+        except OSError:
+            return b"", self.offset
+        if (stats.st_dev, stats.st_ino) != (self.device, self.inode):
+            rolled = self._rolled() if self.inode is not None else None
+            if rolled is not None:
+                rolled_path, rolled_size = rolled
+                chunk, end = self._read_from(rolled_path, rolled_size, max_bytes, max_lines)
+                if chunk or end != self.offset:
+                    return chunk, end
+                if not stats.st_size:
+                    # Penulis belum pindah ke file baru: baris berikutnya masih masuk ke file lama
+                    return b"", self.offset
+                if rolled_size > self.offset:
+                    # Baris terakhir file lama tanpa newline tidak akan dilengkapi lagi
+                    with open(rolled_path, "rb") as handle:
+                        handle.seek(self.offset)
+                        rest = handle.read(rolled_size - self.offset)
+                    return rest + b"\n", rolled_size
+            # File baru (file lama sudah habis, disegel, atau tidak ditemukan): mulai dari awal
+            self.device, self.inode, self.offset = stats.st_dev, stats.st_ino, 0
+        elif stats.st_size < self.offset:
+            # Di-truncate
+            self.offset = 0
+        return self._read_from(self.path, stats.st_size, max_bytes, max_lines)
+
+    def _rolled(self):
+        """(path, ukuran) file rollover '<nama>.<angka>' yang masih ber-inode lama, atau None."""
+        directory, name = os.path.split(self.path)
+        try:
+            entries = os.listdir(directory or ".")
+        except OSError:
+            return None
+        for entry in entries:
+            suffix = entry[len(name) + 1:]
+            if not (entry.startswith(name + ".") and suffix.isdigit()):
+                continue
+            candidate = os.path.join(directory, entry)
+            try:
+                stats = os.stat(candidate)
+            except OSError:
+                continue
+            if (stats.st_dev, stats.st_ino) == (self.device, self.inode):
+                return candidate, stats.st_size
+        return None
+
+    def _read_from(self, path, size, max_bytes, max_lines):
+        if size <= self.offset:
+            return b"", self.offset
+        with open(path, "rb") as handle:
+            handle.seek(self.offset)
+            chunk = handle.read(min(max_bytes, size - self.offset))
+        cut = -1
+        lines = 0
+        while lines < max_lines:
+            position = chunk.find(b"\n", cut + 1)
+            if position < 0:
+                break
+            cut = position
+            lines += 1
+        if cut < 0:
+            if len(chunk) >= max_bytes:
+                # Satu baris lebih panjang dari batch: lewati agar tail tidak macet
+                log.warning("%s: baris > %d byte di offset %d dilewati", path, max_bytes, self.offset)
+                return b"", self.offset + len(chunk)
+            return b"", self.offset
+        return chunk[:cut + 1], self.offset + cut + 1
+
+
+class Spool:
+    """Batch yang belum diterima server, satu file per batch (<seq>.batch) urut nomor."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, seq):
+        return os.path.join(self.directory, f"{seq:012d}{BATCH_SUFFIX}")
+
+    def put(self, seq, source, payload):
+        header = json.dumps({"seq": seq, "source": source}).encode() + b"\n"
+        write_atomic(self._path(seq), header + payload)
+
+    def pending(self):
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(BATCH_SUFFIX))
+        except OSError:
+            return []
+        return [os.path.join(self.directory, name) for name in names]
+
+    def size(self):
+        total = 0
+        for path in self.pending():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as handle:
+            data = handle.read()
+        header, _, payload = data.partition(b"\n")
+        meta = json.loads(header)
+        return meta["seq"], meta["source"], payload
+
+    def reject(self, path):
+        """Batch yang ditolak permanen dipindah ke rejected/ untuk diperiksa manual."""
+        target = os.path.join(self.directory, "rejected")
+        os.makedirs(target, exist_ok=True)
+        os.replace(path, os.path.join(target, os.path.basename(path)))
+
+
+class Agent:
+    def __init__(self, options):
+        self.options = options
+        self.state_path = options.state
+        self.spool = Spool(options.spool)
+        self.files = {}
+        self.agent_id = uuid.uuid4().hex
+        self.seq = 0
+        self.backoff = 0.0
+        self.retry_at = 0.0
+        self.running = True
+        self.ssl_context = None
+        if options.url.startswith("https"):
+            self.ssl_context = ssl.create_default_context(cafile=options.ca_file)
+            if options.insecure:
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as handle:
+                state = json.load(handle)
+        except (OSError, ValueError):
+            return
+        self.agent_id = state.get("agent_id", self.agent_id)
+        self.seq = state.get("seq", 0)
+        for path, file_state in state.get("files", {}).items():
+            self.files[path] = TailedFile(path, file_state)
+
+    def _state(self):
+        return {
+            "agent_id": self.agent_id, "seq": self.seq,
+            "files": {path: tailed.as_dict() for path, tailed in self.files.items()},
+        }
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        write_atomic(self.state_path, json.dumps(self._state()).encode())
+
+    # -- Kirim -----------------------------------------------------------------
+
+    def _post(self, seq, source, payload):
+        request = urllib.request.Request(self.options.url, data=payload, method="POST", headers={
+            "Authorization": f"Bearer {self.options.token}",
+            "Content-Type": "application/x-ndjson",
+            "Content-Encoding": "gzip",
+            "X-Agent-Id": self.agent_id,
+            "X-Batch-Seq": str(seq),
+            "X-Source-File": source,
+            "User-Agent": "snort-agent/1",
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=self.options.timeout, context=self.ssl_context) as response:
+                return json.loads(response.read() or b"{}")
+        except urllib.error.HTTPError as exc:
+            retry_after = exc.headers.get("Retry-After", "")
+            detail = exc.read(512).decode("utf-8", "replace")
+            raise SendError(
+                f"HTTP {exc.code}: {detail}", retry=exc.code in RETRY_STATUS,
+                retry_after=float(retry_after) if retry_after.isdigit() else None,
+            )
+        except (urllib.error.URLError, OSError) as exc:
+            raise SendError(str(getattr(exc, "reason", exc)))
+
+    def drain(self):
+        """Kirim spool berurutan; False bila server belum bisa menerima (backoff aktif)."""
+        if time.monotonic() < self.retry_at:
+            return False
+        for path in self.spool.pending():
+            try:
+                seq, source, payload = self.spool.load(path)
+            except (OSError, ValueError, KeyError) as exc:
+                log.error("Spool %s rusak (%s), dipindah ke rejected/", path, exc)
+                self.spool.reject(path)
+                continue
+            try:
+                result = self._post(seq, source, payload)
+            except SendError as exc:
+                if not exc.retry:
+                    log.error("Batch %d ditolak server (%s), dipindah ke rejected/", seq, exc)
+                    self.spool.reject(path)
+                    continue
+                self.backoff = min(max(self.backoff * 2, 1.0), MAX_BACKOFF)
+                delay = exc.retry_after if exc.retry_after is not None else self.backoff * random.uniform(0.5, 1.0)
+                self.retry_at = time.monotonic() + delay
+                log.warning("Gagal mengirim batch %d: %s; coba lagi dalam %.1f detik", seq, exc, delay)
+                return False
+            self.backoff = 0.0
+            os.remove(path)
+            if result.get("duplicate"):
+                log.info("Batch %d sudah diterima sebelumnya", seq)
+        return True
+
+    # -- Baca ------------------------------------------------------------------
+
+    def collect(self):
+        """Pindahkan baris baru ke spool; berhenti bila spool penuh (backpressure)."""
+        options = self.options
+        spool_size = self.spool.size()
+        batches = 0
+        before = self._state()
+        for path in expand_paths(options.paths):
+            tailed = self.files.get(path)
+            if tailed is None:
+                tailed = self.files[path] = TailedFile(path)
+                if not options.from_start:
+                    # Sensor baru: mulai dari akhir file, bukan mengirim ulang riwayat lama
+                    try:
+                        stats = os.stat(path)
+                        tailed.device, tailed.inode, tailed.offset = stats.st_dev, stats.st_ino, stats.st_size
+                    except OSError:
+                        pass
+            while spool_size < options.spool_max_bytes:
+                chunk, end = tailed.read(options.batch_bytes, options.batch_lines)
+                if not chunk:
+                    tailed.offset = end
+                    break
+                self.seq += 1
+                payload = gzip.compress(chunk, compresslevel=6)
+                self.spool.put(self.seq, path, payload)
+                tailed.offset = end
+                # Offset baru disimpan setelah batch aman di spool
+                self._save_state()
+                spool_size += len(payload)
+                batches += 1
+            else:
+                log.warning("Spool penuh (%d byte), pembacaan log ditunda", spool_size)
+                break
+        if self._state() != before:
+            # File baru / rotasi tanpa batch: posisi tetap dicatat
+            self._save_state()
+        return batches
+
+    def run(self):
+        log.info("Agent %s mengirim ke %s", self.agent_id, self.options.url)
+        while self.running:
+            self.drain()
+            batches = self.collect()
+            if batches:
+                self.drain()
+            if self.options.once:
+                return 0 if not self.spool.pending() else 1
+            time.sleep(self.options.interval)
+        return 0
+
+    def stop(self, *_args):
+        self.running = False
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kirim alert Snort lokal ke dashboard pusat.")
+    parser.add_argument("--url", default=os.environ.get("SNORT_AGENT_URL"),
+                        help="Endpoint ingest, mis. https://ids-pusat/snort/api/ingest/")
+    parser.add_argument("--token", default=os.environ.get("SNORT_AGENT_TOKEN"),
+                        help="Token sensor dari `manage.py sensor_token <nama>` (env SNORT_AGENT_TOKEN).")
+    parser.add_argument("--path", action="append", dest="paths",
+                        help=f"File alert yang diikuti (boleh diulang). Default: {DEFAULT_PATH}")
+    parser.add_argument("--state", default=os.environ.get("SNORT_AGENT_STATE", DEFAULT_STATE))
+    parser.add_argument("--spool", default=os.environ.get("SNORT_AGENT_SPOOL", DEFAULT_SPOOL))
+    parser.add_argument("--spool-max-bytes", type=int, default=256 * 1024 * 1024)
+    parser.add_argument("--batch-bytes", type=int, default=512 * 1024, help="Maks byte mentah per batch.")
+    parser.add_argument("--batch-lines", type=int, default=5000, help="Maks baris per batch.")
+    parser.add_argument("--interval", type=float, default=2.0, help="Jeda polling file dalam detik.")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--ca-file", default=None, help="CA untuk server HTTPS dengan sertifikat sendiri.")
+    parser.add_argument("--insecure", action="store_true", help="Jangan verifikasi sertifikat TLS.")
+    parser.add_argument("--from-start", action="store_true",
+                        help="File yang belum pernah diikuti dibaca dari awal (default: dari akhir).")
+    parser.add_argument("--once", action="store_true", help="Satu putaran lalu keluar (cron / uji).")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    options = parser.parse_args(argv)
+    if not options.url or not options.token:
+        parser.error("--url dan --token (atau SNORT_AGENT_URL / SNORT_AGENT_TOKEN) wajib diisi.")
+    options.paths = options.paths or [DEFAULT_PATH]
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if options.verbose else logging.INFO,
+                        format="%(levelname)s %(message)s")
+    agent = Agent(options)
+    signal.signal(signal.SIGTERM, agent.stop)
+    signal.signal(signal.SIGINT, agent.stop)
+    return agent.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Micro-benchmark parser alert_fast.
+
+Membandingkan parser lama dari dashboard_data_api (re.match dengan pattern
+string di dalam loop per baris, hanya mengambil timestamp + action) dengan
+snort.alerts.decode_fast / decode_lines yang memakai satu regex terkompilasi
+dan mengekstrak seluruh field. Untuk alert_fast, decode_lines tidak punya
+jalur batch khusus (baris langsung ke regex decode_fast), jadi kedua kasus
+bytes seharusnya setara; batch array hanya mempercepat alert_json.
+
+    python benchmarks/bench_fast_parser.py --lines 200000
+"""
+import argparse
+import datetime
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from snort.alerts import Clock, decode_fast, decode_lines  # noqa: E402
+
+
+def make_lines(count, seed=1):
+    rng = random.Random(seed)
+    start = datetime.datetime.now() - datetime.timedelta(days=6)
+    lines = []
+    for i in range(count):
+        ts = start + datetime.timedelta(seconds=i * 518400 / count)
+        action = rng.choice(["[drop] ", "", "[wdrop] "])
+        sid = rng.randint(1000000, 1001000)
+        proto = rng.choice(["TCP", "UDP", "ICMP"])
+        src = f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+        dst = f"192.168.5.{rng.randint(1, 254)}"
+        if proto == "ICMP":
+            endpoints = f"{src} -> {dst}"
+        else:
+            endpoints = f"{src}:{rng.randint(1024, 65535)} -> {dst}:{rng.choice([22, 80, 443])}"
+        lines.append(
+            f"{ts:%m/%d-%H:%M:%S}.{ts.microsecond:06d} {action}[**] [1:{sid}:1] "
+            f"\"ET SCAN rule {sid}\" [**] [Classification: Attempted Recon] [Priority: 2] "
+            f"{{{proto}}} {endpoints}"
+        )
+    return lines
+
+
+def legacy_parse(lines):
+    """Salinan loop FAST lama di dashboard_data_api."""
+    now = datetime.datetime.now()
+    regex_fast = re.compile(r".*\[(ALERT|DROP)\]", re.IGNORECASE)
+    results = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        fast_match = re.match(r"(\d+/\d+)-(\d+):(\d+):(\d+)", line)
+        action_tag = regex_fast.search(line)
+        if fast_match:
+            month, day = map(int, fast_match.group(1).split("/"))
+            hr, mn, sc = map(int, fast_match.groups()[1:4])
+            act = action_tag.group(1).lower() if action_tag else None
+            try:
+                dt = datetime.datetime(now.year, month, day, hr, mn, sc)
+            except ValueError:
+                dt = None
+            results.append((dt, act))
+    return results
+
+
+def per_line(lines):
+    clock = Clock()
+    return [decode_fast(line, clock) for line in lines]
+
+
+def timed(func, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(lines)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    encoded = [line.encode() for line in lines]
+    cases = [
+        ("legacy (re.match per baris)", legacy_parse, lines),
+        ("decode_fast per baris", per_line, lines),
+        ("decode_fast per baris (bytes)", per_line, encoded),
+        ("decode_lines (bytes)", decode_lines, encoded),
+    ]
+
+    baseline = None
+    for label, func, data in cases:
+        elapsed = timed(func, data, args.repeat)
+        rate = len(data) / elapsed
+        baseline = baseline or rate
+        print(f"{label:32s} {elapsed * 1000:9.1f} ms  {rate:12,.0f} baris/s  x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Suite benchmark jalur panas dashboard & halaman snort di atas korpus sintetis.
+
+Untuk tiap ukuran korpus, setiap kasus dijalankan di proses Python baru
+sehingga peak RSS per kasus terukur terpisah. Hasil (latensi, peak RSS,
+throughput) ditulis ke file JSON dan bisa dibandingkan dengan hasil commit
+lain lewat --compare.
+
+    python benchmarks/bench_suite.py --sizes 10k,1m --output bench-results.json
+    python benchmarks/bench_suite.py --sizes 10k --compare bench-baseline.json
+    python benchmarks/bench_suite.py --sizes 10m --cases dashboard_cold,logs_filter_ip
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from benchmarks.corpus import add_corpus_arguments, corpus_from_args, ensure, parse_size  # noqa: E402
+
+DEFAULT_SIZES = "10k,1m"
+DEFAULT_WORKDIR = "/tmp/snort-bench"
+# Kasus yang membaca seluruh log: throughput = baris korpus / latensi
+FULL_SCAN_CASES = {"dashboard_cold", "logs_filter_ip", "logs_filter_cidr_signature", "logs_search_deep"}
+
+
+def _rss_mb():
+    # ru_maxrss dalam KB di Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+# ---------------------------------------------------------------------------
+# Sisi proses anak: satu kasus, satu korpus
+# ---------------------------------------------------------------------------
+
+def _setup_django(corpus_dir):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+    from django.conf import settings
+
+    django.setup()
+    overrides = {
+        "SNORT_LOG_JSON_PATH": os.path.join(corpus_dir, "alert_json.txt"),
+        "SNORT_LOG_FAST_PATH": os.path.join(corpus_dir, "alert_fast.txt"),
+        "SNORT_LOG_PATH": os.path.join(corpus_dir, "alert_json.txt"),
+        "SNORT_DASHBOARD_LOG_PATH": os.path.join(corpus_dir, "alert_fast.txt"),
+        "SNORT_RULES_DIR": os.path.join(corpus_dir, "rules"),
+        "SNORT_IP_WHITELIST_PATH": os.path.join(corpus_dir, "whitelist.txt"),
+        "SNORT_IP_BLOCKLIST_PATH": os.path.join(corpus_dir, "blocklist.txt"),
+        "SNORT_ARCHIVE_DIR": os.path.join(corpus_dir, "archive"),
+        "SNORT_ALERT_STORE": False,
+        "ALLOWED_HOSTS": ["*"],
+    }
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def _request(path):
+    from django.contrib.auth.models import User
+    from django.test import RequestFactory
+
+    request = RequestFactory().get(path)
+    # User superuser tanpa baris database: login_required & is_admin_staff lolos tanpa query
+    request.user = User(username="bench", is_superuser=True, is_staff=True)
+    return request
+
+
+def _view_case(view_path, query=""):
+    def run():
+        from django.urls import resolve
+
+        match = resolve(view_path)
+        response = match.func(_request(view_path + query), *match.args, **match.kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f"{view_path}{query} -> HTTP {response.status_code}")
+        if getattr(response, "streaming", False):
+            for _ in response.streaming_content:
+                pass
+    return run
+
+
+def _reset_dashboard():
+    from django.core.cache import cache
+    from snort.aggregator import aggregator
+
+    cache.clear()
+    aggregator.forget()
+
+
+def _clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+def _reset_rule_index():
+    from snort import rule_index
+
+    rule_index.rule_index = rule_index.RuleIndex()
+    import snort.views
+    snort.views.rule_index = rule_index.rule_index
+
+
+def _sample_values(corpus_dir):
+    """IP yang sering muncul dan jendela waktu di tengah log untuk filter."""
+    with open(os.path.join(corpus_dir, "alert_json.txt"), "rb") as handle:
+        first = json.loads(handle.readline())
+    middle = datetime.datetime.now() - datetime.timedelta(days=3)
+    return {
+        "ip": first["src_addr"],
+        "time_from": middle.strftime("%Y-%m-%dT%H:%M"),
+        "time_to": (middle + datetime.timedelta(hours=6)).strftime("%Y-%m-%dT%H:%M"),
+    }
+
+
+def build_cases(corpus_dir):
+    """{nama: (setup sebelum tiap ulangan, fungsi yang diukur)}"""
+    sample = _sample_values(corpus_dir)
+    rules_dir = os.path.join(corpus_dir, "rules")
+
+    def list_rules():
+        from snort.views import _list_rule_files
+        _list_rule_files()
+
+    def read_rules():
+        from snort.views import _read_rule_file
+        path = os.path.join(rules_dir, sorted(os.listdir(rules_dir))[0])
+        _read_rule_file(path, search_term="SQL injection")
+
+    return {
+        "dashboard_cold": (_reset_dashboard, _view_case("/api/dashboard-data/")),
+        "dashboard_warm": (_clear_cache, _view_case("/api/dashboard-data/")),
+        "top_talkers_week": (_clear_cache, _view_case("/api/top-talkers/", "?window=week")),
+        "logs_page1": (None, _view_case("/snort/logs/")),
+        "logs_page20": (None, _view_case("/snort/logs/", "?page=20")),
+        "logs_filter_action": (None, _view_case("/snort/logs/", "?action=drop")),
+        "logs_filter_ip": (None, _view_case("/snort/logs/", f"?src_ip={sample['ip']}&page=3")),
+        "logs_filter_cidr_signature": (None, _view_case("/snort/logs/", "?src_ip=10.0.0.0/20&signature=/xss|traversal/&page=5")),
+        "logs_filter_time": (None, _view_case(
+            "/snort/logs/", f"?time_from={sample['time_from']}&time_to={sample['time_to']}"
+        )),
+        "logs_search_deep": (None, _view_case("/snort/logs/", "?search=log4j&page=50")),
+        "export_ndjson_drop": (None, _view_case("/snort/logs/export/", "?format=ndjson&action=drop&limit=50000")),
+        "rules_list_cold": (_reset_rule_index, list_rules),
+        "rules_list_warm": (None, list_rules),
+        "rules_read_search": (None, read_rules),
+    }
+
+
+def run_case(name, corpus_dir, repeat):
+    _setup_django(corpus_dir)
+    baseline_rss = _rss_mb()
+    setup, func = build_cases(corpus_dir)[name]
+    # Satu putaran pemanasan: impor modul, kompilasi template, isi cache/indeks.
+    # Kasus *_cold mengosongkan state lagi lewat setup sebelum tiap ulangan.
+    func()
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {"latencies": timings, "baseline_rss_mb": baseline_rss, "peak_rss_mb": _rss_mb()}
+
+
+# ---------------------------------------------------------------------------
+# Sisi proses induk
+# ---------------------------------------------------------------------------
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def _spawn_case(name, corpus_dir, repeat):
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-case", name, "--corpus", corpus_dir,
+         "--repeat", str(repeat)],
+        capture_output=True, text=True, cwd=BASE_DIR,
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "gagal"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _summarize(name, size, corpus_dir, raw):
+    if "error" in raw:
+        return {"case": name, "lines": size, "error": raw["error"]}
+    latencies = raw["latencies"]
+    median = statistics.median(latencies)
+    log_bytes = os.path.getsize(os.path.join(corpus_dir, "alert_json.txt"))
+    return {
+        "case": name,
+        "lines": size,
+        "log_bytes": log_bytes,
+        "repeat": len(latencies),
+        "latency_ms": {
+            "min": min(latencies) * 1000, "median": median * 1000, "max": max(latencies) * 1000,
+        },
+        "throughput_lines_per_s": size / median if name in FULL_SCAN_CASES and median else None,
+        "baseline_rss_mb": raw["baseline_rss_mb"],
+        "peak_rss_mb": raw["peak_rss_mb"],
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Cetak rasio latensi median terhadap baseline; kembalikan jumlah regresi."""
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    previous = {(item["case"], item["lines"]): item for item in baseline.get("results", []) if "error" not in item}
+    regressions = 0
+    print(f"\nDibandingkan dengan {baseline_path} ({baseline.get('revision') or '?'}):")
+    for item in results:
+        old = previous.get((item["case"], item["lines"]))
+        if old is None or "error" in item:
+            continue
+        ratio = item["latency_ms"]["median"] / max(old["latency_ms"]["median"], 1e-6)
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESI"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  lebih cepat"
+        print(f"  {item['case']:28s} {item['lines']:>10,}  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Ukuran korpus (baris), mis. 10k,1m,10m.")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR, help="Lokasi korpus (dipakai ulang bila parameter sama).")
+    parser.add_argument("--cases", default="", help="Nama kasus dipisah koma (default: semua).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", default=None, help="File hasil sebelumnya untuk dibandingkan.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Ambang regresi (0.10 = 10%%).")
+    parser.add_argument("--run-case", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", default=None, help=argparse.SUPPRESS)
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.corpus, args.repeat)))
+        return 0
+
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    results = []
+    for size in sizes:
+        corpus_dir = os.path.join(args.workdir, str(size))
+        started = time.perf_counter()
+        ensure(corpus_dir, corpus_from_args(args, size))
+        print(f"Korpus {size:,} baris siap di {corpus_dir} ({time.perf_counter() - started:.1f} s)")
+        names = [name.strip() for name in args.cases.split(",") if name.strip()] or list(build_cases(corpus_dir))
+        for name in names:
+            item = _summarize(name, size, corpus_dir, _spawn_case(name, corpus_dir, args.repeat))
+            results.append(item)
+            if "error" in item:
+                print(f"  {name:28s} GAGAL: {item['error']}")
+                continue
+            throughput = item["throughput_lines_per_s"]
+            print(
+                f"  {name:28s} median {item['latency_ms']['median']:10.1f} ms"
+                f"  peak RSS {item['peak_rss_mb']:7.1f} MB"
+                + (f"  {throughput:12,.0f} baris/s" if throughput else "")
+            )
+
+    report = {
+        "revision": _git_revision(),
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "corpus": {key: value for key, value in vars(args).items()
+                   if key in ("drop_ratio", "src_ips", "dst_ips", "rules", "rule_lines", "skew", "days", "seed")},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nHasil ditulis ke {args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Generator korpus sintetis untuk benchmark: log alert Snort 3 dan pohon rules.
+
+Menulis alert_json.txt dan alert_fast.txt berisi event yang sama (seperti
+Snort dengan dua logger aktif), whitelist/blocklist kecil, dan direktori
+rules/ yang SID-nya dipakai oleh alert.
+
+    python benchmarks/corpus.py /tmp/snort-bench/10k --lines 10000 --drop-ratio 0.3 --src-ips 5000 --skew 2
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+from zoneinfo import ZoneInfo
+
+CLASSTYPES = [
+    ("attempted-recon", 2), ("attempted-admin", 1), ("web-application-attack", 1),
+    ("trojan-activity", 1), ("misc-activity", 3), ("policy-violation", 2),
+]
+WORDS = ["ET SCAN", "ET WEB_SERVER", "ET EXPLOIT", "ET POLICY", "ET TROJAN", "GPL ICMP", "ET DOS"]
+TARGETS = ["Nmap probe", "SQL injection attempt", "Possible XSS", "SSH brute force", "Ping sweep",
+           "Suspicious User-Agent", "Directory traversal", "Log4j lookup", "DNS tunnel", "SMB login"]
+PROTOCOLS = [("TCP", 0.7), ("UDP", 0.2), ("ICMP", 0.1)]
+DST_PORTS = [80, 443, 22, 53, 445, 3389, 8080, 25]
+RULES_PER_FILE = 5000
+SID_BASE = 2000000
+META_FILE = "corpus.json"
+
+
+def _zipf_weights(count, exponent=1.1):
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+class Corpus:
+    def __init__(self, lines, rule_lines=None, drop_ratio=0.3, src_ips=5000, dst_ips=50, rules=2000,
+                 skew=0.0, days=7, seed=1, timezone="Asia/Jakarta"):
+        self.lines = lines
+        self.rule_lines = rule_lines if rule_lines is not None else lines
+        self.drop_ratio = drop_ratio
+        self.src_ips = src_ips
+        self.dst_ips = dst_ips
+        self.rules = rules
+        self.skew = skew
+        self.days = days
+        self.seed = seed
+        self.timezone = timezone
+
+    def params(self):
+        return dict(vars(self))
+
+    def _rule_msg(self, sid):
+        return f"{WORDS[sid % len(WORDS)]} {TARGETS[(sid // 7) % len(TARGETS)]} {sid}"
+
+    def write_rules(self, directory):
+        """Pohon rules dengan `rule_lines` baris; ~10% rule dinonaktifkan dan ada komentar header."""
+        os.makedirs(directory, exist_ok=True)
+        rng = random.Random(self.seed)
+        written = 0
+        file_index = 0
+        while written < self.rule_lines:
+            path = os.path.join(directory, f"bench-{file_index:03d}.rules")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(f"# Rules sintetis benchmark #{file_index}\n")
+                written += 1
+                for _ in range(min(RULES_PER_FILE, self.rule_lines - written)):
+                    # SID berulang setelah `rules` agar alert selalu bisa di-resolve
+                    sid = SID_BASE + written % max(self.rules, 1)
+                    classtype, _priority = CLASSTYPES[sid % len(CLASSTYPES)]
+                    port = DST_PORTS[sid % len(DST_PORTS)]
+                    prefix = "# " if rng.random() < 0.1 else ""
+                    handle.write(
+                        f'{prefix}alert tcp $EXTERNAL_NET any -> $HOME_NET {port} '
+                        f'(msg:"{self._rule_msg(sid)}"; flow:to_server,established; '
+                        f'content:"bench{sid}"; classtype:{classtype}; sid:{sid}; rev:{1 + sid % 3};)\n'
+                    )
+                    written += 1
+            file_index += 1
+
+    def iter_events(self):
+        rng = random.Random(self.seed)
+        # Waktu dinding zona waktu dashboard (TIME_ZONE), bukan zona sistem
+        end = datetime.datetime.now(ZoneInfo(self.timezone)).replace(microsecond=0, tzinfo=None)
+        start = end - datetime.timedelta(days=self.days)
+        span = (end - start).total_seconds()
+        src_pool = [f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}" for i in range(1, self.src_ips + 1)]
+        dst_pool = [f"192.168.{(i >> 8) & 255}.{i & 255}" for i in range(1, self.dst_ips + 1)]
+        # Sebaran Zipf: sebagian kecil IP/SID menghasilkan sebagian besar alert
+        src_weights = _zipf_weights(len(src_pool))
+        protocols = [name for name, _ in PROTOCOLS]
+        protocol_weights = [weight for _, weight in PROTOCOLS]
+        sid_weights = _zipf_weights(max(self.rules, 1))
+        batch = 10000
+        for offset in range(0, self.lines, batch):
+            count = min(batch, self.lines - offset)
+            sources = rng.choices(src_pool, weights=src_weights, k=count)
+            sids = rng.choices(range(max(self.rules, 1)), weights=sid_weights, k=count)
+            for i in range(count):
+                position = offset + i
+                seconds = span * position / max(self.lines - 1, 1)
+                if self.skew:
+                    seconds += rng.uniform(-self.skew, self.skew)
+                protocol = rng.choices(protocols, weights=protocol_weights)[0]
+                yield {
+                    "ts": start + datetime.timedelta(seconds=seconds),
+                    "drop": rng.random() < self.drop_ratio,
+                    "sid": SID_BASE + sids[i],
+                    "src": sources[i],
+                    "dst": rng.choice(dst_pool),
+                    "protocol": protocol,
+                    "src_port": rng.randint(1024, 65535) if protocol != "ICMP" else None,
+                    "dst_port": DST_PORTS[sids[i] % len(DST_PORTS)] if protocol != "ICMP" else None,
+                    "pkt_num": position + 1,
+                }
+
+    def _json_line(self, event):
+        ts = event["ts"]
+        classtype, priority = CLASSTYPES[event["sid"] % len(CLASSTYPES)]
+        record = {
+            "timestamp": f"{ts:%y/%m/%d-%H:%M:%S}.{ts.microsecond:06d}",
+            "pkt_num": event["pkt_num"], "proto": event["protocol"], "pkt_gen": "raw",
+            "pkt_len": 60, "dir": "C2S",
+            "src_addr": event["src"], "dst_addr": event["dst"],
+            "gid": 1, "sid": event["sid"], "rev": 1 + event["sid"] % 3,
+            "action": "would_drop" if event["drop"] else "allow",
+            "msg": self._rule_msg(event["sid"]), "class": classtype, "priority": priority,
+        }
+        if event["src_port"] is not None:
+            record["src_port"] = event["src_port"]
+            record["dst_port"] = event["dst_port"]
+        return json.dumps(record, separators=(", ", " : ")) + "\n"
+
+    def _fast_line(self, event):
+        ts = event["ts"]
+        classtype, priority = CLASSTYPES[event["sid"] % len(CLASSTYPES)]
+        if event["src_port"] is None:
+            endpoints = f"{event['src']} -> {event['dst']}"
+        else:
+            endpoints = f"{event['src']}:{event['src_port']} -> {event['dst']}:{event['dst_port']}"
+        action = "[would_drop] " if event["drop"] else ""
+        return (
+            f"{ts:%m/%d-%H:%M:%S}.{ts.microsecond:06d} {action}[**] "
+            f"[1:{event['sid']}:{1 + event['sid'] % 3}] \"{self._rule_msg(event['sid'])}\" [**] "
+            f"[Classification: {classtype}] [Priority: {priority}] {{{event['protocol']}}} {endpoints}\n"
+        )
+
+    def write_logs(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, "alert_json.txt")
+        fast_path = os.path.join(directory, "alert_fast.txt")
+        with open(json_path, "w", encoding="utf-8") as json_out, open(fast_path, "w", encoding="utf-8") as fast_out:
+            json_buffer, fast_buffer = [], []
+            for event in self.iter_events():
+                json_buffer.append(self._json_line(event))
+                fast_buffer.append(self._fast_line(event))
+                if len(json_buffer) >= 10000:
+                    json_out.writelines(json_buffer)
+                    fast_out.writelines(fast_buffer)
+                    json_buffer, fast_buffer = [], []
+            json_out.writelines(json_buffer)
+            fast_out.writelines(fast_buffer)
+        with open(os.path.join(directory, "whitelist.txt"), "w", encoding="utf-8") as handle:
+            handle.write("# whitelist benchmark\n10.0.0.1\n192.168.0.0/16  # jaringan internal\n")
+        with open(os.path.join(directory, "blocklist.txt"), "w", encoding="utf-8") as handle:
+            handle.writelines(f"10.0.{i}.0/24  # blok {i}\n" for i in range(1, 200))
+
+    def write(self, directory):
+        self.write_logs(directory)
+        self.write_rules(os.path.join(directory, "rules"))
+        with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as handle:
+            json.dump(self.params(), handle, indent=2)
+        return directory
+
+
+def ensure(directory, corpus):
+    """Tulis korpus bila belum ada atau parameternya berbeda; kembalikan direktorinya."""
+    try:
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as handle:
+            if json.load(handle) == corpus.params():
+                return directory
+    except (OSError, ValueError):
+        pass
+    return corpus.write(directory)
+
+
+def parse_size(text):
+    """'10k', '1m', '10M', '250000' -> jumlah baris."""
+    text = str(text).strip().lower()
+    factor = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def add_corpus_arguments(parser):
+    parser.add_argument("--drop-ratio", type=float, default=0.3, help="Porsi alert dengan action drop.")
+    parser.add_argument("--src-ips", type=int, default=5000, help="Jumlah IP sumber unik (sebaran Zipf).")
+    parser.add_argument("--dst-ips", type=int, default=50)
+    parser.add_argument("--rules", type=int, default=2000, help="Jumlah SID unik.")
+    parser.add_argument("--rule-lines", type=parse_size, default=None,
+                        help="Total baris rules (default: sama dengan jumlah baris log).")
+    parser.add_argument("--skew", type=float, default=0.0,
+                        help="Jitter timestamp +/- detik (baris tidak berurutan seperti multi-thread).")
+    parser.add_argument("--days", type=int, default=7, help="Rentang waktu log sampai sekarang.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timezone", default="Asia/Jakarta", help="Sama dengan TIME_ZONE di settings.")
+
+
+def corpus_from_args(args, lines):
+    return Corpus(
+        lines, rule_lines=args.rule_lines, drop_ratio=args.drop_ratio, src_ips=args.src_ips,
+        dst_ips=args.dst_ips, rules=args.rules, skew=args.skew, days=args.days, seed=args.seed,
+        timezone=args.timezone,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--lines", type=parse_size, default=10000)
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    corpus_from_args(args, args.lines).write(args.directory)
+    print(f"Korpus {args.lines:,} baris ditulis ke {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -85,10 +85,20 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Menggunakan Whitenoise untuk kompresi file statis
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
-# 8. Default Primary Key Field
+# 8. Cache
+# Default LocMem (per proses). Untuk beberapa worker Gunicorn gunakan backend
+# bersama, mis. DJANGO_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'idps-dashboard'),
+    }
+}
+
+# 9. Default Primary Key Field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# 9. Snort Integration Paths (Custom)
+# 10. Snort Integration Paths (Custom)
 SNORT_RULES_DIR = os.getenv('SNORT_RULES_DIR', '/usr/local/etc/snort/rules')
 SNORT_IP_WHITELIST_PATH = os.getenv('SNORT_IP_WHITELIST_PATH', '/usr/local/etc/snort/whitelist.txt')
 SNORT_IP_BLOCKLIST_PATH = os.getenv('SNORT_IP_BLOCKLIST_PATH', '/usr/local/etc/snort/blocklist.txt')
@@ -98,6 +108,78 @@ SNORT_LOG_FAST_PATH = os.getenv('SNORT_LOG_FAST_PATH', '/var/log/snort/alert_fas
 SNORT_LOG_PATH = SNORT_LOG_JSON_PATH
 SNORT_DASHBOARD_LOG_PATH = SNORT_LOG_FAST_PATH
 
+# Aktifkan bila command `manage.py ingest_alerts --follow` berjalan;
+# halaman logs lalu membaca dari tabel Alert terindeks, bukan file mentah.
+SNORT_ALERT_STORE = os.getenv('SNORT_ALERT_STORE', 'False') == 'True'
+
+# Endpoint ingest multi-sensor (`/snort/api/ingest/`, butuh SNORT_ALERT_STORE):
+# batas ukuran satu batch agent setelah dekompresi gzip.
+SNORT_INGEST_MAX_BYTES = int(os.getenv('SNORT_INGEST_MAX_BYTES', str(16 * 1024 * 1024)))
+
+# TTL (detik) cache respons dashboard_data_api
+SNORT_DASHBOARD_CACHE_TTL = int(os.getenv('SNORT_DASHBOARD_CACHE_TTL', '5'))
+
+# Pemindaian paralel halaman logs (pencarian berfilter atas banyak/besar file):
+# WORKERS=0 berarti jumlah CPU; file dibagi per CHUNK_BYTES. Satu pool per
+# proses web dipakai paling banyak CONCURRENCY pencarian sekaligus, dan hanya
+# untuk halaman <= MAX_PAGE.
+SNORT_SCAN_WORKERS = int(os.getenv('SNORT_SCAN_WORKERS', '0'))
+SNORT_SCAN_CHUNK_BYTES = int(os.getenv('SNORT_SCAN_CHUNK_BYTES', str(32 * 1024 * 1024)))
+SNORT_SCAN_PARALLEL_MIN_BYTES = int(os.getenv('SNORT_SCAN_PARALLEL_MIN_BYTES', str(16 * 1024 * 1024)))
+SNORT_SCAN_CONCURRENCY = int(os.getenv('SNORT_SCAN_CONCURRENCY', '2'))
+SNORT_SCAN_MAX_PAGE = int(os.getenv('SNORT_SCAN_MAX_PAGE', '200'))
+
+# Top talker dashboard (Space-Saving): jumlah penghitung per dimensi per bucket
+# waktu. Lebih besar = lebih akurat; error hitungan <= total bucket / CAPACITY.
+SNORT_HEAVY_HITTERS_CAPACITY = int(os.getenv('SNORT_HEAVY_HITTERS_CAPACITY', '200'))
+
+# Jendela default (detik) tampilan logs digabung (?coalesce=) bila nilainya tidak valid
+SNORT_COALESCE_WINDOW = int(os.getenv('SNORT_COALESCE_WINDOW', '60'))
+
+# Batas baris per unduhan ekspor alert (`/snort/logs/export/`)
+SNORT_EXPORT_MAX_ROWS = int(os.getenv('SNORT_EXPORT_MAX_ROWS', '500000'))
+
+# Statistik data-plane dari perf_monitor Snort 3 (`perf_monitor = { format = 'csv' }`
+# menulis perf_monitor_*.csv ke direktori -l snort.service). INTERVAL = perf_monitor.seconds,
+# RESET = perf_monitor.reset; RING_SIZE = jumlah titik terbaru di memori tiap worker.
+SNORT_PERF_DIR = os.getenv('SNORT_PERF_DIR', os.path.dirname(SNORT_LOG_JSON_PATH))
+SNORT_PERF_INTERVAL = int(os.getenv('SNORT_PERF_INTERVAL', '60'))
+SNORT_PERF_RESET = os.getenv('SNORT_PERF_RESET', 'True') == 'True'
+SNORT_PERF_RING_SIZE = int(os.getenv('SNORT_PERF_RING_SIZE', '1440'))
+
+# Rotasi & arsip log (`manage.py rotate_logs`): segmen dikompres (gzip/zstd)
+# dengan sidecar index + bloom filter untuk pencarian arsip.
+SNORT_ARCHIVE_DIR = os.getenv('SNORT_ARCHIVE_DIR', '/var/log/snort/archive')
+SNORT_ARCHIVE_COMPRESSION = os.getenv('SNORT_ARCHIVE_COMPRESSION', 'gzip')
+SNORT_ROTATE_MAX_BYTES = int(os.getenv('SNORT_ROTATE_MAX_BYTES', str(64 * 1024 * 1024)))
+SNORT_ROTATE_MAX_AGE = int(os.getenv('SNORT_ROTATE_MAX_AGE', '86400'))
+SNORT_ARCHIVE_RETENTION_DAYS = int(os.getenv('SNORT_ARCHIVE_RETENTION_DAYS', '180'))
+# Rotasi = rename ke '<log>.<epoch>'. REOPEN_COMMAND (mis. `systemctl restart snort`)
+# membuat Snort menulis ke file baru; tanpa perintah ini rotate_logs tidak memutar
+# log (andalkan `limit` Snort) dan hanya menyegel file rollover. File rollover
+# disegel setelah file aktif berisi data lagi dan rollover tidak berubah selama
+# SEAL_DELAY detik.
+SNORT_ROTATE_REOPEN_COMMAND = os.getenv('SNORT_ROTATE_REOPEN_COMMAND', '')
+SNORT_ROTATE_SEAL_DELAY = int(os.getenv('SNORT_ROTATE_SEAL_DELAY', '60'))
+
+# Sinkronisasi blocklist ke nftables. Tiap file .nft ikut membuat tabel, set
+# (`flags interval; auto-merge;`) dan chain prerouting yang membuang IP di set.
+SNORT_NFT_TABLE = os.getenv('SNORT_NFT_TABLE', 'inet snort')
+SNORT_NFT_SET_V4 = os.getenv('SNORT_NFT_SET_V4', 'blocklist_v4')
+SNORT_NFT_SET_V6 = os.getenv('SNORT_NFT_SET_V6', 'blocklist_v6')
+SNORT_NFT_APPLY = os.getenv('SNORT_NFT_APPLY', 'False') == 'True'
+SNORT_NFT_BINARY = os.getenv('SNORT_NFT_BINARY', 'nft')
+
+# Autoblock: IP sumber dengan >= THRESHOLD alert (atau >= SID_THRESHOLD alert
+# untuk satu SID) dalam WINDOW detik masuk blocklist selama TTL detik.
+# Dijalankan oleh `manage.py ingest_alerts --follow`.
+SNORT_AUTOBLOCK = os.getenv('SNORT_AUTOBLOCK', 'False') == 'True'
+SNORT_AUTOBLOCK_WINDOW = int(os.getenv('SNORT_AUTOBLOCK_WINDOW', '60'))
+SNORT_AUTOBLOCK_THRESHOLD = int(os.getenv('SNORT_AUTOBLOCK_THRESHOLD', '50'))
+SNORT_AUTOBLOCK_SID_THRESHOLD = int(os.getenv('SNORT_AUTOBLOCK_SID_THRESHOLD', '20'))
+SNORT_AUTOBLOCK_TTL = int(os.getenv('SNORT_AUTOBLOCK_TTL', '3600'))
+SNORT_AUTOBLOCK_MAX_TRACKED = int(os.getenv('SNORT_AUTOBLOCK_MAX_TRACKED', '100000'))
+
 
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
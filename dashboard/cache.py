@@ -0,0 +1,76 @@
+import hashlib
+import os
+import threading
+import time
+
+from django.core.cache import cache
+
+# Cache respons dashboard berbasis sidik jari file input (path, mtime, size, inode).
+# Poll bersamaan dari banyak browser berbagi satu komputasi (single-flight).
+
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+_local_locks = {}
+_local_guard = threading.Lock()
+
+
+def file_fingerprint(path):
+    try:
+        stats = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return (str(path), None, None, None)
+    return (str(path), stats.st_mtime_ns, stats.st_size, stats.st_ino)
+
+
+class Fingerprint:
+    def __init__(self, paths, extra=()):
+        self.entries = sorted({file_fingerprint(path) for path in paths if path})
+        digest = hashlib.blake2b(repr((self.entries, extra)).encode(), digest_size=16).hexdigest()
+        self.etag = f'"{digest}"'
+        self.cache_key = f"dashboard:payload:{digest}"
+        mtimes = [entry[1] for entry in self.entries if entry[1] is not None]
+        self.last_modified = max(mtimes) / 1e9 if mtimes else None
+
+
+def get_or_compute(key, compute, ttl):
+    """Ambil dari cache; bila kosong hanya satu pemanggil yang menghitung ulang."""
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    with _local_guard:
+        lock = _local_locks.setdefault(key, threading.Lock())
+    try:
+        # Single-flight antar thread dalam satu proses
+        with lock:
+            value = cache.get(key)
+            if value is not None:
+                return value
+            return _compute_with_shared_lock(key, compute, ttl)
+    finally:
+        with _local_guard:
+            _local_locks.pop(key, None)
+
+
+def _compute_with_shared_lock(key, compute, ttl):
+    # Single-flight antar proses worker lewat cache.add (atomik di backend cache)
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    while not acquired:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if time.monotonic() > deadline:
+            break
+        acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+
+    try:
+        value = compute()
+        cache.set(key, value, ttl)
+        return value
+    finally:
+        if acquired:
+            cache.delete(lock_key)
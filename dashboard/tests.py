@@ -1,3 +1,55 @@
-from django.test import TestCase
+import datetime
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+# Manifest whitenoise hanya ada setelah collectstatic
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class IndexTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("viewer", password="x"))
+
+    @override_settings(SNORT_ALERT_STORE=False)
+    def test_trend_card_hidden_without_store(self):
+        response = self.client.get(reverse("dashboard:index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'id="trendChart"')
+        self.assertNotContains(response, "alertSeriesUrl")
+
+    @override_settings(SNORT_ALERT_STORE=True)
+    def test_trend_card_shown_with_store(self):
+        response = self.client.get(reverse("dashboard:index"))
+        self.assertContains(response, 'id="trendChart"')
+        self.assertContains(response, "alertSeriesUrl")
+
+
+class DashboardDataTests(TestCase):
+    # 20:00 UTC = 03:00 WIB keesokan harinya (TIME_ZONE Asia/Jakarta)
+    NOW = datetime.datetime(2025, 10, 17, 20, 0, tzinfo=datetime.timezone.utc)
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("viewer", password="x"))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "alert_fast.txt")
+        with open(self.path, "w", encoding="utf-8") as handle:
+            for stamp in ("10/17-23:30:00", "10/18-02:15:00", "10/18-02:45:00"):
+                handle.write(f'{stamp}.000000 [**] [1:1000001:1] "x" [**] {{TCP}} 10.0.0.1:1 -> 10.0.0.2:80\n')
+        cache.clear()
+
+    def test_today_follows_local_time_zone(self):
+        with override_settings(SNORT_DASHBOARD_LOG_PATH=self.path, SNORT_ALERT_STORE=False), \
+                mock.patch("django.utils.timezone.now", return_value=self.NOW):
+            data = self.client.get(reverse("dashboard:dashboard_api_data")).json()
+        self.assertEqual(data["total_alerts"], 3)
+        # Hari ini = 18 Oktober waktu lokal: hanya dua alert jam 02.xx
+        self.assertEqual(sum(data["alert_hour_alert"]), 2)
+        self.assertEqual(data["alert_hour_alert"][2], 2)
+        week = dict(zip(data["alert_week_labels"], data["alert_week_alert"]))
+        self.assertEqual((week["Jumat"], week["Sabtu"]), (1, 2))
@@ -9,4 +9,8 @@ urlpatterns = [
     
     # URL BARU untuk API data kita
     path('api/dashboard-data/', views.dashboard_data_api, name='dashboard_api_data'),
+    path('api/alert-series/', views.alert_series_api, name='alert_series_api'),
+    path('api/top-talkers/', views.top_talkers_api, name='top_talkers_api'),
+    path('api/perf/', views.perf_api, name='perf_api'),
+    path('api/queues/', views.queues_api, name='queues_api'),
 ]
\ No newline at end of file
@@ -4,35 +4,23 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import Fingerprint, get_or_compute
 
 
 @login_required
 def index(request):
-    return render(request, 'dashboard/index.html')
-
+    from snort import sensors, store
 
-@login_required
-def dashboard_data_api(request):
+    # Pilihan sensor dan grafik tren (tabel rollup) hanya bermakna bila alert tersimpan di database
+    alert_store = store.is_enabled()
+    sensor_choices = sensors.names() if alert_store else []
+    return render(request, 'dashboard/index.html', {"sensor_choices": sensor_choices, "alert_store": alert_store})
 
-    import json
-    import re
-    import datetime
-    from collections import Counter
-
-    # ======================================================
-    # SETUP TANGGAL
-    # ======================================================
-    now = datetime.datetime.now()
-    today_date = now.date()
-    week_start_date = today_date - datetime.timedelta(days=6)  # 7 hari terakhir
-
-    # Helper konversi timestamp JSON
-    def parse_dt(ts):
-        try:
-            return datetime.datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        except:
-            return None
 
+def _dashboard_log_path():
     # ======================================================
     # 1. Temukan file log Snort
     # ======================================================
@@ -63,14 +51,35 @@ def dashboard_data_api(request):
     if not snort_log_path and dashboard_candidates:
         snort_log_path = dashboard_candidates[0]
 
+    return snort_log_path
+
+
+def _build_dashboard_payload(snort_log_path, now, sensor=None):
+    import datetime
+    from collections import Counter
+
+    today_date = now.date()
+    week_start_date = today_date - datetime.timedelta(days=6)  # 7 hari terakhir
+
     # ======================================================
-    # 2. Hitung TOTAL ALERT (tanpa filter)
+    # 2. Sinkronkan agregator inkremental (hanya baris baru)
     # ======================================================
-    try:
-        with open(snort_log_path, 'r', encoding="utf-8", errors="ignore") as f:
-            total_alerts = sum(1 for _ in f)
-    except:
-        total_alerts = 0
+    if sensor:
+        # Sensor jarak jauh: alert kiriman agent di tabel Alert
+        from django.utils import timezone
+        from snort import store
+
+        since = timezone.make_aware(datetime.datetime.combine(week_start_date, datetime.time.min))
+        snapshot = store.sensor_snapshot(sensor, since)
+    else:
+        from snort import topology
+        from snort.aggregator import aggregator
+
+        snapshot = aggregator.snapshot(snort_log_path, now=now)
+        # Topologi multi-queue: log tiap instance Snort di <dir>/<queue>/
+        for _queue, queue_path in topology.queue_files(snort_log_path):
+            snapshot.merge(aggregator.snapshot(queue_path, now=now))
+    total_alerts = snapshot.total_lines
 
     # ======================================================
     # 3. Hitung rules Snort
@@ -118,90 +127,25 @@ def dashboard_data_api(request):
     # ======================================================
     # 5. ALERT PER JAM — Reset setiap hari (hanya TODAY)
     # ======================================================
-    alert_hour_alert = Counter()
-    alert_hour_drop = Counter()
-
-    regex_fast = re.compile(r".*\[(ALERT|DROP)\]", re.IGNORECASE)
-
-    def process_hour(dt, act):
-        if not dt:
-            return
-        if dt.date() != today_date:
-            return
-
-        hour_key = dt.strftime("%H")
-        if act == "alert":
-            alert_hour_alert[hour_key] += 1
-        elif act == "drop":
-            alert_hour_drop[hour_key] += 1
+    hourly = snapshot.hourly(today_date)
+    alert_hour_alert = hourly["alert"]
+    alert_hour_drop = hourly["drop"]
 
     # ======================================================
     # 6. ALERT PER MINGGU — Reset setiap 7 hari
     # ======================================================
-    alert_week_alert = Counter()
-    alert_week_drop = Counter()
-
     weekday_map = {
         0: "Senin", 1: "Selasa", 2: "Rabu",
         3: "Kamis", 4: "Jumat", 5: "Sabtu", 6: "Minggu"
     }
 
-    def process_week(dt, act):
-        if not dt:
-            return
-        if dt.date() < week_start_date:
-            return
-
-        wd = weekday_map[dt.weekday()]
-        if act == "alert":
-            alert_week_alert[wd] += 1
-        elif act == "drop":
-            alert_week_drop[wd] += 1
-
-    # ======================================================
-    # 7. LOOP FILE LOG — JSON & FAST format
-    # ======================================================
-    try:
-        with open(snort_log_path, "r", encoding="utf-8", errors="ignore") as f:
-
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # JSON Mode
-                if line.startswith("{"):
-                    try:
-                        obj = json.loads(line)
-                        ts = obj.get("timestamp") or obj.get("time")
-                        act = (obj.get("action") or "").lower()
-                        dt = parse_dt(ts)
-
-                        process_hour(dt, act)
-                        process_week(dt, act)
-                        continue
-                    except:
-                        pass
-
-                # FAST Mode
-                fast_match = re.match(r"(\d+/\d+)-(\d+):(\d+):(\d+)", line)
-                action_tag = regex_fast.search(line)
-
-                if fast_match:
-                    month, day = map(int, fast_match.group(1).split("/"))
-                    hr, mn, sc = map(int, fast_match.groups()[1:4])
-                    act = action_tag.group(1).lower() if action_tag else None
-
-                    try:
-                        dt = datetime.datetime(now.year, month, day, hr, mn, sc)
-                    except:
-                        dt = None
-
-                    process_hour(dt, act)
-                    process_week(dt, act)
-
-    except Exception as e:
-        print("ERROR membaca log:", e)
+    alert_week_alert = Counter()
+    alert_week_drop = Counter()
+    daily = snapshot.daily(week_start_date)
+    for day, count in daily["alert"].items():
+        alert_week_alert[weekday_map[day.weekday()]] += count
+    for day, count in daily["drop"].items():
+        alert_week_drop[weekday_map[day.weekday()]] += count
 
     # ======================================================
     # LABEL & OUTPUT
@@ -209,7 +153,7 @@ def dashboard_data_api(request):
     hour_labels = [f"{h:02d}.00" for h in range(24)]
     week_labels = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
 
-    return JsonResponse({
+    return {
         "total_alerts": total_alerts,
         "total_rules": total_rules,
         "total_ip_whitelist": total_ip_whitelist,
@@ -222,4 +166,243 @@ def dashboard_data_api(request):
         "alert_week_labels": week_labels,
         "alert_week_alert": [alert_week_alert.get(d, 0) for d in week_labels],
         "alert_week_drop": [alert_week_drop.get(d, 0) for d in week_labels],
+    }
+
+
+def _dashboard_input_paths(snort_log_path):
+    """Semua file yang memengaruhi isi respons dashboard."""
+    from snort import topology
+    from snort.views import _candidate_rule_dirs
+
+    paths = [
+        snort_log_path,
+        getattr(settings, "SNORT_IP_WHITELIST_PATH", ""),
+        getattr(settings, "SNORT_IP_BLOCKLIST_PATH", ""),
+    ]
+    paths.extend(queue_path for _queue, queue_path in topology.queue_files(snort_log_path))
+    for directory in _candidate_rule_dirs():
+        if not os.path.isdir(directory):
+            continue
+        # mtime direktori berubah bila ada file rules ditambah/dihapus
+        paths.append(directory)
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            continue
+        paths.extend(os.path.join(directory, name) for name in entries if name.endswith(".rules"))
+    return paths
+
+
+@login_required
+def dashboard_data_api(request):
+    from django.utils import timezone
+
+    from snort import sensors, store
+    from snort.models import Sensor
+
+    now = timezone.localtime()
+    snort_log_path = _dashboard_log_path()
+
+    # Grafik per jam di-reset tiap hari, jadi tanggal ikut menjadi bagian kunci
+    extra = (now.date().isoformat(),)
+    sensor_name = request.GET.get("sensor", "")
+    sensor = None
+    if sensor_name and sensor_name != sensors.LOCAL and store.is_enabled():
+        sensor = Sensor.objects.filter(name=sensor_name).first()
+        if sensor is None:
+            return JsonResponse({"error": f"Sensor tidak dikenal: {sensor_name}"}, status=404)
+        # Kiriman agent memperbarui last_seen sehingga ikut menjadi sidik jari
+        extra += (sensor.name, sensor.last_seen.isoformat() if sensor.last_seen else "")
+    fingerprint = Fingerprint(_dashboard_input_paths(snort_log_path), extra=extra)
+    if sensor is not None and sensor.last_seen is not None:
+        fingerprint.last_modified = max(fingerprint.last_modified or 0, sensor.last_seen.timestamp())
+
+    not_modified = get_conditional_response(
+        request, etag=fingerprint.etag, last_modified=fingerprint.last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+
+    payload = get_or_compute(
+        fingerprint.cache_key,
+        lambda: _build_dashboard_payload(snort_log_path, now, sensor=sensor.name if sensor else None),
+        getattr(settings, "SNORT_DASHBOARD_CACHE_TTL", 5),
+    )
+
+    response = JsonResponse(payload)
+    response["ETag"] = fingerprint.etag
+    if fingerprint.last_modified is not None:
+        response["Last-Modified"] = http_date(fingerprint.last_modified)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+RANGE_PRESETS = {"24h": (1, "hour"), "7d": (7, "6h"), "30d": (30, "day"), "90d": (90, "day"), "365d": (365, "week")}
+
+
+def _parse_range(params, now):
+    """(start, end, bucket) dari ?range=24h|7d|... atau ?start=&end= (ISO 8601)."""
+    import datetime
+    from django.utils.dateparse import parse_date, parse_datetime
+    from django.utils import timezone
+    from snort.rollup import BUCKET_SECONDS, RangeError
+
+    def _parse(value):
+        dt = parse_datetime(value)
+        if dt is None:
+            day = parse_date(value)
+            dt = datetime.datetime.combine(day, datetime.time.min) if day else None
+        if dt is None:
+            raise RangeError(f"Waktu tidak valid: {value}")
+        return timezone.make_aware(dt) if timezone.is_naive(dt) else dt
+
+    bucket = params.get("bucket", "").strip()
+    if params.get("start"):
+        start = _parse(params["start"])
+        end = _parse(params["end"]) if params.get("end") else now
+        if not bucket:
+            # Bucket terkecil yang menghasilkan paling banyak ~200 titik
+            span = (end - start).total_seconds()
+            bucket = next(
+                (name for name, seconds in sorted(BUCKET_SECONDS.items(), key=lambda item: item[1])
+                 if span / seconds <= 200),
+                "week",
+            )
+        return start, end, bucket
+
+    preset = params.get("range", "24h")
+    if preset not in RANGE_PRESETS:
+        raise RangeError(f"Range tidak dikenal: {preset}")
+    days, default_bucket = RANGE_PRESETS[preset]
+    return now - datetime.timedelta(days=days), now, bucket or default_bucket
+
+
+@login_required
+def alert_series_api(request):
+    """Deret waktu alert dari tabel rollup untuk rentang dan ukuran bucket bebas."""
+    from django.utils import timezone
+    from snort import rollup
+
+    now = timezone.now()
+    try:
+        start, end, bucket = _parse_range(request.GET, now)
+        top = request.GET.get("top", "")
+        data = rollup.query_series(
+            start, end, bucket=bucket,
+            dimension=request.GET.get("dimension", "action"),
+            values=request.GET.getlist("value") or None,
+            top=int(top) if top.isdigit() else 10,
+            now=now,
+        )
+    except rollup.RangeError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    data["start"] = timezone.localtime(start).isoformat()
+    data["end"] = timezone.localtime(end).isoformat()
+    response = JsonResponse(data)
+    response["Cache-Control"] = "private, max-age=30"
+    return response
+
+
+TOP_TALKER_WINDOWS = ("hour", "day", "week")
+
+
+@login_required
+def top_talkers_api(request):
+    """Top IP sumber/tujuan, port tujuan dan signature untuk 1 jam / 1 hari / 1 minggu terakhir."""
+    from django.utils import timezone
+    from snort.aggregator import aggregator
+
+    window = request.GET.get("window", "hour")
+    if window not in TOP_TALKER_WINDOWS:
+        return JsonResponse({"error": f"Window tidak dikenal: {window}"}, status=400)
+    limit = request.GET.get("limit", "")
+    limit = min(int(limit), 100) if limit.isdigit() and int(limit) > 0 else 10
+
+    now = timezone.localtime()
+    snort_log_path = _dashboard_log_path()
+    # Jendela bergeser seiring waktu, jadi menit ikut menjadi bagian kunci cache
+    fingerprint = Fingerprint([snort_log_path], extra=("top", window, limit, now.strftime("%Y%m%d%H%M")))
+
+    def compute():
+        top, slots = aggregator.heavy_hitters(snort_log_path, window, limit=limit, now=now)
+        return {
+            "window": window,
+            "capacity": getattr(settings, "SNORT_HEAVY_HITTERS_CAPACITY", 200),
+            "memory_slots": slots,
+            "dimensions": {
+                name: {
+                    "total": data["total"],
+                    "items": [{"value": value, "count": count, "error": error}
+                              for value, count, error in data["items"]],
+                }
+                for name, data in top.items()
+            },
+        }
+
+    payload = get_or_compute(fingerprint.cache_key, compute, getattr(settings, "SNORT_DASHBOARD_CACHE_TTL", 5))
+    response = JsonResponse(payload)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+PERF_LIVE = "live"
+
+
+@login_required
+def perf_api(request):
+    """Throughput data-plane Snort dari perf_monitor: ring buffer (range=live) atau PerfSample tersimpan."""
+    from django.utils import timezone
+    from snort import perf, rollup
+
+    now = timezone.now()
+    if request.GET.get("range", PERF_LIVE) == PERF_LIVE and not request.GET.get("start"):
+        minutes = request.GET.get("minutes", "")
+        since = now.timestamp() - int(minutes) * 60 if minutes.isdigit() else None
+        source, points = PERF_LIVE, perf.monitor.points(since)
+    else:
+        try:
+            start, end, _bucket = _parse_range(request.GET, now)
+        except rollup.RangeError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+        source, points = perf.query(start, end, now)
+
+    data = [point.as_dict() for point in points]
+    response = JsonResponse({
+        "source": source,
+        "files": len(perf.perf_files()),
+        "points": data,
+        "latest": data[-1] if data else None,
     })
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@login_required
+def queues_api(request):
+    """Hitungan per queue NFQUEUE: alert/drop hari ini dari <dir>/<queue>/ dan titik perf_monitor terakhir."""
+    from django.utils import timezone
+    from snort import perf, topology
+    from snort.aggregator import aggregator
+
+    snort_log_path = _dashboard_log_path()
+    now = timezone.localtime()
+    today = now.date()
+    perf_latest = perf.monitor.latest_by_queue()
+    files = dict(topology.queue_files(snort_log_path))
+
+    queues = []
+    for queue in sorted(set(files) | set(perf_latest)):
+        entry = {"queue": queue, "file": files.get(queue), "total_alerts": 0, "today": {"alert": 0, "drop": 0}}
+        if queue in files:
+            snapshot = aggregator.snapshot(files[queue], now=now)
+            hourly = snapshot.hourly(today)
+            entry["total_alerts"] = snapshot.total_lines
+            entry["today"] = {action: sum(counts.values()) for action, counts in hourly.items()}
+        point = perf_latest.get(queue)
+        entry["perf"] = point.as_dict() if point is not None else None
+        queues.append(entry)
+
+    response = JsonResponse({"queues": queues})
+    response["Cache-Control"] = "private, no-cache"
+    return response
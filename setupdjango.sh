@@ -48,11 +48,13 @@ After=network.target
 [Service]
 WorkingDirectory=$PROJECT_DIR
 # Menggunakan path absolut venv secara eksplisit
+# Worker ASGI (uvicorn) agar endpoint live /snort/stream/ (SSE) bisa berjalan
 ExecStart=$PROJECT_DIR/venv/bin/gunicorn \\
     --workers 3 \\
+    --worker-class uvicorn.workers.UvicornWorker \\
     --bind 0.0.0.0:8000 \\
     --chdir $PROJECT_DIR \\
-    core.wsgi:application
+    core.asgi:application
 Restart=always
 RestartSec=3
 User=$SERVICE_USER
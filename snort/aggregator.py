@@ -0,0 +1,295 @@
+import datetime
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import archive
+from .alerts import decode_line, decode_lines
+from .heavy_hitters import DEFAULT_CAPACITY, HeavyHitters
+from .reader import count_lines, find_offset
+
+# Agregator inkremental untuk log alert Snort.
+# Menyimpan offset byte + inode tiap file sehingga setiap refresh dashboard
+# hanya mem-parse baris yang baru ditambahkan sejak panggilan sebelumnya.
+
+READ_CHUNK_SIZE = 1024 * 1024
+RETENTION_DAYS = 7
+# Start dingin di file sebesar ini: baris di luar retensi hanya dihitung
+COLD_SKIP_BYTES = 64 * 1024 * 1024
+
+
+class LogState:
+    __slots__ = ("path", "device", "inode", "offset", "total_lines", "buckets", "sid_hits", "signatures",
+                 "hitters", "capacity")
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.reset(None)
+
+    def reset(self, stats):
+        self.device = stats.st_dev if stats else None
+        self.inode = stats.st_ino if stats else None
+        self.offset = 0
+        self.total_lines = 0
+        # Kunci: (tanggal, jam, action) -> jumlah alert
+        self.buckets = Counter()
+        # Kunci: (tanggal, gid, sid) -> jumlah alert; signature terakhir per (gid, sid)
+        self.sid_hits = Counter()
+        self.signatures = {}
+        # Top IP/port/signature per jendela waktu (Space-Saving, memori terbatas)
+        self.hitters = HeavyHitters(self.capacity)
+
+    def add(self, alerts):
+        buckets = self.buckets
+        sid_hits = self.sid_hits
+        signatures = self.signatures
+        hitters = self.hitters
+        for alert in alerts:
+            if alert.sort_key is None:
+                continue
+            local = timezone.localtime(alert.sort_key)
+            day = local.date()
+            buckets[(day, local.hour, alert.action)] += 1
+            if alert.sid is not None:
+                key = (alert.gid or 1, alert.sid)
+                sid_hits[(day, key[0], key[1])] += 1
+                signatures[key] = alert.signature
+            hitters.add(alert)
+
+    def to_dict(self):
+        """Hitungan untuk sidecar segmen arsip (tanpa offset/inode)."""
+        return {
+            "buckets": [[day.isoformat(), hour, action, count] for (day, hour, action), count in self.buckets.items()],
+            "sid_hits": [[day.isoformat(), gid, sid, count] for (day, gid, sid), count in self.sid_hits.items()],
+            "signatures": [[gid, sid, signature] for (gid, sid), signature in self.signatures.items()],
+            "hitters": self.hitters.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, path, data, total_lines=0, capacity=DEFAULT_CAPACITY):
+        state = cls(path, capacity)
+        state.total_lines = total_lines
+        parse = datetime.date.fromisoformat
+        state.buckets.update({(parse(day), hour, action): count for day, hour, action, count in data["buckets"]})
+        state.sid_hits.update({(parse(day), gid, sid): count for day, gid, sid, count in data["sid_hits"]})
+        state.signatures.update({(gid, sid): signature for gid, sid, signature in data["signatures"]})
+        state.hitters = HeavyHitters.from_dict(data.get("hitters", {}), capacity)
+        return state
+
+    def is_stale(self, stats):
+        """File dirotasi (inode berganti) atau di-truncate sejak dibaca terakhir."""
+        return (
+            stats.st_ino != self.inode
+            or stats.st_dev != self.device
+            or stats.st_size < self.offset
+        )
+
+
+class AlertSnapshot:
+    __slots__ = ("total_lines", "buckets", "sid_hits", "signatures")
+
+    def __init__(self, total_lines, buckets, sid_hits=None, signatures=None):
+        self.total_lines = total_lines
+        self.buckets = buckets
+        self.sid_hits = sid_hits or Counter()
+        self.signatures = signatures or {}
+
+    def merge(self, other):
+        """Tambahkan snapshot file lain (mis. log per queue NFQUEUE) ke snapshot ini."""
+        self.total_lines += other.total_lines
+        self.buckets.update(other.buckets)
+        self.sid_hits.update(other.sid_hits)
+        for key, signature in other.signatures.items():
+            self.signatures.setdefault(key, signature)
+        return self
+
+    def hourly(self, date):
+        """Counter jam ("00".."23") per action untuk satu tanggal."""
+        result = {"alert": Counter(), "drop": Counter()}
+        for (day, hour, action), count in self.buckets.items():
+            if day == date and action in result:
+                result[action][f"{hour:02d}"] += count
+        return result
+
+    def daily(self, since):
+        """Counter tanggal per action untuk semua tanggal >= since."""
+        result = {"alert": Counter(), "drop": Counter()}
+        for (day, _hour, action), count in self.buckets.items():
+            if day >= since and action in result:
+                result[action][day] += count
+        return result
+
+    def top_sids(self, since, limit=None):
+        """[(gid, sid, jumlah, signature)] untuk tanggal >= since, terbanyak dulu."""
+        totals = Counter()
+        for (day, gid, sid), count in self.sid_hits.items():
+            if day >= since:
+                totals[(gid, sid)] += count
+        return [
+            (gid, sid, count, self.signatures.get((gid, sid), "N/A"))
+            for (gid, sid), count in totals.most_common(limit)
+        ]
+
+
+class AlertAggregator:
+    def __init__(self, retention_days=RETENTION_DAYS, chunk_size=READ_CHUNK_SIZE):
+        self.retention_days = retention_days
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._states = {}
+        # path sidecar -> (SegmentIndex, LogState hitungannya)
+        self._archived = {}
+
+    def snapshot(self, path, now=None):
+        """Sinkronkan state file dengan isi terbaru lalu kembalikan salinannya.
+
+        File rollover yang belum disegel dan segmen arsip dari file ini ikut
+        dijumlahkan, sehingga riwayat tidak hilang saat log dirotasi.
+        """
+        now = now or timezone.localtime()
+        with self._lock:
+            snapshot = AlertSnapshot(0, Counter())
+            for state in self._states_for(path, now):
+                snapshot.merge(state)
+            return snapshot
+
+    def heavy_hitters(self, path, window, limit=10, now=None):
+        """Top nilai per dimensi untuk jendela 'hour' / 'day' / 'week' terakhir."""
+        now = now or timezone.localtime()
+        with self._lock:
+            states = self._states_for(path, now)
+            hitters = states[0].hitters
+            if len(states) > 1:
+                hitters = HeavyHitters(states[0].capacity)
+                for state in states:
+                    hitters.merge(state.hitters)
+            return hitters.top(window, now.timestamp(), limit), hitters.memory_slots()
+
+    def forget(self, path=None):
+        with self._lock:
+            if path is None:
+                self._states.clear()
+                self._archived.clear()
+            else:
+                self._states.pop(path, None)
+
+    def _states_for(self, path, now):
+        """State file aktif, file rollover-nya yang belum disegel, lalu segmen arsipnya."""
+        states = [self._refresh(path, now)]
+        rolled = archive.rolled_files(path)
+        states.extend(self._refresh(rolled_path, now) for rolled_path in rolled)
+        # File rollover yang sudah disegel kini terhitung lewat sidecar segmennya
+        for key in [key for key in self._states if key != path and archive.origin_path(key) == path]:
+            if key not in rolled:
+                del self._states[key]
+        states.extend(self._archived_states(path, now))
+        return states
+
+    def _archived_states(self, path, now):
+        segments = archive.list_segments()
+        live = {segment.path for segment in segments}
+        for key in [key for key in self._archived if key not in live]:
+            del self._archived[key]
+        states = []
+        for segment in segments:
+            # Selama file sumbernya masih ada, isinya masih dibaca langsung
+            if segment.counts is None or segment.origin != path or os.path.exists(segment.source):
+                continue
+            cached = self._archived.get(segment.path)
+            if cached is None or cached[0] is not segment:
+                capacity = getattr(settings, "SNORT_HEAVY_HITTERS_CAPACITY", DEFAULT_CAPACITY)
+                state = LogState.from_dict(segment.source, segment.counts, segment.lines, capacity)
+                cached = self._archived[segment.path] = (segment, state)
+            state = cached[1]
+            self._prune(state, now.date())
+            state.hitters.prune(now.timestamp())
+            states.append(state)
+        return states
+
+    def _refresh(self, path, now):
+        state = self._states.get(path)
+        if state is None:
+            capacity = getattr(settings, "SNORT_HEAVY_HITTERS_CAPACITY", DEFAULT_CAPACITY)
+            state = self._states[path] = LogState(path, capacity)
+        try:
+            stats = os.stat(state.path)
+        except OSError:
+            state.reset(None)
+            return state
+
+        if state.inode is not None and (stats.st_ino != state.inode or stats.st_dev != state.device):
+            # Dirotasi dengan rename: state lama melanjutkan di file rollover
+            self._hand_over(state)
+            state = self._states[path] = LogState(path, state.capacity)
+        if state.inode is None or state.is_stale(stats):
+            state.reset(stats)
+            if stats.st_size >= COLD_SKIP_BYTES:
+                self._skip_history(state, now)
+
+        if stats.st_size > state.offset:
+            self._consume(state, stats.st_size)
+        self._prune(state, now.date())
+        state.hitters.prune(now.timestamp())
+        return state
+
+    def _hand_over(self, state):
+        for rolled in archive.rolled_files(state.path):
+            if rolled in self._states:
+                continue
+            try:
+                stats = os.stat(rolled)
+            except OSError:
+                continue
+            if (stats.st_dev, stats.st_ino) == (state.device, state.inode):
+                state.path = rolled
+                self._states[rolled] = state
+                return
+
+    def _skip_history(self, state, now):
+        # Bucket lebih tua dari retensi akan dibuang _prune; baris-baris itu cukup
+        # dihitung newline-nya via mmap tanpa decode. Margin satu hari untuk
+        # baris yang sedikit tidak berurutan.
+        cutoff = timezone.make_aware(datetime.datetime.combine(
+            now.date() - datetime.timedelta(days=self.retention_days + 1), datetime.time.min
+        ))
+        offset = find_offset(
+            state.path, lambda alert: alert.sort_key is None or alert.sort_key >= cutoff, decode_line
+        )
+        if offset:
+            state.total_lines = count_lines(state.path, 0, offset)
+            state.offset = offset
+
+    def _consume(self, state, end):
+        with open(state.path, "rb") as handle:
+            handle.seek(state.offset)
+            while state.offset < end:
+                chunk = handle.read(min(self.chunk_size, end - state.offset))
+                if not chunk:
+                    break
+                # Baris terakhir yang belum lengkap dibaca ulang pada refresh berikutnya
+                cut = chunk.rfind(b"\n")
+                if cut < 0:
+                    if len(chunk) < self.chunk_size:
+                        break
+                    cut = len(chunk) - 1
+                complete = chunk[:cut + 1]
+                handle.seek(state.offset + len(complete))
+                state.offset += len(complete)
+                state.total_lines += complete.count(b"\n")
+
+                state.add(decode_lines(complete.splitlines()))
+
+    def _prune(self, state, today):
+        cutoff = today - datetime.timedelta(days=self.retention_days)
+        for counter in (state.buckets, state.sid_hits):
+            stale = [key for key in counter if key[0] < cutoff]
+            for key in stale:
+                del counter[key]
+
+
+# Satu instance per proses worker; state bertahan antar request.
+aggregator = AlertAggregator()
@@ -0,0 +1,278 @@
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+# Decoder alert bersama untuk app dashboard dan snort.
+# Memakai orjson / msgspec bila terpasang, selain itu json bawaan.
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _DECODE_ERRORS = (orjson.JSONDecodeError, TypeError)
+    DECODER = "orjson"
+except ImportError:
+    try:
+        import msgspec
+
+        _loads = msgspec.json.decode
+        _DECODE_ERRORS = (msgspec.DecodeError, TypeError)
+        DECODER = "msgspec"
+    except ImportError:
+        _loads = json.loads
+        _DECODE_ERRORS = (ValueError, TypeError)
+        DECODER = "json"
+
+_intern = sys.intern
+
+# Satu regex terkompilasi untuk baris alert_fast Snort 3, contoh:
+# 10/17-12:34:56.123456 [drop] [**] [1:1000001:1] "msg" [**] [Classification: x] [Priority: 2] {TCP} 1.2.3.4:5 -> 6.7.8.9:80
+_TIMESTAMP_PATTERN = r"(?:(\d{2,4})/)?(\d{1,2})/(\d{1,2})-(\d{1,2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?"
+_FAST_LINE = re.compile(
+    _TIMESTAMP_PATTERN
+    + r"\s+(?:\[([^\]*]+)\]\s+)?"
+    + r"\[\*\*\]\s+\[(\d+):(\d+):(\d+)\]\s+\"?(.*?)\"?\s+\[\*\*\]"
+    + r"(?:\s+\[Classification:\s*([^\]]*)\])?"
+    + r"(?:\s+\[Priority:\s*(\d+)\])?"
+    + r"(?:\s+\{([^}]+)\})?"
+    + r"(?:\s+(\S+)\s+->\s+(\S+))?"
+)
+_SNORT_TIMESTAMP = re.compile(_TIMESTAMP_PATTERN + r"$")
+
+_DROP_ACTIONS = ("drop", "block", "reject")
+
+
+class Alert:
+    """Record alert ringkas; atribut sama dengan dict lama agar template tidak berubah."""
+
+    __slots__ = (
+        "sort_key", "action", "signature", "src_ip", "src_port",
+        "dst_ip", "dst_port", "protocol", "priority",
+        "gid", "sid", "rev", "classification",
+    )
+
+    def __init__(self, sort_key=None, action="alert", signature="N/A", src_ip="N/A", src_port="N/A",
+                 dst_ip="N/A", dst_port="N/A", protocol="N/A", priority="N/A",
+                 gid=None, sid=None, rev=None, classification="N/A"):
+        self.sort_key = sort_key
+        self.action = action
+        self.signature = signature
+        self.src_ip = src_ip
+        self.src_port = src_port
+        self.dst_ip = dst_ip
+        self.dst_port = dst_port
+        self.protocol = protocol
+        self.priority = priority
+        self.gid = gid
+        self.sid = sid
+        self.rev = rev
+        self.classification = classification
+
+    @property
+    def timestamp(self):
+        # Diformat saat dibutuhkan saja (mis. baris yang benar-benar ditampilkan)
+        if self.sort_key is None:
+            return "N/A"
+        return timezone.localtime(self.sort_key).strftime("%Y-%m-%d %H:%M:%S")
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["timestamp"] = self.timestamp
+        return data
+
+    def __repr__(self):
+        return f"<Alert {self.timestamp} {self.action} {self.signature!r}>"
+
+
+class Clock:
+    """Zona waktu + 'sekarang' yang dihitung sekali per batch, bukan per baris."""
+
+    __slots__ = ("tz", "now", "limit")
+
+    def __init__(self, now=None):
+        self.tz = timezone.get_current_timezone()
+        self.now = timezone.localtime(now, self.tz) if now else timezone.localtime(timezone=self.tz)
+        self.limit = self.now + timedelta(days=1)
+
+
+def _build_timestamp(clock, year, month, day, hour, minute, second, fraction):
+    full_year = int(year) if year else clock.now.year
+    if full_year < 100:
+        full_year += 2000
+    micro = int(fraction.ljust(6, "0")) if fraction else 0
+    try:
+        dt = datetime(full_year, int(month), int(day), int(hour), int(minute), int(second), micro,
+                      tzinfo=clock.tz)
+    except ValueError:
+        return None
+    if not year and dt > clock.limit:
+        # alert_fast tanpa tahun: tanggal di masa depan berarti milik tahun lalu (rollover Des -> Jan)
+        try:
+            dt = dt.replace(year=full_year - 1)
+        except ValueError:
+            return None
+    return dt
+
+
+def _aware(dt):
+    if dt is None:
+        return None
+    if timezone.is_naive(dt):
+        return timezone.make_aware(dt, timezone.get_current_timezone())
+    return dt
+
+
+def parse_timestamp(value, clock=None):
+    """Timestamp Snort ([YY/]MM/DD-HH:MM:SS.ffffff) atau ISO 8601 menjadi datetime aware."""
+    if not isinstance(value, str) or not value:
+        return None
+    match = _SNORT_TIMESTAMP.match(value.strip())
+    if match:
+        return _build_timestamp(clock or Clock(), *match.groups())
+    try:
+        return _aware(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _normalize_action(value):
+    value = str(value).lower()
+    return "drop" if any(word in value for word in _DROP_ACTIONS) else "alert"
+
+
+def _text(value):
+    if value is None or value == "":
+        return "N/A"
+    return _intern(value) if isinstance(value, str) else value
+
+
+def _split_endpoint(value, protocol):
+    """'1.2.3.4:80', '[2001:db8::1]:80' atau alamat tanpa port (ICMP)."""
+    if value.startswith("["):
+        host, _, port = value[1:].partition("]:")
+        return host.rstrip("]"), int(port) if port.isdigit() else "N/A"
+    colons = value.count(":")
+    if colons == 1 or (colons > 1 and protocol in ("TCP", "UDP")):
+        host, _, port = value.rpartition(":")
+        if port.isdigit():
+            return host, int(port)
+    return value, "N/A"
+
+
+def _from_json_object(raw, clock):
+    if not isinstance(raw, dict):
+        return None
+    get = raw.get
+    sort_key = parse_timestamp(get("timestamp") or get("time"), clock)
+    if sort_key is None and isinstance(get("seconds"), int):
+        sort_key = datetime.fromtimestamp(get("seconds"), clock.tz)
+    return Alert(
+        sort_key=sort_key,
+        action=_intern(_normalize_action(get("action"))),
+        signature=_text(get("msg") or get("message")),
+        src_ip=get("src_addr") or get("src_ip") or "N/A",
+        src_port=get("src_port", "N/A"),
+        dst_ip=get("dst_addr") or get("dest_ip") or "N/A",
+        dst_port=get("dst_port", get("dest_port", "N/A")),
+        protocol=_text(get("proto")),
+        priority=get("priority", "N/A"),
+        gid=get("gid"), sid=get("sid"), rev=get("rev"),
+        classification=_text(get("class")),
+    )
+
+
+def decode_json(line, clock=None):
+    try:
+        return _from_json_object(_loads(line), clock or Clock())
+    except _DECODE_ERRORS:
+        return None
+
+
+def decode_fast(line, clock=None):
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="ignore")
+    match = _FAST_LINE.match(line)
+    if match is None:
+        return None
+    (year, month, day, hour, minute, second, fraction, action, gid, sid, rev,
+     msg, classification, priority, protocol, src, dst) = match.groups()
+
+    protocol = _intern(protocol) if protocol else "N/A"
+    src_ip, src_port = _split_endpoint(src, protocol) if src else ("N/A", "N/A")
+    dst_ip, dst_port = _split_endpoint(dst, protocol) if dst else ("N/A", "N/A")
+    return Alert(
+        sort_key=_build_timestamp(clock or Clock(), year, month, day, hour, minute, second, fraction),
+        action=_intern(_normalize_action(action)) if action else "alert",
+        signature=_intern(msg) if msg else "N/A",
+        src_ip=src_ip, src_port=src_port, dst_ip=dst_ip, dst_port=dst_port,
+        protocol=protocol,
+        priority=int(priority) if priority else "N/A",
+        gid=int(gid), sid=int(sid), rev=int(rev),
+        classification=_intern(classification) if classification else "N/A",
+    )
+
+
+_JSON_HEADS = ("{", b"{")
+
+
+def _is_json(line):
+    return line[:1] in _JSON_HEADS
+
+
+def decode_line(line, clock=None):
+    line = line.strip()
+    if not line:
+        return None
+    clock = clock or Clock()
+    if _is_json(line):
+        alert = decode_json(line, clock)
+        if alert:
+            return alert
+    return decode_fast(line, clock)
+
+
+def decode_lines(lines, clock=None):
+    """Decode satu potongan baris sekaligus.
+
+    Baris alert_fast langsung ke regex terkompilasi decode_fast (tanpa
+    lapisan batch tambahan, jadi tidak lebih lambat dari decode_fast per
+    baris); potongan alert_json di-decode sebagai satu array JSON.
+    """
+    clock = clock or Clock()
+    alerts = []
+    json_lines = []
+    other_lines = 0
+    for line in lines:
+        if line[:1] in _JSON_HEADS:
+            json_lines.append(line)
+            continue
+        alert = decode_fast(line, clock)
+        if alert is None:
+            # Baris kosong / berspasi di depan baru di-strip setelah regex gagal
+            line = line.strip()
+            if not line:
+                continue
+            if _is_json(line):
+                json_lines.append(line)
+                continue
+            alert = decode_fast(line, clock)
+        other_lines += 1
+        if alert is not None:
+            alerts.append(alert)
+    if not json_lines:
+        return alerts
+
+    if not other_lines:
+        as_bytes = [ln.encode("utf-8") if isinstance(ln, str) else ln for ln in json_lines]
+        try:
+            objects = _loads(b"[" + b",".join(as_bytes) + b"]")
+        except _DECODE_ERRORS:
+            objects = None
+        if objects is not None:
+            return [a for a in (_from_json_object(obj, clock) for obj in objects) if a]
+
+    # Campuran format atau ada baris rusak: jatuh ke jalur per baris agar urutan tetap
+    return [a for a in (decode_line(ln, clock) for ln in lines) if a]
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class SnortConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'snort'
+
+    def ready(self):
+        from .store import enable_sqlite_wal
+        connection_created.connect(enable_sqlite_wal, dispatch_uid="snort_sqlite_wal")
@@ -0,0 +1,460 @@
+import base64
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+import shlex
+import subprocess
+import threading
+import time
+
+from django.conf import settings
+
+from .alerts import decode_lines
+
+# Arsip log alert: file aktif "disegel" menjadi segmen terkompresi (gzip atau
+# zstd) berisi blok-blok ~1 MB yang dikompres terpisah. Tiap segmen punya
+# sidecar JSON: rentang waktu, jumlah alert, offset tiap blok dan bloom
+# filter IP/SID, sehingga pencarian bisa melewati segmen/blok yang pasti
+# tidak cocok dan hanya mendekompresi blok yang perlu. Sidecar juga memuat
+# hitungan per jam/SID dan ringkasan top talker agar dashboard tetap
+# menghitung riwayat file yang sudah diarsipkan.
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOCK_SIZE = 1024 * 1024
+INDEX_SUFFIX = ".idx.json"
+STATE_FILE = ".rotate_state.json"
+BLOOM_ERROR_RATE = 0.01
+_ROLLED_SUFFIX = re.compile(r"\.\d+$")
+
+
+class BloomFilter:
+    __slots__ = ("size", "hashes", "bits")
+
+    def __init__(self, size, hashes, bits=None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=BLOOM_ERROR_RATE):
+        capacity = max(capacity, 1)
+        size = max(64, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        hashes = max(1, int(round(size / capacity * math.log(2))))
+        return cls(size, hashes)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def to_dict(self):
+        return {"size": self.size, "hashes": self.hashes, "bits": base64.b64encode(bytes(self.bits)).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["size"], data["hashes"], bytearray(base64.b64decode(data["bits"])))
+
+
+def archive_dir():
+    return getattr(settings, "SNORT_ARCHIVE_DIR", "/var/log/snort/archive")
+
+
+def compression_method():
+    method = getattr(settings, "SNORT_ARCHIVE_COMPRESSION", "gzip")
+    if method == "zstd" and zstandard is None:
+        return "gzip"
+    return method
+
+
+def _compress(data, method):
+    if method == "zstd":
+        return zstandard.ZstdCompressor(level=3, write_content_size=True).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data, method):
+    if method == "zstd":
+        if zstandard is None:
+            raise OSError("Segmen zstd butuh paket 'zstandard'.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def origin_path(path):
+    """File log aktif asal sebuah file rollover ('<log>.<angka>' -> '<log>')."""
+    return _ROLLED_SUFFIX.sub("", path)
+
+
+def _bloom_key(kind, value):
+    return f"{kind}:{value}"
+
+
+class SegmentIndex:
+    """Isi sidecar satu segmen."""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.segment_path = os.path.join(os.path.dirname(path), data["segment"])
+        self.data = data
+        self.source = data.get("source") or ""
+        self.origin = origin_path(self.source)
+        self.lines = data.get("lines", 0)
+        # Segmen lama (sebelum sidecar menyimpan hitungan) bernilai None
+        self.counts = data.get("counts")
+        self.first_ts = data.get("first_ts")
+        self.last_ts = data.get("last_ts")
+        self.blocks = data.get("blocks", [])
+        self.bloom = BloomFilter.from_dict(data["bloom"]) if data.get("bloom") else None
+
+    def overlaps(self, time_from=None, time_to=None, first_ts=None, last_ts=None):
+        first_ts = self.first_ts if first_ts is None else first_ts
+        last_ts = self.last_ts if last_ts is None else last_ts
+        if first_ts is None or last_ts is None:
+            return True
+        if time_from is not None and last_ts < time_from:
+            return False
+        if time_to is not None and first_ts > time_to:
+            return False
+        return True
+
+    def may_contain(self, src_ip=None, dst_ip=None, sid=None, time_from=None, time_to=None):
+        if not self.overlaps(time_from, time_to):
+            return False
+        if self.bloom is None:
+            return True
+        for kind, value in (("ip", src_ip), ("ip", dst_ip), ("sid", sid)):
+            if value not in (None, "") and _bloom_key(kind, value) not in self.bloom:
+                return False
+        return True
+
+    def iter_blocks_reversed(self, time_from=None, time_to=None):
+        """Yield list baris (bytes) per blok, terbaru dulu; blok di luar rentang waktu dilewati."""
+        method = self.data.get("compression", "gzip")
+        with open(self.segment_path, "rb") as handle:
+            for offset, length, _raw_length, first_ts, last_ts in reversed(self.blocks):
+                if not self.overlaps(time_from, time_to, first_ts, last_ts):
+                    continue
+                handle.seek(offset)
+                raw = _decompress(handle.read(length), method)
+                lines = [line for line in raw.split(b"\n") if line]
+                lines.reverse()
+                yield lines
+
+
+def _iter_aligned_blocks(handle, end, block_size=BLOCK_SIZE, include_partial=False):
+    """Potong [posisi sekarang, end) menjadi blok yang berakhir di newline.
+
+    Baris terakhir yang belum lengkap tidak ikut (posisi handle dikembalikan
+    ke awal baris itu), kecuali include_partial untuk file yang sudah ditutup.
+    """
+    carry = b""
+    position = handle.tell()
+    while position < end:
+        chunk = handle.read(min(block_size, end - position))
+        if not chunk:
+            break
+        position += len(chunk)
+        data = carry + chunk
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            carry = data
+            continue
+        carry = data[cut + 1:]
+        yield data[:cut + 1]
+    if carry:
+        if include_partial:
+            yield carry + b"\n"
+        else:
+            handle.seek(-len(carry), os.SEEK_CUR)
+
+
+def _write_bytes_atomic(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(payload)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_segment(source_path, blocks, directory=None, method=None, now=None):
+    """Kompres blok-blok baris ke segmen baru + sidecar; kembalikan path segmen (atau None bila kosong)."""
+    from .aggregator import LogState
+
+    directory = directory or archive_dir()
+    method = method or compression_method()
+    now = now or time.time()
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(now))
+    base = f"{os.path.basename(source_path)}-{stamp}-{os.getpid()}"
+    extension = ".zst" if method == "zstd" else ".gz"
+    segment_path = os.path.join(directory, base + extension)
+    counter = 1
+    while os.path.exists(segment_path):
+        counter += 1
+        segment_path = os.path.join(directory, f"{base}-{counter}{extension}")
+    tmp_path = segment_path + ".tmp"
+
+    index = {
+        "segment": os.path.basename(segment_path), "source": source_path, "compression": method,
+        "first_ts": None, "last_ts": None, "lines": 0, "alerts": 0, "raw_bytes": 0,
+        "actions": {}, "blocks": [],
+    }
+    keys = set()
+    counts = LogState(source_path, getattr(settings, "SNORT_HEAVY_HITTERS_CAPACITY", 200))
+    offset = 0
+    with open(tmp_path, "wb") as out:
+        for block in blocks:
+            lines = block.splitlines()
+            alerts = decode_lines(lines)
+            stamps = [alert.sort_key.timestamp() for alert in alerts if alert.sort_key is not None]
+            counts.add(alerts)
+            for alert in alerts:
+                index["actions"][alert.action] = index["actions"].get(alert.action, 0) + 1
+                for value in (alert.src_ip, alert.dst_ip):
+                    if value not in (None, "", "N/A"):
+                        keys.add(_bloom_key("ip", value))
+                if alert.sid is not None:
+                    keys.add(_bloom_key("sid", alert.sid))
+
+            payload = _compress(block, method)
+            out.write(payload)
+            first_ts, last_ts = (min(stamps), max(stamps)) if stamps else (None, None)
+            index["blocks"].append([offset, len(payload), len(block), first_ts, last_ts])
+            offset += len(payload)
+            index["lines"] += len(lines)
+            index["alerts"] += len(alerts)
+            index["raw_bytes"] += len(block)
+            if first_ts is not None:
+                index["first_ts"] = first_ts if index["first_ts"] is None else min(index["first_ts"], first_ts)
+                index["last_ts"] = last_ts if index["last_ts"] is None else max(index["last_ts"], last_ts)
+        out.flush()
+        os.fsync(out.fileno())
+
+    if not index["blocks"]:
+        os.unlink(tmp_path)
+        return None
+
+    bloom = BloomFilter.for_capacity(len(keys))
+    for key in keys:
+        bloom.add(key)
+    index["bloom"] = bloom.to_dict()
+    counts.hitters.prune(now)
+    index["counts"] = counts.to_dict()
+    os.replace(tmp_path, segment_path)
+    _write_bytes_atomic(segment_path + INDEX_SUFFIX, json.dumps(index).encode("utf-8"))
+    _segment_cache.clear()
+    return segment_path
+
+
+def _load_state(directory):
+    try:
+        with open(os.path.join(directory, STATE_FILE), "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(directory, state):
+    os.makedirs(directory, exist_ok=True)
+    _write_bytes_atomic(os.path.join(directory, STATE_FILE), json.dumps(state).encode("utf-8"))
+
+
+def rotate(path, directory=None, max_bytes=None, max_age=None, force=False, now=None):
+    """Putar file log aktif bila melewati ukuran/umur; kembalikan path file rollover.
+
+    File di-rename menjadi '<log>.<epoch>' lalu dibuat ulang kosong (mode dan
+    pemilik sama). Snort tetap menulis ke inode lama sampai membuka ulang log
+    (reopen_writer), jadi tidak ada baris yang hilang; file rollover disegel
+    ke arsip oleh seal_file setelah ready_to_seal.
+    """
+    directory = directory or archive_dir()
+    max_bytes = max_bytes if max_bytes is not None else getattr(settings, "SNORT_ROTATE_MAX_BYTES", 64 * 1024 * 1024)
+    max_age = max_age if max_age is not None else getattr(settings, "SNORT_ROTATE_MAX_AGE", 86400)
+    now = now or time.time()
+    try:
+        stats = os.stat(path)
+    except OSError:
+        return None
+    if not stats.st_size:
+        return None
+
+    state = _load_state(directory)
+    started = state.get(path)
+    if started is None:
+        state[path] = started = now
+        _save_state(directory, state)
+    if not (force or stats.st_size >= max_bytes or now - started >= max_age):
+        return None
+
+    stamp = int(now)
+    while os.path.exists(f"{path}.{stamp}"):
+        stamp += 1
+    rolled = f"{path}.{stamp}"
+    os.rename(path, rolled)
+    _recreate(path, stats)
+
+    state = _load_state(directory)
+    state[path] = now
+    _save_state(directory, state)
+    return rolled
+
+
+def _recreate(path, stats):
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, stats.st_mode & 0o7777)
+    except FileExistsError:
+        # Penulis sudah membuat file baru lebih dulu
+        return
+    try:
+        os.fchown(fd, stats.st_uid, stats.st_gid)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def reopen_writer():
+    """Jalankan SNORT_ROTATE_REOPEN_COMMAND agar Snort membuka file log baru; kembalikan pesan error atau None."""
+    command = getattr(settings, "SNORT_ROTATE_REOPEN_COMMAND", "")
+    if not command:
+        return None
+    try:
+        completed = subprocess.run(shlex.split(command), capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        return str(exc)
+    if completed.returncode != 0:
+        return completed.stderr.strip() or f"{command} keluar dengan kode {completed.returncode}"
+    return None
+
+
+def reopen_configured():
+    """Rotasi dengan rename hanya aman bila Snort bisa diminta membuka file log baru."""
+    return bool(getattr(settings, "SNORT_ROTATE_REOPEN_COMMAND", ""))
+
+
+def ready_to_seal(path, delay=None, now=None, reopened=False):
+    """File rollover aman disegel: penulis sudah pindah ke file aktif baru
+    (file itu berisi data, atau `reopened` setelah reopen_writer berhasil) dan
+    file rollover tidak berubah selama `delay` detik."""
+    delay = delay if delay is not None else getattr(settings, "SNORT_ROTATE_SEAL_DELAY", 60)
+    try:
+        stats = os.stat(path)
+    except OSError:
+        return False
+    moved = reopened
+    if not moved:
+        try:
+            moved = os.path.getsize(origin_path(path)) > 0
+        except OSError:
+            moved = True
+    return moved and (now or time.time()) - stats.st_mtime >= delay
+
+
+def seal_file(path, directory=None):
+    """Arsipkan file rollover (hasil rotate atau `limit` Snort) yang sudah tidak ditulis lagi lalu hapus."""
+    with open(path, "rb") as handle:
+        end = os.fstat(handle.fileno()).st_size
+        segment = write_segment(path, _iter_aligned_blocks(handle, end, include_partial=True), directory)
+    os.unlink(path)
+    return segment
+
+
+def rolled_files(path):
+    """File rollover Snort di samping path: '<nama>.<angka>'."""
+    directory = os.path.dirname(path) or "."
+    name = os.path.basename(path)
+    try:
+        entries = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(
+        os.path.join(directory, entry) for entry in entries
+        if entry.startswith(name + ".") and _ROLLED_SUFFIX.search(entry[len(name):])
+    )
+
+
+_segment_cache = {}
+_cache_lock = threading.Lock()
+
+
+def list_segments(directory=None):
+    """SegmentIndex semua segmen, terbaru dulu (sidecar di-cache per mtime)."""
+    directory = directory or archive_dir()
+    try:
+        entries = os.listdir(directory)
+    except OSError:
+        return []
+    segments = []
+    with _cache_lock:
+        for entry in entries:
+            if not entry.endswith(INDEX_SUFFIX):
+                continue
+            path = os.path.join(directory, entry)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            cached = _segment_cache.get(path)
+            if cached is None or cached[0] != mtime:
+                try:
+                    with open(path, "r", encoding="utf-8") as handle:
+                        cached = _segment_cache[path] = (mtime, SegmentIndex(path, json.load(handle)))
+                except (OSError, ValueError, KeyError):
+                    continue
+            segments.append(cached[1])
+    segments.sort(key=lambda segment: segment.last_ts or 0, reverse=True)
+    return segments
+
+
+def iter_archived_alerts(src_ip=None, dst_ip=None, sid=None, time_from=None, time_to=None,
+                         directory=None, decode_batch=decode_lines):
+    """Yield Alert dari arsip (terbaru dulu); segmen/blok yang pasti tidak cocok dilewati.
+
+    time_from/time_to berupa epoch detik.
+    """
+    for segment in list_segments(directory):
+        if not segment.may_contain(src_ip, dst_ip, sid, time_from, time_to):
+            continue
+        try:
+            for lines in segment.iter_blocks_reversed(time_from, time_to):
+                yield from decode_batch(lines)
+        except OSError:
+            continue
+
+
+def purge(directory=None, retention_days=None, now=None):
+    """Hapus segmen yang seluruh isinya lebih tua dari retensi."""
+    directory = directory or archive_dir()
+    retention_days = retention_days if retention_days is not None else getattr(
+        settings, "SNORT_ARCHIVE_RETENTION_DAYS", 180
+    )
+    if not retention_days:
+        return 0
+    cutoff = (now or time.time()) - retention_days * 86400
+    removed = 0
+    for segment in list_segments(directory):
+        if segment.last_ts is not None and segment.last_ts < cutoff:
+            for path in (segment.segment_path, segment.path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            removed += 1
+    _segment_cache.clear()
+    return removed
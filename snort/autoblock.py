@@ -0,0 +1,150 @@
+import datetime
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import ipset, ipsync
+from .models import AutoBlock
+
+# Pipeline autoblock: menghitung alert per IP sumber (dan per IP+SID) dalam
+# jendela geser, lalu memasukkan IP yang melewati ambang ke blocklist dengan
+# masa berlaku (TTL). Dijalankan di dalam command ingest_alerts.
+# Blocklist disinkronkan ke set nftables `inet snort` yang dibuang di chain
+# prerouting (ipsync.render_nft_table) sebelum aturan NFQUEUE; aturan dari
+# generate_nfq_topology memuat chain itu, jadi IP yang diblokir tidak lagi
+# diantrikan ke Snort.
+
+SLOTS = 12
+
+
+class SlidingWindowCounter:
+    """Hitungan per kunci dalam jendela `window` detik, dibagi `slots` sub-bucket.
+
+    Jumlah kunci dibatasi `max_keys` (LRU): kunci yang paling lama tidak
+    terlihat dibuang lebih dulu sehingga memori tetap terbatas saat scan
+    dari banyak IP.
+    """
+
+    def __init__(self, window, max_keys, slots=SLOTS):
+        self.window = window
+        self.slot_width = max(window / slots, 1)
+        self.max_keys = max_keys
+        self._keys = OrderedDict()
+
+    def add(self, key, when, amount=1):
+        """Tambah hitungan pada epoch `when` dan kembalikan total dalam jendela."""
+        slot = int(when // self.slot_width)
+        buckets = self._keys.get(key)
+        if buckets is None:
+            buckets = self._keys[key] = {}
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+        buckets[slot] = buckets.get(slot, 0) + amount
+        oldest = max(buckets) - int(self.window // self.slot_width) + 1
+        for stale in [s for s in buckets if s < oldest]:
+            del buckets[stale]
+        return sum(buckets.values())
+
+    def discard(self, key):
+        self._keys.pop(key, None)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class AutoBlocker:
+    def __init__(self, window=60, threshold=50, sid_threshold=20, ttl=3600, max_keys=100000):
+        self.window = window
+        self.threshold = threshold
+        self.sid_threshold = sid_threshold
+        self.ttl = ttl
+        self.by_ip = SlidingWindowCounter(window, max_keys)
+        self.by_ip_sid = SlidingWindowCounter(window, max_keys)
+        self._pending = {}
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            window=getattr(settings, "SNORT_AUTOBLOCK_WINDOW", 60),
+            threshold=getattr(settings, "SNORT_AUTOBLOCK_THRESHOLD", 50),
+            sid_threshold=getattr(settings, "SNORT_AUTOBLOCK_SID_THRESHOLD", 20),
+            ttl=getattr(settings, "SNORT_AUTOBLOCK_TTL", 3600),
+            max_keys=getattr(settings, "SNORT_AUTOBLOCK_MAX_TRACKED", 100000),
+        )
+
+    def observe(self, alerts, now=None):
+        """Hitung batch Alert (record dari decoder); alert lebih tua dari jendela diabaikan."""
+        now = (now or timezone.now()).timestamp()
+        horizon = now - self.window
+        for alert in alerts:
+            if alert.sort_key is None or alert.src_ip in (None, "", "N/A"):
+                continue
+            when = alert.sort_key.timestamp()
+            if when < horizon or alert.src_ip in self._pending:
+                continue
+            hits = self.by_ip.add(alert.src_ip, when)
+            if self.threshold and hits >= self.threshold:
+                self._pending[alert.src_ip] = (f"{hits} alert/{self.window}s", None, hits)
+                continue
+            if self.sid_threshold and alert.sid is not None:
+                sid_hits = self.by_ip_sid.add((alert.src_ip, alert.sid), when)
+                if sid_hits >= self.sid_threshold:
+                    self._pending[alert.src_ip] = (
+                        f"sid {alert.sid}: {sid_hits} alert/{self.window}s", alert.sid, sid_hits
+                    )
+
+    def flush(self, now=None):
+        """Masukkan kandidat ke blocklist lalu lepas blokir yang sudah kedaluwarsa.
+
+        Mengembalikan (jumlah diblokir, jumlah dilepas).
+        """
+        now = now or timezone.now()
+        blocked = self._promote(now)
+        released = expire(now)
+        return blocked, released
+
+    def _promote(self, now):
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        lists = ipset.current_lists()
+        active = set(AutoBlock.objects.filter(active=True, ip__in=list(pending)).values_list("ip", flat=True))
+
+        expires_at = now + datetime.timedelta(seconds=self.ttl)
+        blocks = []
+        for ip, (reason, sid, hits) in pending.items():
+            self.by_ip.discard(ip)
+            # IP di whitelist tidak pernah diblokir; yang sudah di blocklist tidak diulang
+            if ip in active or ipset.classify(ip, lists) is not None:
+                continue
+            blocks.append(AutoBlock(ip=ip, reason=reason, sid=sid, hits=hits, expires_at=expires_at))
+        if not blocks:
+            return 0
+
+        until = timezone.localtime(expires_at).strftime("%Y-%m-%d %H:%M")
+        result = ipsync.bulk_update(
+            "blocklist",
+            add=[f"{block.ip}  # autoblock {block.reason} s/d {until}" for block in blocks],
+        )
+        added = set(result.added)
+        blocks = [block for block in blocks if ipset.parse_network(block.ip) in added]
+        AutoBlock.objects.bulk_create(blocks)
+        return len(blocks)
+
+
+def expire(now=None):
+    """Hapus dari blocklist IP autoblock yang masa berlakunya habis."""
+    now = now or timezone.now()
+    due = list(AutoBlock.objects.filter(active=True, expires_at__lte=now))
+    if not due:
+        return 0
+    ipsync.bulk_update("blocklist", remove=[block.ip for block in due])
+    AutoBlock.objects.filter(pk__in=[block.pk for block in due]).update(active=False, released_at=now)
+    return len(due)
+
+
+def is_enabled():
+    return getattr(settings, "SNORT_AUTOBLOCK", False)
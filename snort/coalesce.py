@@ -0,0 +1,121 @@
+import collections
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from .alerts import Alert
+
+# Penggabungan alert identik untuk tampilan logs. Satu scan/flood
+# menghasilkan ribuan baris dengan (sid, IP sumber, IP tujuan, port tujuan,
+# action) yang sama; dalam tampilan digabung baris-baris itu menjadi satu
+# record dengan first_seen, last_seen dan count. Berjalan streaming di atas
+# iterator alert terbaru-dulu sehingga paginasi tetap malas.
+
+DEFAULT_WINDOW = 60
+MAX_WINDOW = 86400
+# (detik, label) pilihan jendela di halaman logs
+WINDOWS = ((10, "10 detik"), (60, "1 menit"), (300, "5 menit"), (3600, "1 jam"), (86400, "1 hari"))
+
+
+class CoalescedAlert(Alert):
+    """Alert terbaru dari satu grup; sort_key = last_seen, first_seen = alert tertua dalam grup."""
+
+    __slots__ = ("first_seen", "count")
+
+    @classmethod
+    def start(cls, alert):
+        group = cls(*(getattr(alert, name) for name in Alert.__slots__))
+        group.first_seen = alert.sort_key
+        group.count = 1
+        return group
+
+    @property
+    def last_seen(self):
+        return self.sort_key
+
+    @property
+    def first_timestamp(self):
+        if self.first_seen is None:
+            return "N/A"
+        return timezone.localtime(self.first_seen).strftime("%Y-%m-%d %H:%M:%S")
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in Alert.__slots__}
+        data["timestamp"] = self.timestamp
+        data["first_seen"] = self.first_timestamp
+        data["count"] = self.count
+        return data
+
+
+def window_from(params):
+    """Lebar jendela (detik) dari ?coalesce=<detik>, atau None untuk tampilan mentah."""
+    value = params.get("coalesce", "").strip()
+    if not value:
+        return None
+    if value.isdigit() and 0 < int(value) <= MAX_WINDOW:
+        return int(value)
+    return getattr(settings, "SNORT_COALESCE_WINDOW", DEFAULT_WINDOW)
+
+
+def window_choices(current=None):
+    choices = list(WINDOWS)
+    if current and all(seconds != current for seconds, _label in choices):
+        choices.append((current, f"{current} detik"))
+    return choices
+
+
+def _key(alert):
+    # Tanpa SID (format lain) signature menjadi pembeda rule
+    rule = (alert.gid, alert.sid) if alert.sid is not None else alert.signature
+    return (rule, alert.src_ip, alert.dst_ip, alert.dst_port, alert.action)
+
+
+def coalesce(alerts, window=DEFAULT_WINDOW):
+    """Gabungkan alert identik dari iterator terbaru-dulu menjadi CoalescedAlert.
+
+    Grup dimulai di alert terbaru dan menerima alert dengan kunci sama
+    sampai `window` detik lebih tua. Grup dilepas begitu stream melewati
+    jendelanya, sehingga hasil tetap urut last_seen terbaru-dulu dan memori
+    hanya sebanyak kunci berbeda dalam satu jendela.
+    """
+    span = datetime.timedelta(seconds=window)
+    # Urutan sisip = urutan last_seen menurun: grup terdepan selalu tutup lebih dulu
+    open_groups = {}
+    # Alert tanpa timestamp menunggu sampai grup yang dibuka sebelum dia tutup,
+    # agar tidak melompati grup yang lebih baru: (jumlah grup dibuka, alert)
+    pending = collections.deque()
+    opened = closed = 0
+    for alert in alerts:
+        when = alert.sort_key
+        if when is None:
+            if closed == opened:
+                yield CoalescedAlert.start(alert)
+            else:
+                pending.append((opened, CoalescedAlert.start(alert)))
+            continue
+        while open_groups:
+            key = next(iter(open_groups))
+            if open_groups[key].sort_key - when <= span:
+                break
+            yield open_groups.pop(key)
+            closed += 1
+            while pending and pending[0][0] <= closed:
+                yield pending.popleft()[1]
+        key = _key(alert)
+        group = open_groups.get(key)
+        if group is None:
+            open_groups[key] = CoalescedAlert.start(alert)
+            opened += 1
+            continue
+        group.count += 1
+        if when < group.first_seen:
+            group.first_seen = when
+        elif when > group.sort_key:
+            # Sedikit tidak urut antar file: perluas ke atas
+            group.sort_key = when
+    for group in open_groups.values():
+        yield group
+        closed += 1
+        while pending and pending[0][0] <= closed:
+            yield pending.popleft()[1]
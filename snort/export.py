@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+
+from django.utils import timezone
+
+# Ekspor alert terfilter secara streaming: alert dibaca dari generator dan
+# di-encode per batch sehingga hasil tidak pernah dimuat utuh ke memori.
+# Parquet memakai pyarrow bila terpasang.
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+    pq = None
+
+FIELDS = (
+    "timestamp", "action", "signature", "src_ip", "src_port", "dst_ip", "dst_port",
+    "protocol", "priority", "gid", "sid", "rev", "classification",
+)
+# Tampilan digabung (snort.coalesce): timestamp = last_seen
+COALESCED_FIELDS = FIELDS + ("first_seen", "count")
+_INT_FIELDS = frozenset(("src_port", "dst_port", "priority", "gid", "sid", "rev", "count"))
+_TIME_FIELDS = frozenset(("timestamp", "first_seen"))
+BATCH_ROWS = 1000
+# Satu row group Parquet per batch; terlalu kecil membuat file boros metadata
+PARQUET_BATCH_ROWS = 50000
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson; charset=utf-8", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def parquet_available():
+    return pyarrow is not None
+
+
+def _value(name, value):
+    if value in (None, "", "N/A"):
+        return None
+    if name in _INT_FIELDS and not isinstance(value, int):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return value
+
+
+def _row(alert, fields):
+    values = [_value(name, getattr(alert, name)) for name in fields[1:]]
+    return [alert.sort_key, *values]
+
+
+def _batches(alerts, size, fields=FIELDS):
+    batch = []
+    for alert in alerts:
+        batch.append(_row(alert, fields))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _isoformat(value):
+    return timezone.localtime(value).isoformat() if value is not None else None
+
+
+def _time_positions(fields):
+    return [position for position, name in enumerate(fields) if name in _TIME_FIELDS]
+
+
+def iter_csv(alerts, fields=FIELDS):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    positions = _time_positions(fields)
+    for batch in _batches(alerts, BATCH_ROWS, fields):
+        for row in batch:
+            for position in positions:
+                row[position] = _isoformat(row[position])
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Hanya header (tidak ada alert yang cocok)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(alerts, fields=FIELDS):
+    positions = _time_positions(fields)
+    for batch in _batches(alerts, BATCH_ROWS, fields):
+        lines = []
+        for row in batch:
+            for position in positions:
+                row[position] = _isoformat(row[position])
+            lines.append(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+        lines.append("")
+        yield "\n".join(lines).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """File tujuan ParquetWriter yang menampung byte sampai diambil oleh generator."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_schema(fields=FIELDS):
+    tz = str(timezone.get_current_timezone())
+    types = {name: pyarrow.timestamp("us", tz=tz) for name in _TIME_FIELDS}
+    types.update({name: pyarrow.int64() for name in _INT_FIELDS})
+    return pyarrow.schema([(name, types.get(name, pyarrow.string())) for name in fields])
+
+
+def iter_parquet(alerts, fields=FIELDS):
+    if pyarrow is None:
+        raise RuntimeError("Ekspor Parquet membutuhkan paket pyarrow.")
+    schema = _parquet_schema(fields)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in _batches(alerts, PARQUET_BATCH_ROWS, fields):
+            columns = [list(column) for column in zip(*batch)]
+            writer.write_batch(pyarrow.record_batch(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {"csv": iter_csv, "ndjson": iter_ndjson, "parquet": iter_parquet}
+
+
+def encode(fmt, alerts, coalesced=False):
+    """Generator bytes untuk format 'csv', 'ndjson' atau 'parquet'.
+
+    `coalesced`: alert berasal dari snort.coalesce (kolom first_seen & count).
+    """
+    return ENCODERS[fmt](alerts, COALESCED_FIELDS if coalesced else FIELDS)
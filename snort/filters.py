@@ -0,0 +1,264 @@
+import re
+from datetime import datetime, time as dt_time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import ipset
+from .sensors import LOCAL
+
+# Mesin filter halaman logs. Parameter request dikompilasi sekali menjadi
+# rantai predikat (yang paling murah dan paling selektif dulu) plus bentuk
+# push-down untuk sumber alert: needle bytes & rentang waktu untuk pembaca
+# file, IP persis untuk bloom filter arsip, dan kondisi untuk database.
+
+FIELDS = ("search", "signature", "src_ip", "dst_ip", "src_port", "dst_port",
+          "protocol", "action", "time_from", "time_to", "archive", "sensor")
+MIN_NEEDLE = 3
+_PORT_RANGE = re.compile(r"(\d+)(?:\s*-\s*(\d+))?")
+
+
+class IPMatcher:
+    """Satu atau beberapa IP/CIDR dipisah koma; host tunggal dibandingkan sebagai string."""
+
+    __slots__ = ("networks", "exact", "ipset")
+
+    def __init__(self, networks):
+        self.networks = networks
+        if all(network.num_addresses == 1 for network in networks):
+            self.exact = frozenset(str(network.network_address) for network in networks)
+            self.ipset = None
+        else:
+            self.exact = None
+            self.ipset = ipset.IPSet(networks)
+
+    def __call__(self, value):
+        if self.exact is not None:
+            return value in self.exact
+        return value in self.ipset
+
+    @property
+    def single(self):
+        """Alamat persis bila filter hanya satu host (untuk bloom filter/needle)."""
+        if self.exact is not None and len(self.exact) == 1:
+            return next(iter(self.exact))
+        return None
+
+    def prefixes(self):
+        """Prefix string IPv4 per oktet yang persis setara dengan CIDR, atau None (IPv6).
+
+        /20 menjadi 16 prefix '/24' seperti '10.0.16.' sehingga database bisa
+        memakai indeks dengan LIKE 'prefix%'.
+        """
+        prefixes = []
+        for network in self.networks:
+            if network.version != 4:
+                return None
+            aligned = -(-network.prefixlen // 8) * 8
+            for subnet in network.subnets(new_prefix=aligned):
+                octets = str(subnet.network_address).split(".")[:aligned // 8]
+                prefixes.append(".".join(octets) + "." if aligned < 32 else ".".join(octets))
+        return prefixes
+
+
+class PortMatcher:
+    """'80', '80,443', '1024-65535'."""
+
+    __slots__ = ("ranges",)
+
+    def __init__(self, ranges):
+        self.ranges = ranges
+
+    def __call__(self, value):
+        if not isinstance(value, int):
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                return False
+        for low, high in self.ranges:
+            if low <= value <= high:
+                return True
+        return False
+
+
+def _parse_ips(text):
+    networks = []
+    for item in text.split(","):
+        if item.strip():
+            network = ipset.parse_network(item)
+            if network is None:
+                return None
+            networks.append(network)
+    return IPMatcher(networks) if networks else None
+
+
+def _parse_ports(text):
+    ranges = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        match = _PORT_RANGE.fullmatch(item)
+        if match is None:
+            return None
+        low = int(match.group(1))
+        high = int(match.group(2)) if match.group(2) else low
+        if low > high or high > 65535:
+            return None
+        ranges.append((low, high))
+    return PortMatcher(ranges) if ranges else None
+
+
+def _parse_time(text, end_of_day=False):
+    """'2024-05-01T12:30' (datetime-local), '2024-05-01 12:30:00' atau '2024-05-01'."""
+    try:
+        day = parse_date(text)
+        if day is not None:
+            value = datetime.combine(day, dt_time.max if end_of_day else dt_time.min)
+        else:
+            value = parse_datetime(text)
+    except ValueError:
+        return None
+    if value is None:
+        return None
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.get_current_timezone())
+    return value
+
+
+def _literal(text):
+    """Teks yang pasti muncul apa adanya di baris mentah (ASCII, tanpa escape JSON)."""
+    return (len(text) >= MIN_NEEDLE and text.isascii() and '"' not in text and "\\" not in text
+            and text.lower() not in "n/a")
+
+
+class FilterSet:
+    """Hasil kompilasi filter: callable(alert) -> bool plus atribut push-down."""
+
+    def __init__(self, params):
+        self.params = params
+        self.errors = []
+        self.action = params.get("action", "")
+        self.sensor = params.get("sensor", "")
+        self.protocols = frozenset(p.strip().upper() for p in params.get("protocol", "").split(",") if p.strip())
+        self.src_ip = self._compile(params, "src_ip", _parse_ips, "IP sumber")
+        self.dst_ip = self._compile(params, "dst_ip", _parse_ips, "IP tujuan")
+        self.src_port = self._compile(params, "src_port", _parse_ports, "port sumber")
+        self.dst_port = self._compile(params, "dst_port", _parse_ports, "port tujuan")
+        self.time_from = self._compile(params, "time_from", _parse_time, "waktu mulai")
+        self.time_to = self._compile(params, "time_to", lambda text: _parse_time(text, end_of_day=True),
+                                     "waktu akhir")
+        self.search = params.get("search", "").lower()
+        self.signature = None
+        self.signature_regex = None
+        signature = params.get("signature", "")
+        if len(signature) > 2 and signature.startswith("/") and signature.endswith("/"):
+            try:
+                self.signature_regex = re.compile(signature[1:-1], re.IGNORECASE)
+            except re.error as exc:
+                self.errors.append(f"Regex signature tidak valid: {exc}")
+        elif signature:
+            self.signature = signature.lower()
+        self.predicates = self._build()
+
+    def _compile(self, params, name, parser, label):
+        text = params.get(name, "")
+        if not text:
+            return None
+        value = parser(text)
+        if value is None:
+            self.errors.append(f"Filter {label} tidak valid: {text}")
+        return value
+
+    def _build(self):
+        # Urutan: perbandingan string/int murah dulu, lalu CIDR, waktu, dan teks.
+        predicates = []
+        if self.skips_local:
+            # File log & arsip hanya berisi alert sensor lokal
+            predicates.append(lambda alert: False)
+        if self.action:
+            action = self.action
+            predicates.append(lambda alert: alert.action == action)
+        if self.protocols:
+            protocols = self.protocols
+            predicates.append(lambda alert: str(alert.protocol).upper() in protocols)
+        for field, matcher in (("src_ip", self.src_ip), ("dst_ip", self.dst_ip)):
+            if matcher is not None and matcher.exact is not None:
+                predicates.append(_field_predicate(field, matcher))
+        for field, matcher in (("src_port", self.src_port), ("dst_port", self.dst_port)):
+            if matcher is not None:
+                predicates.append(_field_predicate(field, matcher))
+        for field, matcher in (("src_ip", self.src_ip), ("dst_ip", self.dst_ip)):
+            if matcher is not None and matcher.exact is None:
+                predicates.append(_field_predicate(field, matcher))
+        if self.time_from is not None:
+            time_from = self.time_from
+            predicates.append(lambda alert: alert.sort_key is not None and alert.sort_key >= time_from)
+        if self.time_to is not None:
+            time_to = self.time_to
+            predicates.append(lambda alert: alert.sort_key is not None and alert.sort_key <= time_to)
+        if self.signature:
+            signature = self.signature
+            predicates.append(lambda alert: signature in str(alert.signature).lower())
+        if self.signature_regex is not None:
+            search_signature = self.signature_regex.search
+            predicates.append(lambda alert: search_signature(str(alert.signature)) is not None)
+        if self.search:
+            search = self.search
+            # Sama dengan store.query_alerts: teks utuh di salah satu field (signature / IP)
+            predicates.append(lambda alert: any(
+                value is not None and search in str(value).lower()
+                for value in (alert.signature, alert.src_ip, alert.dst_ip)
+            ))
+        return predicates
+
+    @property
+    def skips_local(self):
+        """Filter memilih sensor lain: file log lokal tidak perlu dibaca."""
+        return bool(self.sensor) and self.sensor != LOCAL
+
+    def __bool__(self):
+        return bool(self.predicates)
+
+    def __call__(self, alert):
+        for predicate in self.predicates:
+            if not predicate(alert):
+                return False
+        return True
+
+    def apply(self, alerts):
+        if not self.predicates:
+            return iter(alerts)
+        return filter(self, alerts)
+
+    @property
+    def needle(self):
+        """Regex bytes untuk pra-filter baris mentah sebelum decode, atau None.
+
+        Hanya dibuat bila setiap alert yang lolos pasti memuat teks itu di
+        barisnya: IP persis, potongan signature, atau teks search (yang harus
+        berada utuh di dalam satu field).
+        """
+        for matcher in (self.src_ip, self.dst_ip):
+            if matcher is not None and matcher.single:
+                return re.compile(re.escape(matcher.single.encode()))
+        candidates = [self.search] if _literal(self.search) else []
+        if self.signature and _literal(self.signature):
+            candidates.append(self.signature)
+        if not candidates:
+            return None
+        return re.compile(re.escape(max(candidates, key=len).encode()), re.IGNORECASE)
+
+
+def _field_predicate(field, matcher):
+    def predicate(alert):
+        return matcher(getattr(alert, field))
+    return predicate
+
+
+def extract_params(params):
+    return {name: params.get(name, "").strip() for name in FIELDS}
+
+
+def compile_filters(params):
+    return FilterSet(params)
@@ -0,0 +1,167 @@
+import heapq
+from collections import OrderedDict
+
+# Heavy hitters (top talker) per jendela waktu dengan algoritma Space-Saving:
+# tiap dimensi hanya menyimpan `capacity` penghitung per bucket waktu, jadi
+# memori terbatas berapa pun jumlah IP/port unik. Hitungan bisa lebih besar
+# dari nilai sebenarnya paling banyak `error` (<= total bucket / capacity).
+
+DIMENSIONS = ("src_ip", "dst_ip", "dst_port", "signature")
+DEFAULT_CAPACITY = 200
+# (lebar bucket detik, jumlah bucket yang disimpan)
+FINE_BUCKET = (300, 12)
+COARSE_BUCKET = (3600, 7 * 24)
+WINDOWS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+
+class SpaceSaving:
+    """Ringkasan Space-Saving: maksimal `capacity` kunci dengan (hitungan, error)."""
+
+    __slots__ = ("capacity", "counts", "errors", "total", "_heap")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # Heap (hitungan, kunci) dengan entri basi yang dibuang saat dibutuhkan
+        self._heap = []
+
+    def add(self, key, amount=1):
+        self.total += amount
+        counts = self.counts
+        if key in counts:
+            counts[key] += amount
+        elif len(counts) < self.capacity:
+            counts[key] = amount
+            self.errors[key] = 0
+        else:
+            # Ganti kunci dengan hitungan terkecil; hitungannya diwarisi sebagai error
+            floor, victim = self._pop_min()
+            del counts[victim]
+            del self.errors[victim]
+            counts[key] = floor + amount
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, item) for item, count in counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        heap, counts = self._heap, self.counts
+        while True:
+            count, key = heapq.heappop(heap)
+            if counts.get(key) == count:
+                return count, key
+
+    def merge(self, other):
+        """Gabungkan ringkasan lain (mis. bucket waktu lain) ke ringkasan ini."""
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+            self.errors[key] = self.errors.get(key, 0) + other.errors[key]
+        self.total += other.total
+        if len(self.counts) > self.capacity:
+            keep = heapq.nlargest(self.capacity, self.counts.items(), key=lambda item: item[1])
+            self.counts = dict(keep)
+            self.errors = {key: self.errors[key] for key in self.counts}
+        self._heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def top(self, limit):
+        items = heapq.nlargest(limit, self.counts.items(), key=lambda item: item[1])
+        return [(key, count, self.errors[key]) for key, count in items]
+
+    def to_dict(self):
+        return {"total": self.total, "items": [[key, count, self.errors[key]] for key, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data, capacity=DEFAULT_CAPACITY):
+        loaded = cls(len(data["items"]))
+        loaded.counts = {key: count for key, count, _error in data["items"]}
+        loaded.errors = {key: error for key, _count, error in data["items"]}
+        loaded.total = data["total"]
+        return cls(capacity).merge(loaded)
+
+
+class HeavyHitters:
+    """Ringkasan Space-Saving per dimensi per bucket waktu (5 menit & 1 jam)."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, dimensions=DIMENSIONS):
+        self.capacity = capacity
+        self.dimensions = dimensions
+        self._fine = OrderedDict()
+        self._coarse = OrderedDict()
+
+    def _bucket(self, buckets, width, epoch):
+        start = int(epoch // width) * width
+        summaries = buckets.get(start)
+        if summaries is None:
+            summaries = buckets[start] = {name: SpaceSaving(self.capacity) for name in self.dimensions}
+        return summaries
+
+    def add(self, alert):
+        if alert.sort_key is None:
+            return
+        epoch = alert.sort_key.timestamp()
+        fine = self._bucket(self._fine, FINE_BUCKET[0], epoch)
+        coarse = self._bucket(self._coarse, COARSE_BUCKET[0], epoch)
+        for name in self.dimensions:
+            value = getattr(alert, name)
+            if value in (None, "", "N/A"):
+                continue
+            fine[name].add(value)
+            coarse[name].add(value)
+
+    def prune(self, now_epoch):
+        for buckets, (width, keep) in ((self._fine, FINE_BUCKET), (self._coarse, COARSE_BUCKET)):
+            cutoff = now_epoch - width * keep
+            for start in [start for start in buckets if start + width <= cutoff]:
+                del buckets[start]
+
+    def top(self, window, now_epoch, limit=10):
+        """{dimensi: {"items": [(nilai, hitungan, error)], "total": n}} untuk jendela terakhir."""
+        seconds = WINDOWS[window]
+        buckets, width = (self._fine, FINE_BUCKET[0]) if seconds <= FINE_BUCKET[0] * FINE_BUCKET[1] \
+            else (self._coarse, COARSE_BUCKET[0])
+        since = now_epoch - seconds
+        merged = {name: SpaceSaving(self.capacity) for name in self.dimensions}
+        for start, summaries in buckets.items():
+            if start + width > since and start <= now_epoch:
+                for name, summary in summaries.items():
+                    merged[name].merge(summary)
+        return {name: {"items": summary.top(limit), "total": summary.total} for name, summary in merged.items()}
+
+    def merge(self, other):
+        """Tambahkan ringkasan HeavyHitters lain (mis. file rollover atau segmen arsip)."""
+        for buckets, others, width in ((self._fine, other._fine, FINE_BUCKET[0]),
+                                       (self._coarse, other._coarse, COARSE_BUCKET[0])):
+            for start, summaries in others.items():
+                target = self._bucket(buckets, width, start)
+                for name, summary in summaries.items():
+                    if name in target:
+                        target[name].merge(summary)
+        return self
+
+    def to_dict(self):
+        return {
+            kind: [[start, {name: summary.to_dict() for name, summary in summaries.items()}]
+                   for start, summaries in buckets.items()]
+            for kind, buckets in (("fine", self._fine), ("coarse", self._coarse))
+        }
+
+    @classmethod
+    def from_dict(cls, data, capacity=DEFAULT_CAPACITY):
+        hitters = cls(capacity)
+        for kind, buckets in (("fine", hitters._fine), ("coarse", hitters._coarse)):
+            for start, summaries in data.get(kind, []):
+                buckets[start] = {
+                    name: SpaceSaving.from_dict(summaries[name], capacity) if name in summaries
+                    else SpaceSaving(capacity)
+                    for name in hitters.dimensions
+                }
+        return hitters
+
+    def memory_slots(self):
+        """Batas atas jumlah penghitung yang disimpan (untuk ditampilkan di API)."""
+        return self.capacity * len(self.dimensions) * (FINE_BUCKET[1] + COARSE_BUCKET[1])
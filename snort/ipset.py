@@ -0,0 +1,220 @@
+import ipaddress
+import os
+import threading
+from bisect import bisect_right
+
+from django.conf import settings
+
+# Himpunan IP/CIDR untuk whitelist & blocklist. Tiap file di-parse menjadi
+# array rentang integer yang sudah diurutkan dan digabung per keluarga
+# alamat, sehingga cek keanggotaan cukup satu bisect (O(log n)).
+
+LIST_SETTINGS = {
+    "whitelist": "SNORT_IP_WHITELIST_PATH",
+    "blocklist": "SNORT_IP_BLOCKLIST_PATH",
+}
+# Sisa file sebelum offset lama yang dicocokkan ulang untuk mendeteksi append murni
+_TAIL_CHECK = 256
+
+
+def parse_network(text):
+    """'10.0.0.1', '10.0.0.0/8', '2001:db8::/32' -> ip_network, atau None bila tidak valid."""
+    try:
+        return ipaddress.ip_network(text.strip(), strict=False)
+    except ValueError:
+        return None
+
+
+def parse_address(text):
+    try:
+        return ipaddress.ip_address(str(text).strip().strip("[]"))
+    except ValueError:
+        return None
+
+
+class IPSet:
+    """Rentang [awal, akhir] terurut dan tidak tumpang tindih per versi IP."""
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self, networks=()):
+        self._starts = {4: [], 6: []}
+        self._ends = {4: [], 6: []}
+        self.update(networks)
+
+    def update(self, networks):
+        ranges = {4: list(zip(self._starts[4], self._ends[4])), 6: list(zip(self._starts[6], self._ends[6]))}
+        for network in networks:
+            ranges[network.version].append(
+                (int(network.network_address), int(network.broadcast_address))
+            )
+        for version, items in ranges.items():
+            starts, ends = [], []
+            for start, end in sorted(items):
+                if ends and start <= ends[-1] + 1:
+                    # Tumpang tindih atau bersebelahan: gabungkan
+                    if end > ends[-1]:
+                        ends[-1] = end
+                    continue
+                starts.append(start)
+                ends.append(end)
+            self._starts[version], self._ends[version] = starts, ends
+
+    def __contains__(self, address):
+        if not isinstance(address, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+            address = parse_address(address)
+            if address is None:
+                return False
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        value = int(address)
+        starts = self._starts[address.version]
+        idx = bisect_right(starts, value) - 1
+        return idx >= 0 and value <= self._ends[address.version][idx]
+
+    def __len__(self):
+        return len(self._starts[4]) + len(self._starts[6])
+
+    def address_count(self):
+        return sum(
+            end - start + 1
+            for version in (4, 6)
+            for start, end in zip(self._starts[version], self._ends[version])
+        )
+
+
+class ListEntry:
+    __slots__ = ("ip", "note", "network", "line", "created_at")
+
+    def __init__(self, ip, note, network, line):
+        self.ip = ip
+        self.note = note
+        self.network = network
+        self.line = line
+        self.created_at = None
+
+
+def parse_line(raw, number):
+    """Satu baris file list: '<ip/cidr> [# keterangan]'; komentar penuh dilewati."""
+    text = raw.strip()
+    if not text or text.startswith("#"):
+        return None, False
+    value, _, note = text.partition("#")
+    value = value.strip().split()[0] if value.strip() else ""
+    network = parse_network(value)
+    if network is None:
+        return None, True
+    return ListEntry(str(network) if network.num_addresses > 1 else str(network.network_address),
+                     note.strip(), network, number), False
+
+
+class IPList:
+    """Isi satu file list + IPSet-nya; dimuat ulang saat file berubah."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        self.invalid = 0
+        self.ipset = IPSet()
+        self._keys = set()
+        self._stat_key = None
+        self._lines = 0
+        self._tail = b""
+
+    def _reset(self):
+        self.entries, self.invalid, self.ipset, self._keys = [], 0, IPSet(), set()
+        self._lines, self._tail = 0, b""
+
+    def refresh(self):
+        try:
+            stats = os.stat(self.path)
+        except OSError:
+            self._reset()
+            self._stat_key = None
+            return self
+        key = (stats.st_dev, stats.st_ino, stats.st_size, stats.st_mtime_ns)
+        if key == self._stat_key:
+            return self
+
+        old = self._stat_key
+        with open(self.path, "rb") as handle:
+            appended = False
+            if old and old[:2] == key[:2] and stats.st_size > old[2] and self._tail:
+                # File yang sama hanya bertambah: cukup parse bagian baru
+                handle.seek(old[2] - len(self._tail))
+                appended = handle.read(len(self._tail)) == self._tail
+            if not appended:
+                self._reset()
+                handle.seek(0)
+                start = 0
+            else:
+                start = old[2]
+            data = handle.read(stats.st_size - start)
+        self._consume(data, start)
+        self._stat_key = key
+        return self
+
+    def _consume(self, data, start):
+        new_networks = []
+        number = self._lines
+        for raw in data.decode("utf-8", errors="ignore").splitlines():
+            number += 1
+            entry, invalid = parse_line(raw, number)
+            if invalid:
+                self.invalid += 1
+            if entry is None:
+                continue
+            if entry.network in self._keys:
+                continue
+            self._keys.add(entry.network)
+            self.entries.append(entry)
+            new_networks.append(entry.network)
+        self._lines = number
+        if new_networks:
+            self.ipset.update(new_networks)
+        if data.endswith(b"\n"):
+            self._tail = ((self._tail if start else b"") + data)[-_TAIL_CHECK:]
+        else:
+            # Baris terakhir tanpa newline bisa berubah saat di-append: muat penuh lain kali
+            self._tail = b""
+
+    def __contains__(self, address):
+        return address in self.ipset
+
+    def covering(self, address):
+        """Entri yang memuat alamat (untuk ditampilkan); cek cepat lewat ipset dulu."""
+        address = parse_address(address)
+        if address is None or address not in self.ipset:
+            return []
+        # Sama seperti IPSet: ::ffff:a.b.c.d dicocokkan dengan entri IPv4
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        return [entry for entry in self.entries if entry.network.version == address.version
+                and address in entry.network]
+
+
+_lists = {}
+_lock = threading.Lock()
+
+
+def get_list(kind):
+    """IPList terbaru untuk 'whitelist' atau 'blocklist' sesuai settings."""
+    path = getattr(settings, LIST_SETTINGS[kind], "")
+    with _lock:
+        ip_list = _lists.get(kind)
+        if ip_list is None or ip_list.path != path:
+            ip_list = _lists[kind] = IPList(path)
+        return ip_list.refresh()
+
+
+def current_lists():
+    return {kind: get_list(kind) for kind in LIST_SETTINGS}
+
+
+def classify(address, lists=None):
+    """'whitelist', 'blocklist' atau None untuk satu alamat (whitelist didahulukan)."""
+    lists = lists or current_lists()
+    for kind in ("whitelist", "blocklist"):
+        if address in lists[kind]:
+            return kind
+    return None
@@ -0,0 +1,222 @@
+import fcntl
+import os
+import subprocess
+import tempfile
+from contextlib import contextmanager, suppress
+
+from django.conf import settings
+
+from . import ipset
+
+# Update massal whitelist/blocklist: file list ditulis atomik (file sementara
+# lalu os.replace) dan perubahan blocklist diterjemahkan menjadi delta set
+# nftables sehingga data plane bisa diperbarui tanpa me-restart Snort.
+
+NFT_CHUNK = 1000
+
+
+class UpdateResult:
+    __slots__ = ("kind", "added", "removed", "invalid", "total", "delta_path", "applied", "error")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.added = []
+        self.removed = []
+        self.invalid = []
+        self.total = 0
+        self.delta_path = None
+        self.applied = False
+        self.error = None
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "added": len(self.added), "removed": len(self.removed),
+            "invalid": self.invalid[:100], "invalid_count": len(self.invalid),
+            "total": self.total, "delta_path": self.delta_path,
+            "applied": self.applied, "error": self.error,
+        }
+
+
+def list_path(kind):
+    return getattr(settings, ipset.LIST_SETTINGS[kind], "")
+
+
+def parse_items(items, note=""):
+    """Dict network -> ListEntry (urutan input) dan daftar item yang tidak valid."""
+    entries = {}
+    invalid = []
+    for raw in items:
+        entry, is_invalid = ipset.parse_line(str(raw), 0)
+        if is_invalid:
+            invalid.append(str(raw).strip())
+        if entry is None or entry.network in entries:
+            continue
+        if note and not entry.note:
+            entry.note = note
+        entries[entry.network] = entry
+    return entries, invalid
+
+
+@contextmanager
+def _locked(path):
+    # Serialisasi penulis antar proses (command, view, autoblock)
+    with open(path + ".lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def write_atomic(path, lines):
+    """Tulis ke file sementara di direktori yang sama lalu rename; pembaca tidak pernah melihat file setengah jadi."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.writelines(lines)
+            handle.flush()
+            os.fsync(handle.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except OSError:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def _format_entry(entry):
+    return f"{entry.ip}  # {entry.note}\n" if entry.note else f"{entry.ip}\n"
+
+
+def bulk_update(kind, add=(), remove=(), replace=False, note="", apply=None):
+    """Tambah/hapus banyak IP/CIDR sekaligus.
+
+    `replace=True` mengganti seluruh isi list dengan `add` (komentar di file
+    dipertahankan). Untuk blocklist, delta nftables ditulis ke
+    '<list>.delta.nft' dan snapshot penuh ke '<list>.nft'.
+    """
+    path = list_path(kind)
+    if not path:
+        raise ValueError(f"Path {kind} belum diatur di settings.")
+    result = UpdateResult(kind)
+    additions, result.invalid = parse_items(add, note)
+    removals, invalid_removals = parse_items(remove)
+    result.invalid.extend(invalid_removals)
+
+    with _locked(path):
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+                original = handle.readlines()
+        except FileNotFoundError:
+            original = []
+
+        kept = []
+        current = {}
+        for raw in original:
+            entry, _ = ipset.parse_line(raw, 0)
+            if entry is not None:
+                drop = entry.network in removals or (replace and entry.network not in additions)
+                if drop or entry.network in current:
+                    if drop:
+                        result.removed.append(entry.network)
+                    continue
+                current[entry.network] = entry
+            kept.append(raw if raw.endswith("\n") else raw + "\n")
+
+        for network, entry in additions.items():
+            if network not in current:
+                current[network] = entry
+                result.added.append(network)
+                kept.append(_format_entry(entry))
+
+        result.removed = list(dict.fromkeys(result.removed))
+        result.total = len(current)
+        if result.added or result.removed:
+            write_atomic(path, kept)
+            if kind == "blocklist":
+                _sync_nftables(path, result, list(current), apply)
+    return result
+
+
+def _nft_item(network):
+    if network.prefixlen == network.max_prefixlen:
+        return str(network.network_address)
+    return str(network)
+
+
+def _nft_sets():
+    return {4: getattr(settings, "SNORT_NFT_SET_V4", "blocklist_v4"),
+            6: getattr(settings, "SNORT_NFT_SET_V6", "blocklist_v6")}
+
+
+def render_nft_table():
+    """Tabel, set blocklist (interval) dan chain drop-nya; idempoten, aman diulang di tiap transaksi."""
+    table = getattr(settings, "SNORT_NFT_TABLE", "inet snort")
+    sets = _nft_sets()
+    lines = [f"table {table} {{\n"]
+    for version, name in sets.items():
+        lines.append(f"    set {name} {{ type ipv{version}_addr; flags interval; auto-merge; }}\n")
+    # prerouting: paket dari/ke IP terblokir dibuang sebelum sampai ke NFQUEUE Snort di forward
+    lines.append("    chain blocklist {\n")
+    lines.append("        type filter hook prerouting priority -150; policy accept;\n")
+    lines.append("    }\n")
+    lines.append("}\n")
+    # Chain dikosongkan lalu diisi ulang agar aturan tidak berlipat tiap kali dijalankan
+    lines.append(f"flush chain {table} blocklist\n")
+    for version, name in sets.items():
+        family = "ip" if version == 4 else "ip6"
+        for field in ("saddr", "daddr"):
+            lines.append(f"add rule {table} blocklist {family} {field} @{name} drop\n")
+    return lines
+
+
+def render_nft(current, added=(), removed=(), full=False):
+    """Perintah `nft -f` untuk set blocklist v4/v6; satu file = satu transaksi.
+
+    Tabel dan set dibuat lebih dulu bila belum ada. Set dengan elemen yang
+    dihapus diisi ulang dari `current` (flush + add): `delete element` untuk
+    CIDR yang sudah digabung nft ke interval lebih besar (auto-merge) gagal
+    dan membatalkan seluruh transaksi.
+    """
+    table = getattr(settings, "SNORT_NFT_TABLE", "inet snort")
+    lines = render_nft_table()
+    for version, name in _nft_sets().items():
+        if full or any(network.version == version for network in removed):
+            lines.append(f"flush set {table} {name}\n")
+            networks = current
+        else:
+            networks = added
+        items = [_nft_item(network) for network in networks if network.version == version]
+        for start in range(0, len(items), NFT_CHUNK):
+            chunk = ", ".join(items[start:start + NFT_CHUNK])
+            lines.append(f"add element {table} {name} {{ {chunk} }}\n")
+    return lines
+
+
+def _sync_nftables(path, result, networks, apply):
+    write_atomic(path + ".nft", render_nft(networks, full=True))
+    result.delta_path = path + ".delta.nft"
+    write_atomic(result.delta_path, render_nft(networks, result.added, result.removed))
+
+    if apply is None:
+        apply = getattr(settings, "SNORT_NFT_APPLY", False)
+    if apply:
+        result.applied, result.error = apply_nft(result.delta_path)
+
+
+def apply_nft(script_path):
+    binary = getattr(settings, "SNORT_NFT_BINARY", "nft")
+    try:
+        completed = subprocess.run(
+            [binary, "-f", script_path], capture_output=True, text=True, timeout=60,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        return False, str(exc)
+    if completed.returncode != 0:
+        return False, completed.stderr.strip() or f"nft keluar dengan kode {completed.returncode}"
+    return True, None
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+from collections import Counter
+
+from django.utils import timezone
+
+from . import logfiles
+from .alerts import decode_lines
+
+# Siaran alert live (Server-Sent Events) untuk deployment ASGI.
+# Satu tailer per proses membaca baris baru sekali lalu membagikannya ke
+# semua klien yang terhubung, bukan tiap klien membaca ulang file.
+
+POLL_INTERVAL = 0.5
+QUEUE_SIZE = 256
+MAX_ALERTS_PER_EVENT = 200
+MAX_READ_PER_POLL = 4 * 1024 * 1024
+HEARTBEAT_INTERVAL = 15
+# Koneksi ditutup berkala; EventSource otomatis menyambung ulang. Ini juga
+# membersihkan subscriber bila server ASGI tidak memberi tahu klien putus.
+STREAM_MAX_AGE = 300
+WEEKDAY_LABELS = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+
+class _FileTail:
+    """Ikuti satu file dari EOF seperti `tail -F`; tangani rotasi (inode baru) dan truncate.
+
+    Handle file tetap terbuka, jadi setelah file di-rename sisa baris yang
+    masih ditulis ke inode lama dibaca habis sebelum pindah ke file baru.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.handle = None
+        self.offset = 0
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+        self.handle = None
+
+    def read_new(self, path):
+        try:
+            stats = os.stat(path)
+        except OSError:
+            stats = None
+
+        if path != self.path or self.handle is None:
+            self.close()
+            if stats is None:
+                return []
+            # Klien live hanya butuh alert baru: mulai dari akhir file
+            self.path, self.offset = path, stats.st_size
+            self.handle = self._open(path)
+            return []
+
+        current = os.fstat(self.handle.fileno())
+        if current.st_size < self.offset:
+            self.offset = 0
+        drained = current.st_size - self.offset <= MAX_READ_PER_POLL
+        lines = self._read(current.st_size)
+        if (drained and stats is not None and stats.st_size
+                and (stats.st_ino, stats.st_dev) != (current.st_ino, current.st_dev)):
+            # Dirotasi dan Snort sudah menulis ke file baru: inode lama dibaca habis dulu
+            self.close()
+            self.handle, self.offset = self._open(path), 0
+            if self.handle is not None:
+                lines += self._read(stats.st_size)
+        return lines
+
+    @staticmethod
+    def _open(path):
+        try:
+            return open(path, "rb")
+        except OSError:
+            return None
+
+    def _read(self, size):
+        if size <= self.offset:
+            return []
+        self.handle.seek(self.offset)
+        data = self.handle.read(min(size - self.offset, MAX_READ_PER_POLL))
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            return []
+        self.offset += cut + 1
+        return data[:cut + 1].splitlines()
+
+
+def _current_log_path():
+    return next(logfiles.iter_existing_files(), None)
+
+
+def build_events(alerts):
+    """Event 'alerts' (baris baru) dan 'delta' (penambahan untuk grafik dashboard)."""
+    now = timezone.localtime()
+    today = now.date()
+    week_start = today.toordinal() - 6
+    hours = {"alert": Counter(), "drop": Counter()}
+    weekdays = {"alert": Counter(), "drop": Counter()}
+    for alert in alerts:
+        if alert.sort_key is None:
+            continue
+        local = timezone.localtime(alert.sort_key)
+        if local.date() == today:
+            hours[alert.action][f"{local.hour:02d}.00"] += 1
+        if local.date().toordinal() >= week_start:
+            weekdays[alert.action][WEEKDAY_LABELS[local.weekday()]] += 1
+
+    newest_first = alerts[::-1][:MAX_ALERTS_PER_EVENT]
+    rows = []
+    for alert in newest_first:
+        row = alert.as_dict()
+        row.pop("sort_key", None)
+        rows.append(row)
+    return [
+        ("alerts", rows),
+        ("delta", {"total": len(alerts), "hour": hours, "weekday": weekdays}),
+    ]
+
+
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class AlertBroadcaster:
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._subscribers = set()
+        self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, message):
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Klien lambat: buang event tertua agar tailer tidak ikut tertahan
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(message)
+
+    async def _run(self):
+        tail = _FileTail()
+        while True:
+            path = await asyncio.to_thread(_current_log_path)
+            lines = await asyncio.to_thread(tail.read_new, path) if path else []
+            if lines:
+                alerts = await asyncio.to_thread(decode_lines, lines)
+                if alerts:
+                    for name, data in build_events(alerts):
+                        self._publish(format_event(name, data))
+            await asyncio.sleep(self.poll_interval)
+
+
+_broadcasters = {}
+
+
+def get_broadcaster():
+    """Satu broadcaster per event loop (per proses worker ASGI)."""
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        _broadcasters.clear()
+        broadcaster = _broadcasters[loop] = AlertBroadcaster()
+    return broadcaster
+
+
+async def event_stream(max_age=STREAM_MAX_AGE, heartbeat=HEARTBEAT_INTERVAL):
+    broadcaster = get_broadcaster()
+    queue = broadcaster.subscribe()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    try:
+        yield "retry: 3000\n\n"
+        while loop.time() < deadline:
+            try:
+                message = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                message = ": ping\n\n"
+            yield message
+    finally:
+        broadcaster.unsubscribe(queue)
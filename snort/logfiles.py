@@ -0,0 +1,123 @@
+import os
+
+from django.conf import settings
+
+from . import archive, topology
+
+# Penemuan file log alert Snort: kandidat dari settings, salinan per queue
+# NFQUEUE dan file rollover yang belum disegel. Dipakai view logs, daemon
+# ingest_alerts, rotate_logs dan stream live tanpa harus mengimpor snort.views.
+
+
+def candidate_paths():
+    candidates = [
+        getattr(settings, "SNORT_LOG_JSON_PATH", ""),
+        getattr(settings, "SNORT_LOG_PATH", ""),
+        getattr(settings, "SNORT_LOG_FAST_PATH", ""),
+        "/var/log/snort/alert_json.txt",
+        "/var/log/snort/alert_fast.txt",
+    ]
+    seen = set()
+    ordered = []
+    for path in candidates:
+        if path and path not in seen:
+            seen.add(path)
+            ordered.append(path)
+    return ordered
+
+
+def iter_existing_files():
+    for candidate in candidate_paths():
+        for path in resolve_candidate_files(candidate):
+            yield path
+
+
+def resolve_candidate_files(candidate):
+    if os.path.isdir(candidate):
+        try:
+            entries = sorted(os.listdir(candidate))
+        except (FileNotFoundError, PermissionError):
+            return []
+        files = [os.path.join(candidate, name) for name in entries if os.path.isfile(os.path.join(candidate, name))]
+        try:
+            files.sort(key=lambda p: os.path.getmtime(p), reverse=True)
+        except OSError:
+            files.sort(reverse=True)
+        return files
+    # Topologi multi-queue: salinan per queue di <dir>/<queue>/<nama file>
+    queued = [path for _queue, path in topology.queue_files(candidate)]
+    if os.path.exists(candidate):
+        return [candidate] + queued
+    return queued
+
+
+def all_files():
+    files = []
+    seen = set()
+    for candidate in candidate_paths():
+        for path in resolve_candidate_files(candidate):
+            if path not in seen:
+                seen.add(path)
+                files.append(path)
+    return files
+
+
+def ingest_files():
+    """Satu format per lokasi log untuk ingest: alert_json bila ada, selain itu alert_fast.
+
+    alert_json dan alert_fast di direktori yang sama berisi alert yang sama;
+    membaca keduanya membuat tiap alert tersimpan (dan terhitung) dua kali.
+    """
+    chosen = {}
+    archived = {segment.origin for segment in archive.list_segments()}
+    for candidate in candidate_paths():
+        # Lokasi = direktori tiap file (termasuk subdirektori per queue NFQUEUE)
+        by_location = {}
+        for path in resolve_candidate_files(candidate):
+            by_location.setdefault(os.path.dirname(path), []).append(path)
+        for location, files in by_location.items():
+            current = chosen.get(location)
+            # Kandidat urut JSON dulu; format berikutnya hanya dipakai bila yang terpilih kosong
+            # (file rollover dan segmen arsip ikut dihitung: file aktif kosong setelah rotasi)
+            if current is None or (not _any_data(current, archived) and _any_data(files, archived)):
+                chosen[location] = files
+    files = []
+    seen = set()
+    for paths in chosen.values():
+        for path in paths:
+            # File rollover yang belum disegel dibaca lebih dulu (isinya lebih lama)
+            for item in archive.rolled_files(path) + [path]:
+                if item not in seen:
+                    seen.add(item)
+                    files.append(item)
+    return files
+
+
+def scan_files():
+    """File dari kandidat pertama yang berisi alert: seluruh isi direktori, atau file + rollover-nya.
+
+    Kandidat lain (mis. alert_fast di samping alert_json) berisi alert yang
+    sama dalam format lain sehingga tidak ikut dibaca.
+    """
+    for candidate in candidate_paths():
+        files = resolve_candidate_files(candidate)
+        if os.path.isfile(candidate):
+            files = files + archive.rolled_files(candidate)
+        files = [path for path in files if has_data(path)]
+        if files:
+            return files
+    return []
+
+
+def _any_data(paths, archived):
+    return any(
+        path in archived or any(has_data(item) for item in [path] + archive.rolled_files(path))
+        for path in paths
+    )
+
+
+def has_data(path):
+    try:
+        return os.path.getsize(path) > 0
+    except OSError:
+        return False
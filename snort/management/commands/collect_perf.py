@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from snort import perf
+
+
+COMPACT_INTERVAL = 3600
+# Berapa lama (detik) timestamp yang sudah disimpan diingat untuk menggabungkan
+# record thread/queue lain yang datang di polling berikutnya
+LATE_HORIZON = 3600
+
+
+class Command(BaseCommand):
+    help = "Ikuti file perf_monitor Snort 3 dan simpan statistik data-plane (downsample menit/jam) ke PerfSample."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=None, help="Direktori perf_monitor (default: SNORT_PERF_DIR).")
+        parser.add_argument("--follow", action="store_true", help="Jalan terus seperti 'tail -f'.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Jeda polling dalam detik (mode --follow).")
+
+    def handle(self, *args, **options):
+        reset = getattr(settings, "SNORT_PERF_RESET", True)
+        files = {}
+        # File dibaca dari awal saat command mulai; titik yang tersimpan sebelum start dilewati
+        watermark = perf.last_persisted()
+        latest = watermark
+        persisted = set()
+        last_compact = 0
+
+        while True:
+            paths = perf.perf_files(options["dir"])
+            records = []
+            for path in paths:
+                state = files.get(path)
+                if state is None:
+                    state = files[path] = perf.PerfFile(path)
+                records.extend(state.read(reset=reset))
+            for path in set(files) - set(paths):
+                del files[path]
+
+            if watermark is not None:
+                records = [record for record in records if record[0] > watermark]
+            points = perf.build_points(records, latest)
+            if points:
+                # File thread/queue lain bisa menyusul untuk timestamp yang sudah disimpan:
+                # digabung ke bucket yang sama, bukan dibuang
+                partial = {point.timestamp for point in points if point.timestamp in persisted}
+                with transaction.atomic():
+                    perf.persist(points, partial)
+                persisted.update(point.timestamp for point in points)
+                latest = max(latest or points[-1].timestamp, points[-1].timestamp)
+                persisted = {timestamp for timestamp in persisted if timestamp > latest - LATE_HORIZON}
+                self.stdout.write(f"{len(points)} titik perf_monitor disimpan dari {len(paths)} file")
+
+            if time.monotonic() - last_compact >= COMPACT_INTERVAL:
+                perf.compact()
+                last_compact = time.monotonic()
+
+            if not options["follow"]:
+                if not paths:
+                    self.stdout.write(self.style.WARNING("Tidak ada file perf_monitor ditemukan."))
+                self.stdout.write(self.style.SUCCESS("Selesai."))
+                return
+            time.sleep(options["interval"])
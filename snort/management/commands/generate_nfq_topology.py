@@ -0,0 +1,72 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from snort import topology
+
+
+class Command(BaseCommand):
+    help = (
+        "Buat konfigurasi inline multi-queue dari jumlah core host: aturan NFQUEUE queue-balance "
+        "(nftables/iptables), unit systemd Snort (satu proses multi-thread atau satu unit per queue) "
+        "dan potongan snort.lua. File hanya ditulis, tidak diterapkan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queues", type=int, default=None,
+                            help="Jumlah NFQUEUE / packet thread (default: core tersedia, sisakan 1 bila > 2).")
+        parser.add_argument("--reserve-cores", type=int, default=1)
+        parser.add_argument("--first-queue", type=int, default=0)
+        parser.add_argument("--mode", choices=topology.MODES, default="threads",
+                            help="threads = satu proses --max-packet-threads N; units = snort@<queue>.service.")
+        parser.add_argument("--firewall", choices=topology.FIREWALLS, default="nftables")
+        parser.add_argument("--wan", default=os.environ.get("WAN_IF", "ens33"))
+        parser.add_argument("--lan", default=os.environ.get("LAN_IF", "ens37"))
+        parser.add_argument("--log-dir", default=None,
+                            help="Direktori log Snort (default: direktori SNORT_LOG_JSON_PATH).")
+        parser.add_argument("--config", default="/usr/local/etc/snort/snort.lua")
+        parser.add_argument("--rules", default="/opt/IDPS-Snort3-NFQueu/service/snort/local.rules")
+        parser.add_argument("--queue-maxlen", type=int, default=topology.DEFAULT_QUEUE_MAXLEN)
+        parser.add_argument("--alert-format", choices=topology.ALERT_FORMATS, default="json",
+                            help="Logger alert tiap instance (alert_json atau alert_fast, tidak keduanya).")
+        parser.add_argument("--output", default=None, help="Direktori tujuan; tanpa opsi ini file dicetak ke stdout.")
+
+    def handle(self, *args, **options):
+        cores = topology.available_cores()
+        queues = options["queues"] or topology.default_queue_count(cores, options["reserve_cores"])
+        log_dir = options["log_dir"] or os.path.dirname(getattr(settings, "SNORT_LOG_JSON_PATH", "/var/log/snort/x"))
+        try:
+            topo = topology.Topology(
+                queues, first_queue=options["first_queue"], mode=options["mode"], firewall=options["firewall"],
+                wan_if=options["wan"], lan_if=options["lan"], log_dir=log_dir, config=options["config"],
+                rules=options["rules"] or None, queue_maxlen=options["queue_maxlen"], cores=cores,
+                alert_format=options["alert_format"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        files = topo.render()
+        output = options["output"]
+        if output:
+            for name, content in files.items():
+                path = os.path.join(output, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(content)
+                if name.endswith((".sh", ".nft")):
+                    os.chmod(path, 0o755)
+                self.stdout.write(f"  {path}")
+        else:
+            for name, content in files.items():
+                self.stdout.write(f"# ===== {name} =====\n{content}")
+
+        firewall_file, _ = topo.firewall_rules()
+        unit = "snort.service" if topo.mode == "threads" else "snort-nfq.target"
+        self.stdout.write(self.style.SUCCESS(
+            f"{topo.queues} queue ({topo.queue_range}) di {cores} core, mode {topo.mode}. "
+            f"Salin unit ke /etc/systemd/system/, {os.path.basename(topo.lua_path)} ke "
+            f"{os.path.dirname(topo.lua_path)}/, terapkan {firewall_file}, lalu "
+            f"`systemctl daemon-reload && systemctl restart {unit}`. IP blocklist dibuang sebelum NFQUEUE; "
+            f"isi set dimuat dengan `nft -f {getattr(settings, 'SNORT_IP_BLOCKLIST_PATH', 'blocklist.txt')}.nft`."
+        ))
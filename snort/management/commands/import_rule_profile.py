@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from snort import rule_profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Impor tabel rule profiler Snort 3 (stdout/journal, mis. "
+        "`journalctl -u snort --since today | manage.py import_rule_profile -`) sebagai snapshot biaya rule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File keluaran profiler, atau '-' untuk stdin.")
+        parser.add_argument("--source", default=None, help="Label snapshot (default: nama file).")
+        parser.add_argument(
+            "--keep", type=int, default=rule_profile.DEFAULT_KEEP,
+            help="Jumlah snapshot terakhir yang disimpan (0 = semua).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        source = options["source"] or ("stdin" if path == "-" else path)
+        try:
+            if path == "-":
+                snapshot = rule_profile.import_profile(sys.stdin, source=source, keep=options["keep"])
+            else:
+                with open(path, "r", encoding="utf-8", errors="replace") as handle:
+                    snapshot = rule_profile.import_profile(handle, source=source, keep=options["keep"])
+        except OSError as exc:
+            raise CommandError(f"Gagal membaca {path}: {exc}")
+        except rule_profile.ProfileError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot #{snapshot.id}: {snapshot.rule_count} rule, total {snapshot.total_time_us} us."
+        ))
@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+
+from snort import autoblock, rollup
+from snort.logfiles import ingest_files
+from snort.store import DEFAULT_BATCH_SIZE, ingest_path
+
+
+COMPACT_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = "Ikuti file alert Snort (alert_json/alert_fast) dan bulk-insert ke tabel Alert terindeks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="File log yang diikuti (boleh diulang). Default: satu format per lokasi log "
+                 "(alert_json, atau alert_fast bila tidak ada).",
+        )
+        parser.add_argument("--follow", action="store_true", help="Jalan terus seperti 'tail -f'.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Jeda polling dalam detik (mode --follow).")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--autoblock", action="store_true",
+            help="Aktifkan pipeline autoblock walau SNORT_AUTOBLOCK tidak diset.",
+        )
+
+    def handle(self, *args, **options):
+        last_compact = 0
+        blocker = None
+        if options["autoblock"] or autoblock.is_enabled():
+            blocker = autoblock.AutoBlocker.from_settings()
+        on_records = blocker.observe if blocker else None
+
+        while True:
+            try:
+                total = self._ingest_pass(options, blocker, on_records)
+                if time.monotonic() - last_compact >= COMPACT_INTERVAL:
+                    # Downsampling: buang rollup menit/jam yang lewat retensi
+                    rollup.compact()
+                    last_compact = time.monotonic()
+            except OperationalError as exc:
+                # Database sibuk (mis. SQLite terkunci proses lain): transaksi sudah di-rollback,
+                # cursor tidak maju, jadi putaran berikutnya membaca ulang byte yang sama
+                if not options["follow"]:
+                    raise
+                self.stderr.write(f"Database sibuk, dicoba lagi: {exc}")
+                time.sleep(options["interval"])
+                continue
+
+            if not options["follow"]:
+                self.stdout.write(self.style.SUCCESS(f"Selesai, {total} alert disimpan."))
+                return
+            if not total:
+                time.sleep(options["interval"])
+
+    def _ingest_pass(self, options, blocker, on_records):
+        paths = options["paths"] or ingest_files()
+        total = 0
+        for path in paths:
+            inserted = ingest_path(path, batch_size=options["batch_size"], on_records=on_records)
+            if inserted:
+                self.stdout.write(f"{path}: {inserted} alert baru")
+            total += inserted
+
+        if blocker is not None:
+            blocked, released = blocker.flush()
+            if blocked or released:
+                self.stdout.write(f"Autoblock: {blocked} IP diblokir, {released} dilepas.")
+        return total
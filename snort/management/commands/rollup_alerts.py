@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from snort import rollup
+from snort.models import Alert
+
+
+class Command(BaseCommand):
+    help = "Kelola tabel rollup deret waktu alert (downsampling / hitung ulang dari tabel Alert)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild", action="store_true",
+            help="Hapus semua rollup lalu hitung ulang dari tabel Alert.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            total = rollup.rebuild(Alert.objects.all(), batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Rollup dibangun ulang dari {total} alert."))
+            return
+        deleted = rollup.compact()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} baris rollup lama dihapus atau digabung."))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+
+from snort import archive
+from snort.logfiles import ingest_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Putar log alert Snort yang melewati ukuran/umur (rename ke '<log>.<epoch>'), segel file rollover "
+        "yang sudah tidak ditulis menjadi segmen terkompresi di SNORT_ARCHIVE_DIR dan hapus segmen yang "
+        "lewat retensi. Hanya satu format per lokasi log (sama dengan ingest_alerts). Jalankan berkala "
+        "(cron / systemd timer)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", action="append", dest="paths", help="File log (boleh diulang).")
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Putar sekarang tanpa melihat ukuran/umur dan segel tanpa menunggu SNORT_ROTATE_SEAL_DELAY.",
+        )
+        parser.add_argument("--max-bytes", type=int, default=None)
+        parser.add_argument("--max-age", type=int, default=None, help="Umur segmen aktif maksimum (detik).")
+
+    def handle(self, *args, **options):
+        force = options["force"]
+        delay = 0 if force else None
+        # alert_json dan alert_fast satu lokasi berisi alert yang sama: hanya format
+        # yang dibaca ingest yang diarsipkan, agar arsip tidak menghitung dua kali
+        paths = options["paths"] or [path for path in ingest_files() if archive.origin_path(path) == path]
+        can_rotate = archive.reopen_configured()
+        if not can_rotate:
+            self.stderr.write(
+                "SNORT_ROTATE_REOPEN_COMMAND kosong: rotasi dilewati (Snort akan terus menulis ke file yang "
+                "di-rename). Hanya file rollover dari `limit` Snort yang disegel."
+            )
+
+        rotated = []
+        for path in paths:
+            for rolled in archive.rolled_files(path):
+                if not archive.ready_to_seal(rolled, delay=delay):
+                    continue
+                self._seal(rolled)
+            if not can_rotate:
+                continue
+            rolled = archive.rotate(
+                path, max_bytes=options["max_bytes"], max_age=options["max_age"], force=force,
+            )
+            if rolled:
+                rotated.append(rolled)
+                self.stdout.write(f"{path} -> {rolled}")
+
+        if rotated:
+            error = archive.reopen_writer()
+            if error:
+                self.stderr.write(f"Gagal meminta Snort membuka ulang log: {error}")
+            elif force:
+                # Snort sudah membuka file baru: file rollover hasil putaran ini bisa langsung disegel
+                for rolled in rotated:
+                    if archive.ready_to_seal(rolled, delay=0, reopened=True):
+                        self._seal(rolled)
+
+        removed = archive.purge()
+        if removed:
+            self.stdout.write(f"{removed} segmen lama dihapus.")
+        self.stdout.write(self.style.SUCCESS(f"Selesai, {len(archive.list_segments())} segmen di arsip."))
+
+    def _seal(self, rolled):
+        segment = archive.seal_file(rolled)
+        if segment:
+            self.stdout.write(f"{rolled} -> {segment}")
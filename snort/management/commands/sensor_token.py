@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from snort import sensors
+from snort.models import Sensor
+
+
+class Command(BaseCommand):
+    help = (
+        "Daftarkan sensor (gateway Snort yang menjalankan agent/snort_agent.py) atau buat ulang "
+        "tokennya. Token hanya ditampilkan sekali; server menyimpan hash SHA-256."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Nama sensor (huruf kecil, angka, '-', '_').")
+        parser.add_argument("--rotate", action="store_true", help="Ganti token sensor yang sudah ada.")
+        parser.add_argument("--disable", action="store_true", help="Tolak kiriman sensor ini.")
+        parser.add_argument("--enable", action="store_true")
+        parser.add_argument("--list", action="store_true", help="Tampilkan semua sensor.")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for sensor in Sensor.objects.all():
+                status = "aktif" if sensor.active else "nonaktif"
+                seen = sensor.last_seen.isoformat() if sensor.last_seen else "-"
+                self.stdout.write(
+                    f"{sensor.name}\t{status}\t{sensor.alerts_received} alert\tterakhir {seen} {sensor.last_address}"
+                )
+            return
+
+        name = options["name"]
+        if not name:
+            raise CommandError("Nama sensor wajib diisi (atau gunakan --list).")
+        try:
+            sensors.validate_name(name)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        sensor = Sensor.objects.filter(name=name).first()
+        if options["disable"] or options["enable"]:
+            if sensor is None:
+                raise CommandError(f"Sensor {name} belum terdaftar.")
+            sensor.active = options["enable"]
+            sensor.save(update_fields=["active"])
+            self.stdout.write(self.style.SUCCESS(f"Sensor {name} {'diaktifkan' if sensor.active else 'dinonaktifkan'}."))
+            return
+
+        if sensor is not None and not options["rotate"]:
+            raise CommandError(f"Sensor {name} sudah terdaftar (gunakan --rotate untuk token baru).")
+        if sensor is None:
+            sensor = Sensor(name=name)
+        token = sensors.issue_token(sensor)
+        sensor.save()
+        self.stdout.write(token)
+        self.stderr.write(f"Token sensor {name}; set SNORT_AGENT_TOKEN di gateway (tidak bisa ditampilkan ulang).")
@@ -0,0 +1,61 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from snort.ipsync import bulk_update
+
+
+def _read_items(source):
+    if source == "-":
+        return sys.stdin.read().splitlines()
+    try:
+        with open(source, "r", encoding="utf-8", errors="ignore") as handle:
+            return handle.read().splitlines()
+    except OSError as exc:
+        raise CommandError(str(exc))
+
+
+class Command(BaseCommand):
+    help = (
+        "Update massal whitelist/blocklist dari file (satu IP/CIDR per baris, '-' = stdin). "
+        "File list ditulis atomik; untuk blocklist juga dibuat delta nftables (<list>.delta.nft). "
+        "Snort membaca ulang daftar reputasi lewat reload (SIGHUP) tanpa restart."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=["blocklist", "whitelist"], default="blocklist")
+        parser.add_argument("--add", action="append", default=[], help="File berisi IP/CIDR yang ditambahkan.")
+        parser.add_argument("--remove", action="append", default=[], help="File berisi IP/CIDR yang dihapus.")
+        parser.add_argument(
+            "--replace", action="store_true",
+            help="Ganti seluruh isi list dengan isi --add (entri lain dihapus).",
+        )
+        parser.add_argument("--note", default="", help="Keterangan untuk entri baru tanpa komentar.")
+        parser.add_argument("--apply", action="store_true", help="Jalankan `nft -f` untuk delta yang dihasilkan.")
+
+    def handle(self, *args, **options):
+        add = [item for source in options["add"] for item in _read_items(source)]
+        remove = [item for source in options["remove"] for item in _read_items(source)]
+        if not add and not remove and not options["replace"]:
+            raise CommandError("Tidak ada entri untuk diproses (gunakan --add / --remove).")
+
+        try:
+            result = bulk_update(
+                options["kind"], add=add, remove=remove, replace=options["replace"],
+                note=options["note"], apply=options["apply"] or None,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            f"{options['kind']}: +{len(result.added)} -{len(result.removed)}, "
+            f"{len(result.invalid)} tidak valid, total {result.total} entri."
+        )
+        for item in result.invalid[:20]:
+            self.stdout.write(self.style.WARNING(f"  tidak valid: {item}"))
+        if result.delta_path:
+            self.stdout.write(f"Delta nftables: {result.delta_path}")
+        if result.error:
+            raise CommandError(f"Gagal menerapkan delta nftables: {result.error}")
+        if result.applied:
+            self.stdout.write(self.style.SUCCESS("Delta nftables diterapkan."))
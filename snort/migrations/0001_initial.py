@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=512, unique=True)),
+                ('device', models.BigIntegerField(blank=True, null=True)),
+                ('inode', models.BigIntegerField(blank=True, null=True)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(blank=True, null=True)),
+                ('action', models.CharField(default='alert', max_length=16)),
+                ('signature', models.CharField(blank=True, max_length=255)),
+                ('src_ip', models.CharField(blank=True, max_length=45)),
+                ('src_port', models.PositiveIntegerField(blank=True, null=True)),
+                ('dst_ip', models.CharField(blank=True, max_length=45)),
+                ('dst_port', models.PositiveIntegerField(blank=True, null=True)),
+                ('protocol', models.CharField(blank=True, max_length=16)),
+                ('priority', models.CharField(blank=True, max_length=16)),
+                ('source_file', models.CharField(blank=True, max_length=512)),
+            ],
+            options={
+                'ordering': ['-timestamp', '-id'],
+                'indexes': [models.Index(fields=['-timestamp', '-id'], name='snort_alert_ts_idx'), models.Index(fields=['action', '-timestamp'], name='snort_alert_action_idx'), models.Index(fields=['src_ip'], name='snort_alert_src_ip_idx'), models.Index(fields=['dst_ip'], name='snort_alert_dst_ip_idx'), models.Index(fields=['signature'], name='snort_alert_signature_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snort', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='classification',
+            field=models.CharField(blank=True, max_length=128),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='gid',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='rev',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='sid',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['gid', 'sid'], name='snort_alert_sid_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snort', '0002_alert_rule_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Menit'), ('hour', 'Jam'), ('day', 'Hari')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('dimension', models.CharField(max_length=16)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='alertrollup',
+            constraint=models.UniqueConstraint(fields=('resolution', 'dimension', 'bucket_start', 'value'), name='snort_rollup_bucket_uniq'),
+        ),
+    ]
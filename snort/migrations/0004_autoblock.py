@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snort', '0003_alertrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutoBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ip', models.CharField(max_length=45)),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('sid', models.PositiveIntegerField(blank=True, null=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('active', models.BooleanField(default=True)),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['active', 'expires_at'], name='snort_autoblock_expiry_idx'), models.Index(fields=['ip'], name='snort_autoblock_ip_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snort', '0004_autoblock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Menit'), ('hour', 'Jam')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('seconds', models.FloatField(default=0)),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('analyzed', models.PositiveBigIntegerField(default=0)),
+                ('dropped', models.PositiveBigIntegerField(default=0)),
+                ('blocked', models.PositiveBigIntegerField(default=0)),
+                ('latency_packets', models.PositiveBigIntegerField(default=0)),
+                ('latency_usecs', models.PositiveBigIntegerField(default=0)),
+                ('latency_timeouts', models.PositiveBigIntegerField(default=0)),
+                ('latency_max_usecs', models.PositiveBigIntegerField(default=0)),
+                ('cpu', models.JSONField(blank=True, default=dict)),
+                ('last_sample', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['resolution', 'bucket_start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='perfsample',
+            constraint=models.UniqueConstraint(fields=('resolution', 'bucket_start'), name='snort_perf_bucket_uniq'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snort', '0005_perfsample'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RuleProfileSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField()),
+                ('source', models.CharField(blank=True, max_length=255)),
+                ('rule_count', models.PositiveIntegerField(default=0)),
+                ('total_checks', models.PositiveBigIntegerField(default=0)),
+                ('total_time_us', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-captured_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RuleProfileEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gid', models.PositiveIntegerField(default=1)),
+                ('sid', models.PositiveIntegerField()),
+                ('rev', models.PositiveIntegerField(default=0)),
+                ('checks', models.PositiveBigIntegerField(default=0)),
+                ('matches', models.PositiveBigIntegerField(default=0)),
+                ('alerts', models.PositiveBigIntegerField(default=0)),
+                ('time_us', models.PositiveBigIntegerField(default=0)),
+                ('avg_check_us', models.FloatField(default=0)),
+                ('avg_match_us', models.FloatField(default=0)),
+                ('avg_nonmatch_us', models.FloatField(default=0)),
+                ('timeouts', models.PositiveBigIntegerField(default=0)),
+                ('suspends', models.PositiveBigIntegerField(default=0)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='snort.ruleprofilesnapshot')),
+            ],
+            options={
+                'ordering': ['-time_us'],
+                'indexes': [models.Index(fields=['snapshot', '-time_us'], name='snort_profile_time_idx'), models.Index(fields=['sid', 'gid'], name='snort_profile_sid_idx')],
+            },
+        ),
+    ]
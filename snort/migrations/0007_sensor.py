@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snort', '0006_ruleprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sensor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.SlugField(max_length=64, unique=True)),
+                ('token_hash', models.CharField(max_length=64, unique=True)),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('last_address', models.CharField(blank=True, max_length=45)),
+                ('alerts_received', models.PositiveBigIntegerField(default=0)),
+                ('agent_id', models.CharField(blank=True, max_length=64)),
+                ('last_batch', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='sensor',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['sensor', '-timestamp'], name='snort_alert_sensor_idx'),
+        ),
+    ]
@@ -1,3 +1,183 @@
 from django.db import models
 
-# Create your models here.
+
+class Alert(models.Model):
+    """Alert Snort yang sudah dinormalisasi oleh command ingest_alerts."""
+    timestamp = models.DateTimeField(null=True, blank=True)
+    action = models.CharField(max_length=16, default="alert")
+    signature = models.CharField(max_length=255, blank=True)
+    src_ip = models.CharField(max_length=45, blank=True)
+    src_port = models.PositiveIntegerField(null=True, blank=True)
+    dst_ip = models.CharField(max_length=45, blank=True)
+    dst_port = models.PositiveIntegerField(null=True, blank=True)
+    protocol = models.CharField(max_length=16, blank=True)
+    priority = models.CharField(max_length=16, blank=True)
+    gid = models.PositiveIntegerField(null=True, blank=True)
+    sid = models.PositiveIntegerField(null=True, blank=True)
+    rev = models.PositiveIntegerField(null=True, blank=True)
+    classification = models.CharField(max_length=128, blank=True)
+    source_file = models.CharField(max_length=512, blank=True)
+    # Nama sensor pengirim (agent); kosong = file log lokal server ini
+    sensor = models.CharField(max_length=64, blank=True, default="")
+
+    class Meta:
+        ordering = ["-timestamp", "-id"]
+        indexes = [
+            models.Index(fields=["sensor", "-timestamp"], name="snort_alert_sensor_idx"),
+            models.Index(fields=["-timestamp", "-id"], name="snort_alert_ts_idx"),
+            models.Index(fields=["action", "-timestamp"], name="snort_alert_action_idx"),
+            models.Index(fields=["src_ip"], name="snort_alert_src_ip_idx"),
+            models.Index(fields=["dst_ip"], name="snort_alert_dst_ip_idx"),
+            models.Index(fields=["signature"], name="snort_alert_signature_idx"),
+            models.Index(fields=["gid", "sid"], name="snort_alert_sid_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.timestamp} {self.action} {self.signature}"
+
+
+class Sensor(models.Model):
+    """Gateway Snort jarak jauh yang mengirim alert lewat agent (token disimpan sebagai SHA-256)."""
+    name = models.SlugField(max_length=64, unique=True)
+    token_hash = models.CharField(max_length=64, unique=True)
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(null=True, blank=True)
+    last_address = models.CharField(max_length=45, blank=True)
+    alerts_received = models.PositiveBigIntegerField(default=0)
+    # Batch terakhir yang diterima (id instance agent + nomor urut) untuk membuang kiriman ulang
+    agent_id = models.CharField(max_length=64, blank=True)
+    last_batch = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class IngestCursor(models.Model):
+    """Posisi baca terakhir (offset + inode) untuk tiap file log yang diikuti."""
+    path = models.CharField(max_length=512, unique=True)
+    device = models.BigIntegerField(null=True, blank=True)
+    inode = models.BigIntegerField(null=True, blank=True)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.path} @ {self.offset}"
+
+
+class AlertRollup(models.Model):
+    """Jumlah alert per bucket waktu (menit/jam/hari) untuk satu dimensi dan nilainya."""
+    RESOLUTION_CHOICES = [("minute", "Menit"), ("hour", "Jam"), ("day", "Hari")]
+
+    resolution = models.CharField(max_length=8, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+    dimension = models.CharField(max_length=16)
+    value = models.CharField(max_length=255)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resolution", "dimension", "bucket_start", "value"], name="snort_rollup_bucket_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.resolution} {self.bucket_start} {self.dimension}={self.value}: {self.count}"
+
+
+class AutoBlock(models.Model):
+    """IP yang dimasukkan ke blocklist otomatis oleh pipeline autoblock, dengan masa berlaku."""
+    ip = models.CharField(max_length=45)
+    reason = models.CharField(max_length=255, blank=True)
+    sid = models.PositiveIntegerField(null=True, blank=True)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    active = models.BooleanField(default=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["active", "expires_at"], name="snort_autoblock_expiry_idx"),
+            models.Index(fields=["ip"], name="snort_autoblock_ip_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.ip} s/d {self.expires_at}"
+
+
+class PerfSample(models.Model):
+    """Statistik data-plane perf_monitor Snort per bucket menit/jam (penghitung dijumlahkan)."""
+    RESOLUTION_CHOICES = [("minute", "Menit"), ("hour", "Jam")]
+
+    resolution = models.CharField(max_length=8, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+    samples = models.PositiveIntegerField(default=0)
+    seconds = models.FloatField(default=0)
+    received = models.PositiveBigIntegerField(default=0)
+    analyzed = models.PositiveBigIntegerField(default=0)
+    dropped = models.PositiveBigIntegerField(default=0)
+    blocked = models.PositiveBigIntegerField(default=0)
+    latency_packets = models.PositiveBigIntegerField(default=0)
+    latency_usecs = models.PositiveBigIntegerField(default=0)
+    latency_timeouts = models.PositiveBigIntegerField(default=0)
+    latency_max_usecs = models.PositiveBigIntegerField(default=0)
+    # {section: [user_us, system_us, wall_us]} dari tracker cpu perf_monitor
+    cpu = models.JSONField(default=dict, blank=True)
+    last_sample = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["resolution", "bucket_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["resolution", "bucket_start"], name="snort_perf_bucket_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.resolution} {self.bucket_start}: {self.received} paket"
+
+
+class RuleProfileSnapshot(models.Model):
+    """Satu dump rule profiler Snort (command import_rule_profile)."""
+    captured_at = models.DateTimeField()
+    source = models.CharField(max_length=255, blank=True)
+    rule_count = models.PositiveIntegerField(default=0)
+    total_checks = models.PositiveBigIntegerField(default=0)
+    total_time_us = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-captured_at", "-id"]
+
+    def __str__(self):
+        return f"{self.captured_at} ({self.rule_count} rule)"
+
+
+class RuleProfileEntry(models.Model):
+    """Biaya satu rule (gid:sid) dalam snapshot profiler; waktu dalam mikrodetik."""
+    snapshot = models.ForeignKey(RuleProfileSnapshot, on_delete=models.CASCADE, related_name="entries")
+    gid = models.PositiveIntegerField(default=1)
+    sid = models.PositiveIntegerField()
+    rev = models.PositiveIntegerField(default=0)
+    checks = models.PositiveBigIntegerField(default=0)
+    matches = models.PositiveBigIntegerField(default=0)
+    alerts = models.PositiveBigIntegerField(default=0)
+    time_us = models.PositiveBigIntegerField(default=0)
+    avg_check_us = models.FloatField(default=0)
+    avg_match_us = models.FloatField(default=0)
+    avg_nonmatch_us = models.FloatField(default=0)
+    timeouts = models.PositiveBigIntegerField(default=0)
+    suspends = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-time_us"]
+        indexes = [
+            models.Index(fields=["snapshot", "-time_us"], name="snort_profile_time_idx"),
+            models.Index(fields=["sid", "gid"], name="snort_profile_sid_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.gid}:{self.sid} {self.time_us} us"
@@ -0,0 +1,462 @@
+import datetime
+import glob
+import json
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from . import topology
+from .models import PerfSample
+
+# Statistik data-plane dari perf_monitor Snort 3 (perf_monitor_*.csv / *.json
+# di direktori log snort.service). Tiap record perf_monitor mencakup satu
+# interval (perf_monitor.seconds, default 60); record beberapa tracker atau
+# packet thread dengan timestamp sama digabung menjadi satu titik. Worker web
+# menyimpan titik terbaru di ring buffer, command collect_perf menyimpan
+# versi downsample (menit/jam) ke tabel PerfSample.
+
+FILE_PATTERNS = ("*perf_monitor*.csv", "*perf_monitor*.json")
+READ_CHUNK_SIZE = 1024 * 1024
+# Start dingin ring buffer: cukup ekor file sebesar ini
+INITIAL_TAIL_BYTES = 4 * 1024 * 1024
+DEFAULT_INTERVAL = 60
+DEFAULT_RING_SIZE = 1440
+
+RESOLUTION_SECONDS = {"minute": 60, "hour": 3600}
+RETENTION_DAYS = {"minute": 7, "hour": None}
+
+COUNTERS = ("received", "analyzed", "dropped", "blocked", "latency_packets", "latency_usecs", "latency_timeouts")
+_FIELD_MAP = {
+    "daq.received": "received",
+    "daq.analyzed": "analyzed",
+    "daq.dropped": "dropped",
+    "daq.block": "blocked",
+    "daq.blocklist": "blocked",
+    "daq.blacklist": "blocked",
+    "latency.total_packets": "latency_packets",
+    "latency.total_usecs": "latency_usecs",
+    "latency.packet_timeouts": "latency_timeouts",
+}
+_MAX_FIELDS = {"latency.max_usecs": "latency_max_usecs"}
+# Tracker cpu: thread_N.cpu_user / cpu_system / cpu_wall (mikrodetik per interval)
+_CPU_FIELDS = {"cpu_user": 0, "cpu_system": 1, "cpu_wall": 2}
+
+
+def perf_dir():
+    return getattr(settings, "SNORT_PERF_DIR", "/var/log/snort")
+
+
+def perf_files(directory=None):
+    """File perf_monitor di direktori log dan di subdirektori per queue (<dir>/<queue>/)."""
+    directory = directory or perf_dir()
+    paths = set()
+    for pattern in FILE_PATTERNS:
+        paths.update(glob.glob(os.path.join(directory, pattern)))
+        for _queue, queue_dir in topology.queue_dirs(directory):
+            paths.update(glob.glob(os.path.join(queue_dir, pattern)))
+    return sorted(paths)
+
+
+def _interval():
+    return getattr(settings, "SNORT_PERF_INTERVAL", DEFAULT_INTERVAL)
+
+
+class PerfPoint:
+    """Satu interval perf_monitor: penghitung mentah + durasi, rate dihitung saat ditampilkan."""
+
+    __slots__ = ("timestamp", "seconds", *COUNTERS, "latency_max_usecs", "cpu")
+
+    def __init__(self, timestamp, seconds=0.0):
+        self.timestamp = timestamp
+        self.seconds = seconds
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.latency_max_usecs = 0
+        # {section: [user_us, system_us, wall_us]}
+        self.cpu = {}
+
+    @classmethod
+    def from_fields(cls, timestamp, fields):
+        point = cls(timestamp)
+        for name, value in fields.items():
+            target = _FIELD_MAP.get(name)
+            if target is not None:
+                setattr(point, target, getattr(point, target) + value)
+                continue
+            target = _MAX_FIELDS.get(name)
+            if target is not None:
+                setattr(point, target, max(getattr(point, target), value))
+                continue
+            section, _, field = name.rpartition(".")
+            slot = _CPU_FIELDS.get(field)
+            if slot is not None and section:
+                point.cpu.setdefault(section, [0, 0, 0])[slot] += value
+        return point
+
+    def merge(self, other):
+        for name in COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.latency_max_usecs = max(self.latency_max_usecs, other.latency_max_usecs)
+        for section, values in other.cpu.items():
+            mine = self.cpu.setdefault(section, [0, 0, 0])
+            for slot, value in enumerate(values):
+                mine[slot] += value
+        return self
+
+    def as_dict(self):
+        seconds = self.seconds or _interval()
+        offered = self.received + self.dropped
+        return {
+            "timestamp": timezone.localtime(
+                datetime.datetime.fromtimestamp(self.timestamp, tz=datetime.timezone.utc)
+            ).isoformat(),
+            "seconds": seconds,
+            "packets_per_second": round(self.received / seconds, 2),
+            "analyzed_per_second": round(self.analyzed / seconds, 2),
+            "blocked_per_second": round(self.blocked / seconds, 2),
+            "daq_drops": self.dropped,
+            "daq_drop_percent": round(self.dropped * 100 / offered, 3) if offered else 0.0,
+            "latency_avg_usecs": round(self.latency_usecs / self.latency_packets, 1) if self.latency_packets else None,
+            "latency_max_usecs": self.latency_max_usecs or None,
+            "latency_timeouts": self.latency_timeouts,
+            "cpu_percent": {
+                section: round((user + system) * 100 / wall, 1)
+                for section, (user, system, wall) in sorted(self.cpu.items()) if wall
+            },
+        }
+
+
+def _number(text):
+    try:
+        return float(text) if "." in text or "e" in text else int(text)
+    except ValueError:
+        return None
+
+
+def _flatten(record, prefix=""):
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{name}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+class PerfFile:
+    """Posisi baca satu file perf_monitor; hanya baris lengkap yang diproses."""
+
+    __slots__ = ("path", "device", "inode", "offset", "columns", "previous", "is_json")
+
+    def __init__(self, path):
+        self.path = path
+        self.is_json = path.endswith(".json")
+        self.device = None
+        self.inode = None
+        self.offset = 0
+        self.columns = None
+        self.previous = None
+
+    def read(self, reset=True, tail_bytes=None):
+        """Record baru [(timestamp, {field: nilai})] sejak pembacaan terakhir.
+
+        reset=False untuk perf_monitor.reset = false (penghitung kumulatif):
+        nilai diubah menjadi selisih terhadap record sebelumnya.
+        """
+        try:
+            stats = os.stat(self.path)
+        except OSError:
+            return []
+        skip_partial = False
+        if (self.inode is None or stats.st_ino != self.inode or stats.st_dev != self.device
+                or stats.st_size < self.offset):
+            self.device, self.inode, self.offset = stats.st_dev, stats.st_ino, 0
+            self.columns = None
+            self.previous = None
+            if tail_bytes and stats.st_size > tail_bytes:
+                self.offset = stats.st_size - tail_bytes
+                skip_partial = True
+        if stats.st_size <= self.offset:
+            return []
+
+        records = []
+        with open(self.path, "rb") as handle:
+            if self.columns is None and not self.is_json and self.offset:
+                # Header CSV ada di awal file
+                first = handle.readline()
+                if first.startswith(b"#"):
+                    self.columns = first[1:].decode("utf-8", "replace").strip().split(",")
+            handle.seek(self.offset)
+            if skip_partial:
+                self.offset += len(handle.readline())
+            while self.offset < stats.st_size:
+                chunk = handle.read(min(READ_CHUNK_SIZE, stats.st_size - self.offset))
+                cut = chunk.rfind(b"\n")
+                if cut < 0:
+                    break
+                complete = chunk[:cut + 1]
+                handle.seek(self.offset + len(complete))
+                self.offset += len(complete)
+                for line in complete.splitlines():
+                    record = self._parse_line(line)
+                    if record is not None:
+                        record = self._delta(record, reset)
+                    if record is not None:
+                        records.append(record)
+        return records
+
+    def _parse_line(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        if self.is_json:
+            # Formatter JSON menulis array: '[', '{...},', ..., ']'
+            text = line.lstrip(b"[,").rstrip(b"],")
+            if not text:
+                return None
+            try:
+                data = json.loads(text)
+            except ValueError:
+                return None
+            if not isinstance(data, dict) or "timestamp" not in data:
+                return None
+            timestamp = data.pop("timestamp")
+            return timestamp, dict(_flatten(data))
+        if line.startswith(b"#"):
+            # Header bisa ditulis ulang setelah Snort restart
+            self.columns = line[1:].decode("utf-8", "replace").strip().split(",")
+            self.previous = None
+            return None
+        if not self.columns:
+            return None
+        values = line.decode("utf-8", "replace").split(",")
+        timestamp = _number(values[0])
+        if timestamp is None:
+            return None
+        fields = {}
+        for name, text in zip(self.columns[1:], values[1:]):
+            value = _number(text)
+            if value is not None:
+                fields[name] = value
+        return timestamp, fields
+
+    def _delta(self, record, reset):
+        if reset:
+            return record
+        timestamp, fields = record
+        previous, self.previous = self.previous, fields
+        if previous is None:
+            return None
+        delta = {}
+        for name, value in fields.items():
+            if name in _MAX_FIELDS:
+                delta[name] = value
+                continue
+            before = previous.get(name, 0)
+            # Penghitung turun berarti Snort restart: nilai baru adalah total sejak restart
+            delta[name] = value - before if value >= before else value
+        return timestamp, delta
+
+
+def build_points(records, last_timestamp=None):
+    """Gabungkan record semua file per timestamp menjadi PerfPoint urut waktu."""
+    merged = {}
+    for timestamp, fields in records:
+        point = PerfPoint.from_fields(timestamp, fields)
+        existing = merged.get(timestamp)
+        merged[timestamp] = existing.merge(point) if existing is not None else point
+    interval = _interval()
+    points = [merged[timestamp] for timestamp in sorted(merged)]
+    previous = last_timestamp
+    for point in points:
+        gap = point.timestamp - previous if previous is not None else 0
+        # Celah lebih panjang dari interval = Snort berhenti, bukan interval panjang
+        point.seconds = min(gap, interval) if gap > 0 else interval
+        previous = point.timestamp
+    return points
+
+
+class PerfMonitor:
+    """Ring buffer titik perf_monitor terbaru untuk satu proses worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files = {}
+        self._points = None
+        # Titik terakhir per queue (None = file di luar subdirektori queue)
+        self._latest = {}
+
+    def _ring(self):
+        if self._points is None:
+            self._points = deque(maxlen=getattr(settings, "SNORT_PERF_RING_SIZE", DEFAULT_RING_SIZE))
+        return self._points
+
+    def points(self, since=None):
+        """Titik di ring buffer (setelah membaca baris baru), opsional sejak epoch `since`."""
+        with self._lock:
+            self._refresh()
+            return [point for point in self._points if since is None or point.timestamp >= since]
+
+    def latest_by_queue(self):
+        """{queue: PerfPoint terakhir} untuk file perf_monitor di subdirektori queue."""
+        with self._lock:
+            self._refresh()
+            return {queue: point for queue, point in self._latest.items() if queue is not None}
+
+    def file_count(self):
+        return len(self._files)
+
+    def forget(self):
+        with self._lock:
+            self._files.clear()
+            self._points = None
+            self._latest.clear()
+
+    def _refresh(self):
+        ring = self._ring()
+        paths = perf_files()
+        for path in set(self._files) - set(paths):
+            del self._files[path]
+        reset = getattr(settings, "SNORT_PERF_RESET", True)
+        records = []
+        by_queue = {}
+        for path in paths:
+            state = self._files.get(path)
+            if state is None:
+                state = self._files[path] = PerfFile(path)
+            new_records = state.read(reset=reset, tail_bytes=INITIAL_TAIL_BYTES)
+            records.extend(new_records)
+            by_queue.setdefault(topology.queue_of(path), []).extend(new_records)
+        if not records:
+            return
+
+        for queue, queue_records in by_queue.items():
+            if not queue_records:
+                continue
+            previous = self._latest.get(queue)
+            point = build_points(queue_records, previous.timestamp if previous else None)[-1]
+            if previous is None or point.timestamp >= previous.timestamp:
+                self._latest[queue] = point
+
+        last = ring[-1].timestamp if ring else None
+        unordered = False
+        for point in build_points(records, last):
+            if ring and point.timestamp <= ring[-1].timestamp:
+                # Thread/tracker lain untuk interval yang sudah ada di ring
+                existing = next((item for item in reversed(ring) if item.timestamp == point.timestamp), None)
+                if existing is not None:
+                    existing.merge(point)
+                    continue
+                unordered = True
+            ring.append(point)
+        if unordered:
+            self._points = deque(sorted(ring, key=lambda item: item.timestamp), maxlen=ring.maxlen)
+
+
+# ---------------------------------------------------------------------------
+# Penyimpanan downsample (command collect_perf)
+# ---------------------------------------------------------------------------
+
+def _bucket_start(epoch, resolution):
+    width = RESOLUTION_SECONDS[resolution]
+    start = int(epoch // width) * width
+    return datetime.datetime.fromtimestamp(start, tz=datetime.timezone.utc)
+
+
+def last_persisted():
+    """Epoch titik terakhir yang sudah disimpan, atau None."""
+    latest = PerfSample.objects.filter(resolution="minute").aggregate(latest=Max("last_sample"))["latest"]
+    return latest.timestamp() if latest else None
+
+
+def persist(points, partial=()):
+    """Tambahkan titik ke bucket menit & jam PerfSample (panggil di dalam transaksi).
+
+    Timestamp di `partial` sudah tersimpan sebelumnya (record thread/queue
+    lain yang datang belakangan): penghitungnya ditambahkan ke bucket yang
+    sama tanpa menambah jumlah sampel dan durasi.
+    """
+    buckets = {}
+    for point in points:
+        for resolution in RESOLUTION_SECONDS:
+            key = (resolution, _bucket_start(point.timestamp, resolution))
+            buckets.setdefault(key, []).append(point)
+    if not buckets:
+        return 0
+
+    existing = {}
+    for resolution in RESOLUTION_SECONDS:
+        starts = [start for res, start in buckets if res == resolution]
+        for row in PerfSample.objects.filter(resolution=resolution, bucket_start__in=starts):
+            existing[(row.resolution, row.bucket_start)] = row
+
+    updated, created = [], []
+    for (resolution, start), items in buckets.items():
+        row = existing.get((resolution, start))
+        if row is None:
+            row = PerfSample(resolution=resolution, bucket_start=start, cpu={})
+            created.append(row)
+        else:
+            updated.append(row)
+        for point in items:
+            if point.timestamp not in partial:
+                row.samples += 1
+                row.seconds += point.seconds
+            for name in COUNTERS:
+                setattr(row, name, getattr(row, name) + getattr(point, name))
+            row.latency_max_usecs = max(row.latency_max_usecs, point.latency_max_usecs)
+            for section, values in point.cpu.items():
+                totals = row.cpu.setdefault(section, [0, 0, 0])
+                for slot, value in enumerate(values):
+                    totals[slot] += value
+            sample_time = datetime.datetime.fromtimestamp(point.timestamp, tz=datetime.timezone.utc)
+            if row.last_sample is None or sample_time > row.last_sample:
+                row.last_sample = sample_time
+    if updated:
+        PerfSample.objects.bulk_update(
+            updated, ["samples", "seconds", *COUNTERS, "latency_max_usecs", "cpu", "last_sample"], batch_size=500,
+        )
+    if created:
+        PerfSample.objects.bulk_create(created, batch_size=500)
+    return len(points)
+
+
+def compact(now=None):
+    """Hapus bucket menit yang lewat retensi; bucket jam tetap menyimpan totalnya."""
+    now = now or timezone.now()
+    deleted = 0
+    for resolution, days in RETENTION_DAYS.items():
+        if days is None:
+            continue
+        cutoff = now - datetime.timedelta(days=days)
+        deleted += PerfSample.objects.filter(resolution=resolution, bucket_start__lt=cutoff).delete()[0]
+    return deleted
+
+
+def point_from_row(row):
+    point = PerfPoint(row.bucket_start.timestamp(), row.seconds)
+    for name in COUNTERS:
+        setattr(point, name, getattr(row, name))
+    point.latency_max_usecs = row.latency_max_usecs
+    point.cpu = row.cpu or {}
+    return point
+
+
+def query(start, end, now=None):
+    """(resolusi, [PerfPoint]) tersimpan untuk rentang [start, end)."""
+    now = now or timezone.now()
+    days = RETENTION_DAYS["minute"]
+    resolution = "minute"
+    if end - start > datetime.timedelta(days=2) or start < now - datetime.timedelta(days=days):
+        resolution = "hour"
+    rows = PerfSample.objects.filter(
+        resolution=resolution, bucket_start__gte=_bucket_start(start.timestamp(), resolution), bucket_start__lt=end,
+    ).order_by("bucket_start")
+    return resolution, [point_from_row(row) for row in rows.iterator()]
+
+
+# Satu instance per proses worker; ring buffer bertahan antar request.
+monitor = PerfMonitor()
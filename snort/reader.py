@@ -0,0 +1,218 @@
+import mmap
+import os
+from contextlib import contextmanager
+
+# Pembaca log streaming: berjalan mundur dari EOF per blok sehingga alert
+# terbaru keluar lebih dulu tanpa memuat seluruh file ke memori.
+
+BLOCK_SIZE = 256 * 1024
+LOOKAHEAD_PAGES = 10
+COUNT_CHUNK = 64 * 1024 * 1024
+
+
+def iter_blocks_reversed(path, block_size=BLOCK_SIZE, start=0, end=None):
+    """Yield list baris lengkap (bytes) per blok, dari akhir file ke awal.
+
+    Baris di dalam tiap list sudah berurutan terbaru-dulu. `start`/`end`
+    (awal baris) membatasi rentang byte yang dibaca.
+    """
+    with open(path, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell() if end is None else min(end, handle.tell())
+        head = b""
+        while position > start:
+            size = min(block_size, position - start)
+            position -= size
+            handle.seek(position)
+            lines = (handle.read(size) + head).split(b"\n")
+            # Elemen pertama mungkin potongan baris dari blok sebelumnya
+            head = lines[0]
+            block = [raw for raw in reversed(lines[1:]) if raw]
+            if block:
+                yield block
+        if head:
+            yield [head]
+
+
+def iter_lines_reversed(path, block_size=BLOCK_SIZE):
+    """Yield baris (bytes, tanpa newline) dari akhir file ke awal."""
+    for block in iter_blocks_reversed(path, block_size):
+        yield from block
+
+
+def iter_alerts_reversed(path, decode_batch, block_size=BLOCK_SIZE, start=0, end=None):
+    """Yield Alert terbaru-dulu; tiap blok di-decode sekaligus lewat decode_batch."""
+    for block in iter_blocks_reversed(path, block_size, start, end):
+        yield from decode_batch(block)
+
+
+@contextmanager
+def mapped(path):
+    """mmap read-only seluruh file; None untuk file kosong (mmap menolak ukuran 0)."""
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            yield None
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+
+def count_lines(path, start=0, end=None, chunk_size=COUNT_CHUNK):
+    """Jumlah newline di [start, end) tanpa decode; bytes.count per potongan besar."""
+    with mapped(path) as view:
+        if view is None:
+            return 0
+        end = len(view) if end is None else min(end, len(view))
+        total = 0
+        for position in range(start, end, chunk_size):
+            total += view[position:min(position + chunk_size, end)].count(b"\n")
+        return total
+
+
+def iter_matching_lines(view, needle, start=0, end=None):
+    """Baris (bytes) di mmap yang memuat `needle` (regex bytes terkompilasi).
+
+    Pencarian berjalan langsung di atas mmap; hanya baris kandidat yang
+    disalin sehingga baris lain tidak pernah di-decode.
+    """
+    end = len(view) if end is None else end
+    position = start
+    while position < end:
+        match = needle.search(view, position, end)
+        if match is None:
+            return
+        line_start = view.rfind(b"\n", start, match.start()) + 1 or start
+        line_end = view.find(b"\n", match.end(), end)
+        if line_end < 0:
+            line_end = end
+        yield view[line_start:line_end]
+        position = line_end + 1
+
+
+def find_offset(path, predicate, decode_line, undecodable=True):
+    """Offset awal baris pertama yang memenuhi `predicate(alert)` pada log terurut waktu.
+
+    Binary search atas posisi byte. Baris yang gagal di-decode dilewati dan
+    baris berikutnya yang dipakai sebagai patokan. Bila tidak ada lagi baris
+    yang bisa di-decode sebelum batas atas pencarian, `undecodable` dipakai
+    sebagai nilai predikat: True condong ke offset lebih kecil (batas bawah
+    seperti time_from), False condong ke offset lebih besar (batas atas
+    seperti time_to), sehingga hasilnya tidak pernah membuang baris relevan.
+    """
+    with mapped(path) as view:
+        if view is None:
+            return 0
+        low, high = 0, len(view)
+        while low < high:
+            middle = (low + high) // 2
+            line_start = view.rfind(b"\n", 0, middle) + 1
+            probe, alert = line_start, None
+            while probe < high:
+                line_end = view.find(b"\n", probe)
+                line_end = len(view) if line_end < 0 else line_end + 1
+                alert = decode_line(view[probe:line_end])
+                if alert is not None:
+                    break
+                probe = line_end
+            if alert is None:
+                if undecodable:
+                    high = line_start
+                else:
+                    low = high
+            elif predicate(alert):
+                high = line_start
+            else:
+                low = line_end
+        return low
+
+
+class StreamPaginator:
+    """Paginator untuk iterator alert tanpa materialisasi seluruh hasil.
+
+    Item sebelum halaman diminta hanya dihitung, item halaman disimpan, dan
+    setelahnya dihitung paling banyak `lookahead_pages` halaman. Bila sumber
+    belum habis, `count` adalah batas bawah (`count_is_lower_bound`).
+    """
+
+    def __init__(self, object_iter, per_page, lookahead_pages=LOOKAHEAD_PAGES):
+        self.object_iter = object_iter
+        self.per_page = per_page
+        self.lookahead_pages = lookahead_pages
+        self.count = 0
+        self.count_is_lower_bound = False
+
+    @property
+    def num_pages(self):
+        return max(1, -(-self.count // self.per_page))
+
+    def get_page(self, number):
+        try:
+            number = max(1, int(number))
+        except (TypeError, ValueError):
+            number = 1
+
+        start = (number - 1) * self.per_page
+        stop = start + self.per_page + self.lookahead_pages * self.per_page
+        items = []
+        seen = 0
+        for item in self.object_iter:
+            if start <= seen < start + self.per_page:
+                items.append(item)
+            seen += 1
+            if seen >= stop:
+                self.count_is_lower_bound = True
+                break
+        self.count = seen
+
+        if not items and seen and number > 1:
+            # Halaman melewati akhir data; iterator sudah habis sehingga
+            # pemanggil perlu membuka ulang sumber (lihat paginate_stream)
+            return None
+        return StreamPage(items, number, self)
+
+
+class StreamPage:
+    def __init__(self, object_list, number, paginator):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.number < self.paginator.num_pages
+
+    def has_previous(self):
+        return self.number > 1
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return (self.number - 1) * self.paginator.per_page + len(self.object_list)
+
+
+def paginate_stream(make_iter, per_page, number, lookahead_pages=LOOKAHEAD_PAGES):
+    """Ambil satu halaman dari iterator baru hasil make_iter()."""
+    paginator = StreamPaginator(make_iter(), per_page, lookahead_pages)
+    page = paginator.get_page(number)
+    if page is None:
+        last_page = paginator.num_pages
+        paginator = StreamPaginator(make_iter(), per_page, lookahead_pages)
+        page = paginator.get_page(last_page)
+    return paginator, page
@@ -0,0 +1,299 @@
+import datetime
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import AlertRollup
+
+# Tabel rollup deret waktu: jumlah alert per menit/jam/hari per dimensi
+# (action, protocol, signature, src_ip). Diisi saat ingest sehingga grafik
+# rentang panjang cukup membaca ratusan baris, bukan jutaan alert mentah.
+
+RESOLUTION_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Dimensi per resolusi: menit hanya untuk dimensi berkardinalitas rendah
+RESOLUTION_DIMENSIONS = {
+    "minute": ("action", "protocol"),
+    "hour": ("action", "protocol", "signature", "src_ip"),
+    "day": ("action", "protocol", "signature", "src_ip"),
+}
+
+# Retensi (hari); None = disimpan selamanya. Data lama tetap tersedia di
+# resolusi yang lebih kasar (downsampling).
+RETENTION_DAYS = {"minute": 2, "hour": 90, "day": None}
+
+# Signature / IP sumber disimpan lengkap selama bucket masih bisa bertambah;
+# setelah FOLD_AFTER lewat dari akhir bucket, compact menyisakan top-N dan
+# menggabungkan sisanya ke OTHER. Top-N untuk tampilan dihitung saat dibaca.
+TOP_VALUES = 20
+TOP_DIMENSIONS = ("signature", "src_ip")
+OTHER = "__other__"
+FOLD_AFTER = datetime.timedelta(days=1)
+
+BUCKET_SECONDS = {
+    "minute": 60, "5m": 300, "15m": 900, "hour": 3600, "6h": 21600, "day": 86400, "week": 604800,
+}
+MAX_POINTS = 2000
+
+
+class RangeError(ValueError):
+    pass
+
+
+def floor_time(dt, resolution):
+    """Awal bucket (waktu lokal, aware) yang memuat dt."""
+    local = timezone.localtime(dt)
+    if resolution == "minute":
+        return local.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _dimension_value(alert, dimension):
+    value = getattr(alert, dimension, None)
+    if value in (None, "", "N/A"):
+        return "N/A"
+    return str(value)[:255]
+
+
+def count_alerts(alerts):
+    """Counter (resolution, bucket_start, dimension, value) dari satu batch model Alert."""
+    counts = Counter()
+    for alert in alerts:
+        if alert.timestamp is None:
+            continue
+        local = timezone.localtime(alert.timestamp)
+        minute = local.replace(second=0, microsecond=0)
+        buckets = {
+            "minute": minute,
+            "hour": minute.replace(minute=0),
+            "day": minute.replace(hour=0, minute=0),
+        }
+        for resolution, dimensions in RESOLUTION_DIMENSIONS.items():
+            bucket = buckets[resolution]
+            for dimension in dimensions:
+                counts[(resolution, bucket, dimension, _dimension_value(alert, dimension))] += 1
+    return counts
+
+
+def apply_counts(counts):
+    """Tambahkan counts ke tabel rollup (panggil di dalam transaksi ingest).
+
+    Penambahan dikerjakan database (INSERT ... ON CONFLICT DO UPDATE, atau
+    UPDATE count = count + n), bukan baca lalu tulis ulang di Python, sehingga
+    beberapa proses ingest/rollup sekaligus tidak saling menimpa hitungan.
+    """
+    if not counts:
+        return
+    connection = connections[router.db_for_write(AlertRollup)]
+    if connection.vendor in ("sqlite", "postgresql"):
+        _upsert(connection, counts)
+        return
+    for key, count in counts.items():
+        _increment(key, count)
+
+
+def _upsert(connection, counts):
+    meta = AlertRollup._meta
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    names = ("resolution", "bucket_start", "dimension", "value", "count")
+    columns = {name: quote(meta.get_field(name).column) for name in names}
+    conflict = ", ".join(columns[name] for name in ("resolution", "dimension", "bucket_start", "value"))
+    count = columns["count"]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns[name] for name in names)}) VALUES (%s, %s, %s, %s, %s) "
+        f"ON CONFLICT ({conflict}) DO UPDATE SET {count} = {table}.{count} + excluded.{count}"
+    )
+    bucket_field = meta.get_field("bucket_start")
+    rows = [
+        (resolution, bucket_field.get_db_prep_value(bucket, connection), dimension, value, amount)
+        for (resolution, bucket, dimension, value), amount in counts.items()
+    ]
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), 500):
+            cursor.executemany(sql, rows[start:start + 500])
+
+
+def _increment(key, count):
+    resolution, bucket, dimension, value = key
+    rows = AlertRollup.objects.filter(resolution=resolution, bucket_start=bucket, dimension=dimension, value=value)
+    if rows.update(count=F("count") + count):
+        return
+    try:
+        with transaction.atomic():
+            AlertRollup.objects.create(
+                resolution=resolution, bucket_start=bucket, dimension=dimension, value=value, count=count,
+            )
+    except IntegrityError:
+        # Proses lain membuat baris yang sama lebih dulu
+        rows.update(count=F("count") + count)
+
+
+def record(alerts):
+    apply_counts(count_alerts(alerts))
+
+
+def compact(now=None):
+    """Hapus rollup yang lewat retensi (resolusi kasar masih menyimpan totalnya) dan lipat ekor bucket lama."""
+    now = now or timezone.now()
+    deleted = 0
+    for resolution, days in RETENTION_DAYS.items():
+        if days is None:
+            continue
+        cutoff = floor_time(now - datetime.timedelta(days=days), "day")
+        deleted += AlertRollup.objects.filter(resolution=resolution, bucket_start__lt=cutoff).delete()[0]
+    return deleted + fold_tail(now)
+
+
+def fold_tail(now=None):
+    """Gabungkan nilai di luar top-N ke OTHER untuk bucket yang hitungannya sudah final."""
+    now = now or timezone.now()
+    folded = 0
+    for resolution, dimensions in RESOLUTION_DIMENSIONS.items():
+        # Bucket dianggap final FOLD_AFTER setelah berakhir (alert telat, spool sensor)
+        cutoff = now - FOLD_AFTER - datetime.timedelta(seconds=RESOLUTION_SECONDS[resolution])
+        for dimension in TOP_DIMENSIONS:
+            if dimension not in dimensions:
+                continue
+            rows = AlertRollup.objects.filter(
+                resolution=resolution, dimension=dimension, bucket_start__lt=cutoff,
+            ).exclude(value=OTHER)
+            crowded = (
+                rows.values("bucket_start").annotate(distinct_values=Count("id")).filter(distinct_values__gt=TOP_VALUES)
+                .values_list("bucket_start", flat=True)
+            )
+            for bucket_start in list(crowded):
+                folded += _fold_bucket(resolution, bucket_start, dimension)
+    return folded
+
+
+def _fold_bucket(resolution, bucket_start, dimension):
+    other_key = (resolution, bucket_start, dimension, OTHER)
+    with transaction.atomic():
+        # Tulis dulu agar transaksi SQLite langsung memegang kunci tulis; baca lalu
+        # naik ke tulis bisa gagal 'database is locked' saat proses lain ikut menulis
+        apply_counts({other_key: 0})
+        tail = list(
+            AlertRollup.objects.filter(resolution=resolution, bucket_start=bucket_start, dimension=dimension)
+            .exclude(value=OTHER).order_by("-count", "value").values_list("pk", "count")[TOP_VALUES:]
+        )
+        if not tail:
+            AlertRollup.objects.filter(
+                resolution=resolution, bucket_start=bucket_start, dimension=dimension, value=OTHER, count=0,
+            ).delete()
+            return 0
+        apply_counts({other_key: sum(count for _pk, count in tail)})
+        AlertRollup.objects.filter(pk__in=[pk for pk, _count in tail]).delete()
+    return len(tail)
+
+
+def rebuild(queryset, batch_size=5000, now=None):
+    """Hitung ulang seluruh rollup dari tabel Alert."""
+    AlertRollup.objects.all().delete()
+    batch = []
+    total = 0
+    for alert in queryset.exclude(timestamp=None).only(
+        "timestamp", "action", "protocol", "signature", "src_ip"
+    ).order_by("timestamp").iterator(chunk_size=batch_size):
+        batch.append(alert)
+        if len(batch) >= batch_size:
+            record(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        record(batch)
+        total += len(batch)
+    compact(now)
+    return total
+
+
+def choose_resolution(start, bucket_seconds, now=None):
+    """Resolusi tersimpan paling kasar yang masih pas dengan ukuran bucket dan rentang."""
+    now = now or timezone.now()
+    chosen = None
+    for resolution, seconds in sorted(RESOLUTION_SECONDS.items(), key=lambda item: item[1]):
+        if seconds > bucket_seconds or bucket_seconds % seconds:
+            continue
+        days = RETENTION_DAYS[resolution]
+        if days is not None and start < now - datetime.timedelta(days=days):
+            continue
+        chosen = resolution
+    if chosen is None:
+        # Data halus sudah di-downsample: pakai resolusi kasar yang tersedia
+        for resolution in ("hour", "day"):
+            days = RETENTION_DAYS[resolution]
+            if days is None or start >= now - datetime.timedelta(days=days):
+                return resolution
+        return "day"
+    return chosen
+
+
+def _bucket_floor(dt, bucket, bucket_seconds):
+    local = timezone.localtime(dt)
+    if bucket == "week":
+        day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day - datetime.timedelta(days=local.weekday())
+    if bucket_seconds >= 86400:
+        return local.replace(hour=0, minute=0, second=0, microsecond=0)
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed = (local - midnight).seconds
+    return midnight + datetime.timedelta(seconds=elapsed - elapsed % bucket_seconds)
+
+
+def query_series(start, end, bucket="hour", dimension="action", values=None, top=None, now=None):
+    """Deret waktu [start, end) per bucket untuk satu dimensi.
+
+    Mengembalikan dict {"labels", "series", "resolution", "bucket"}; label
+    berupa awal bucket (ISO 8601, waktu lokal).
+    """
+    if bucket not in BUCKET_SECONDS:
+        raise RangeError(f"Bucket tidak dikenal: {bucket}")
+    if end <= start:
+        raise RangeError("Rentang waktu tidak valid.")
+    bucket_seconds = BUCKET_SECONDS[bucket]
+    resolution = choose_resolution(start, bucket_seconds, now)
+    if RESOLUTION_SECONDS[resolution] > bucket_seconds:
+        bucket = resolution
+        bucket_seconds = RESOLUTION_SECONDS[resolution]
+    if dimension not in RESOLUTION_DIMENSIONS[resolution]:
+        raise RangeError(f"Dimensi '{dimension}' tidak tersedia pada resolusi {resolution}.")
+
+    labels = []
+    cursor = _bucket_floor(start, bucket, bucket_seconds)
+    while cursor < end:
+        labels.append(cursor)
+        if len(labels) > MAX_POINTS:
+            raise RangeError(f"Terlalu banyak titik data (maks {MAX_POINTS}); perbesar ukuran bucket.")
+        cursor = timezone.localtime(cursor + datetime.timedelta(seconds=bucket_seconds))
+    index = {label: position for position, label in enumerate(labels)}
+
+    rows = AlertRollup.objects.filter(
+        resolution=resolution, dimension=dimension,
+        bucket_start__gte=floor_time(start, resolution), bucket_start__lt=end,
+    )
+    if values:
+        rows = rows.filter(value__in=values)
+
+    series = defaultdict(lambda: [0] * len(labels))
+    for bucket_start, value, count in rows.values_list("bucket_start", "value", "count").iterator():
+        position = index.get(_bucket_floor(bucket_start, bucket, bucket_seconds))
+        if position is not None:
+            series[value][position] += count
+
+    if top and len(series) > top:
+        ranked = sorted((v for v in series if v != OTHER), key=lambda v: sum(series[v]), reverse=True)
+        other = series[OTHER]
+        for value in ranked[top:]:
+            for position, count in enumerate(series.pop(value)):
+                other[position] += count
+
+    return {
+        "labels": [label.isoformat() for label in labels],
+        "series": dict(series),
+        "resolution": resolution,
+        "bucket": bucket,
+    }
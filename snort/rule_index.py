@@ -0,0 +1,294 @@
+import os
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
+
+# Indeks metadata rule Snort: tiap file .rules di-parse sekali dan hanya
+# di-parse ulang bila mtime/size berubah. Mendukung lookup SID, classtype
+# dan substring msg (indeks trigram) di semua direktori rules.
+
+TEXT_CACHE_FILES = 4
+
+_RULE_START = re.compile(
+    r"^\s*(#\s*)?(alert|drop|block|pass|reject|rewrite|log|sdrop|react)\s+([^(]*?)\s*\("
+)
+_OPT_MSG = re.compile(r'\bmsg\s*:\s*"((?:[^"\\]|\\.)*)"')
+_OPT_SID = re.compile(r"\bsid\s*:\s*(\d+)")
+_OPT_GID = re.compile(r"\bgid\s*:\s*(\d+)")
+_OPT_REV = re.compile(r"\brev\s*:\s*(\d+)")
+_OPT_CLASSTYPE = re.compile(r"\bclasstype\s*:\s*([^;\s]+)")
+
+
+class Rule:
+    __slots__ = (
+        "action", "protocol", "header", "msg", "gid", "sid", "rev",
+        "classtype", "enabled", "path", "line",
+    )
+
+    def __init__(self, action, header, options, enabled, path, line):
+        self.action = action
+        self.header = header
+        self.protocol = header.split(None, 1)[0] if header else ""
+        msg = _OPT_MSG.search(options)
+        self.msg = msg.group(1) if msg else ""
+        gid = _OPT_GID.search(options)
+        self.gid = int(gid.group(1)) if gid else 1
+        sid = _OPT_SID.search(options)
+        self.sid = int(sid.group(1)) if sid else None
+        rev = _OPT_REV.search(options)
+        self.rev = int(rev.group(1)) if rev else None
+        classtype = _OPT_CLASSTYPE.search(options)
+        self.classtype = classtype.group(1) if classtype else ""
+        self.enabled = enabled
+        self.path = path
+        self.line = line
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def __repr__(self):
+        return f"<Rule {self.gid}:{self.sid} {self.msg!r}>"
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def parse_rules(path, lines):
+    """Parse rule (aktif maupun yang di-comment) dan hitung baris non-komentar."""
+    rules = []
+    rule_count = 0
+    pending = None
+    for number, raw in enumerate(lines, start=1):
+        stripped = raw.strip()
+        if stripped and not stripped.startswith("#"):
+            rule_count += 1
+
+        if pending is not None:
+            # Rule multi-baris: gabungkan sampai tanda kurung penutup
+            start, text = pending
+            text += " " + stripped.lstrip("#").rstrip("\\")
+            if stripped.endswith(")") or stripped.endswith(");"):
+                pending = None
+                _append_rule(rules, text, path, start)
+            else:
+                pending = (start, text)
+            continue
+
+        if not stripped or not _RULE_START.match(stripped):
+            continue
+        if stripped.endswith("\\") or ")" not in stripped:
+            pending = (number, stripped.rstrip("\\"))
+            continue
+        _append_rule(rules, stripped, path, number)
+    return rules, rule_count
+
+
+def _append_rule(rules, text, path, number):
+    match = _RULE_START.match(text)
+    if match:
+        disabled, action, header = match.groups()
+        rules.append(Rule(action, header, text[match.end():], not disabled, path, number))
+
+
+class RuleFile:
+    __slots__ = ("name", "path", "directory", "size", "mtime", "mtime_ns", "rule_count",
+                 "rules", "by_sid", "trigrams")
+
+    def __init__(self, name, path, directory, stats):
+        self.name = name
+        self.path = path
+        self.directory = directory
+        self.size = stats.st_size
+        self.mtime = stats.st_mtime
+        self.mtime_ns = stats.st_mtime_ns
+        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            self.rules, self.rule_count = parse_rules(path, handle)
+        self.by_sid = {(rule.gid, rule.sid): rule for rule in self.rules if rule.sid is not None}
+        self.trigrams = defaultdict(list)
+        for idx, rule in enumerate(self.rules):
+            for gram in _trigrams(rule.msg.lower()):
+                self.trigrams[gram].append(idx)
+
+    def is_current(self, stats):
+        return self.size == stats.st_size and self.mtime_ns == stats.st_mtime_ns
+
+    def search_msg(self, term):
+        grams = _trigrams(term)
+        if not grams:
+            return [rule for rule in self.rules if term in rule.msg.lower()]
+        postings = sorted((self.trigrams.get(gram, ()) for gram in grams), key=len)
+        if not postings[0]:
+            return []
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return [self.rules[idx] for idx in sorted(candidates) if term in self.rules[idx].msg.lower()]
+
+
+class _FileText:
+    """Isi file + versi lowercase + offset awal baris, untuk pencarian cepat str.find."""
+
+    __slots__ = ("key", "text", "lower", "starts")
+
+    def __init__(self, path, key):
+        self.key = key
+        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            self.text = handle.read()
+        self.lower = self.text.lower()
+        if len(self.lower) != len(self.text):
+            # Lowercase unicode tertentu mengubah panjang: offset tidak lagi sejajar
+            self.lower = None
+        starts = [0]
+        pos = self.text.find("\n")
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = self.text.find("\n", pos + 1)
+        if starts[-1] == len(self.text):
+            starts.pop()
+        self.starts = starts
+
+    def line(self, idx):
+        end = self.starts[idx + 1] - 1 if idx + 1 < len(self.starts) else len(self.text)
+        return self.text[self.starts[idx]:end].rstrip("\r")
+
+    def search(self, term, limit):
+        """Nomor baris (0-based) yang memuat term, maksimal limit + 1 hasil."""
+        if self.lower is None:
+            return [idx for idx in range(len(self.starts)) if term in self.line(idx).lower()][:limit + 1]
+        found = []
+        pos = self.lower.find(term)
+        while pos != -1 and len(found) <= limit:
+            idx = bisect_right(self.starts, pos) - 1
+            found.append(idx)
+            if idx + 1 >= len(self.starts):
+                break
+            pos = self.lower.find(term, self.starts[idx + 1])
+        return found
+
+
+class RuleIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+        self._by_sid = {}
+        self._by_classtype = {}
+        self._texts = OrderedDict()
+
+    def refresh(self, directories):
+        """Sinkronkan dengan isi direktori; hanya file yang berubah di-parse ulang."""
+        with self._lock:
+            current = OrderedDict()
+            changed = False
+            for directory in directories:
+                if not os.path.isdir(directory):
+                    continue
+                try:
+                    entries = sorted(os.listdir(directory))
+                except OSError:
+                    continue
+                for name in entries:
+                    if not name.endswith(".rules"):
+                        continue
+                    path = os.path.join(directory, name)
+                    if path in current:
+                        continue
+                    try:
+                        stats = os.stat(path)
+                    except OSError:
+                        continue
+                    if not os.path.isfile(path):
+                        continue
+                    entry = self._files.get(path)
+                    if entry is None or not entry.is_current(stats):
+                        try:
+                            entry = RuleFile(name, path, directory, stats)
+                        except OSError:
+                            continue
+                        changed = True
+                    current[path] = entry
+
+            if changed or list(current) != list(self._files):
+                self._files = current
+                self._rebuild_lookups()
+            return list(self._files.values())
+
+    def _rebuild_lookups(self):
+        by_sid = {}
+        by_classtype = defaultdict(list)
+        for entry in self._files.values():
+            by_sid.update(entry.by_sid)
+            for rule in entry.rules:
+                if rule.classtype:
+                    by_classtype[rule.classtype.lower()].append(rule)
+        self._by_sid = by_sid
+        self._by_classtype = dict(by_classtype)
+
+    def files(self):
+        return list(self._files.values())
+
+    def lookup_sid(self, sid, gid=1):
+        return self._by_sid.get((gid, sid))
+
+    def resolve(self, alert):
+        """Rule yang memicu alert (berdasarkan gid:sid), atau None."""
+        if alert.sid is None:
+            return None
+        try:
+            return self._by_sid.get((int(alert.gid or 1), int(alert.sid)))
+        except (TypeError, ValueError):
+            return None
+
+    def by_classtype(self, classtype):
+        return list(self._by_classtype.get(classtype.lower(), ()))
+
+    def classtypes(self):
+        return sorted(self._by_classtype)
+
+    def search_msg(self, term, limit=200):
+        term = term.lower()
+        results = []
+        for entry in list(self._files.values()):
+            results.extend(entry.search_msg(term))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def _file_text(self, path):
+        try:
+            stats = os.stat(path)
+        except OSError:
+            return None
+        key = (stats.st_mtime_ns, stats.st_size)
+        with self._lock:
+            cached = self._texts.get(path)
+            if cached is not None and cached.key == key:
+                self._texts.move_to_end(path)
+                return cached
+        cached = _FileText(path, key)
+        with self._lock:
+            self._texts[path] = cached
+            while len(self._texts) > TEXT_CACHE_FILES:
+                self._texts.popitem(last=False)
+        return cached
+
+    def read_lines(self, path, search_term=None, max_lines=5000):
+        """Baris file (nomor 1-based, isi) yang memuat search_term; (rows, truncated)."""
+        text = self._file_text(path)
+        if text is None:
+            raise FileNotFoundError(path)
+        if search_term:
+            indexes = text.search(search_term.lower(), max_lines)
+        else:
+            indexes = range(min(len(text.starts), max_lines + 1))
+        rows = [(idx + 1, text.line(idx)) for idx in indexes]
+        truncated = len(rows) > max_lines
+        return rows[:max_lines], truncated
+
+
+# Satu indeks per proses; bertahan antar request.
+rule_index = RuleIndex()
@@ -0,0 +1,140 @@
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RuleProfileEntry, RuleProfileSnapshot
+
+# Parser keluaran rule profiler Snort 3 (`profiler = { rules = { show = true } }`),
+# yang dicetak ke stdout/journal saat Snort berhenti atau lewat
+# `profiler.rule_dump()`. Contoh tabel:
+#
+#   #  gid  sid rev  checks matches alerts time (us) avg/check avg/match avg/non-match timeouts suspends
+#   =  ===  === ===  ====== ======= ====== ========= ========= ========= ============= ======== ========
+#   1    1 2001  1    1200      10     10      5400       4.5       6.1           4.4        0        0
+
+# Prefix baris journalctl: 'Oct 17 12:00:00 host snort[123]: '
+_JOURNAL_PREFIX = re.compile(r"^\w{3}\s+\d+\s+[\d:]+\s+\S+\s+[^\s:]+:\s?")
+_HEADER_ALIASES = {
+    "time (us)": "time_us",
+    "rule_time (%)": "rule_time_pct",
+    "avg/check": "avg_check_us",
+    "avg/match": "avg_match_us",
+    "avg/non-match": "avg_nonmatch_us",
+}
+INT_COLUMNS = ("gid", "sid", "rev", "checks", "matches", "alerts", "time_us", "timeouts", "suspends")
+FLOAT_COLUMNS = ("avg_check_us", "avg_match_us", "avg_nonmatch_us")
+DEFAULT_KEEP = 100
+
+
+class ProfileError(ValueError):
+    pass
+
+
+def _header_columns(line):
+    if "gid" not in line or "sid" not in line or "checks" not in line:
+        return None
+    for label, name in _HEADER_ALIASES.items():
+        line = line.replace(label, name)
+    return line.split()
+
+
+def _number(text, cast):
+    try:
+        return cast(text)
+    except ValueError:
+        return None
+
+
+def parse(lines):
+    """Baris tabel rule profiler terakhir dalam input: [{gid, sid, checks, time_us, ...}].
+
+    Input boleh berupa keluaran journalctl; bila ada beberapa dump, yang
+    terakhir dipakai (penghitung profiler kumulatif sejak start).
+    """
+    tables = []
+    columns = None
+    for raw in lines:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8", "replace")
+        line = _JOURNAL_PREFIX.sub("", raw.rstrip("\r\n"))
+        header = _header_columns(line)
+        if header is not None:
+            columns = header
+            tables.append([])
+            continue
+        if columns is None:
+            continue
+        values = line.split()
+        if not values or set(values[0]) <= {"=", "-"}:
+            continue
+        if len(values) < len(columns) or not values[0].isdigit():
+            # Tabel selesai
+            columns = None
+            continue
+        row = dict(zip(columns, values))
+        entry = {}
+        for name in INT_COLUMNS:
+            entry[name] = _number(row.get(name, "0"), int) or 0
+        for name in FLOAT_COLUMNS:
+            entry[name] = _number(row.get(name, "0"), float) or 0.0
+        if entry["sid"]:
+            tables[-1].append(entry)
+    for table in reversed(tables):
+        if table:
+            return table
+    raise ProfileError("Tabel rule profiler tidak ditemukan (kolom gid/sid/checks).")
+
+
+def import_profile(lines, source="", captured_at=None, keep=DEFAULT_KEEP):
+    """Simpan satu snapshot profiler; snapshot lama di luar `keep` terakhir dihapus."""
+    rows = parse(lines)
+    with transaction.atomic():
+        snapshot = RuleProfileSnapshot.objects.create(
+            source=source[:255], captured_at=captured_at or timezone.now(),
+            rule_count=len(rows), total_time_us=sum(row["time_us"] for row in rows),
+            total_checks=sum(row["checks"] for row in rows),
+        )
+        RuleProfileEntry.objects.bulk_create(
+            [RuleProfileEntry(snapshot=snapshot, **{name: row[name] for name in INT_COLUMNS + FLOAT_COLUMNS})
+             for row in rows],
+            batch_size=1000,
+        )
+        if keep:
+            stale = RuleProfileSnapshot.objects.order_by("-captured_at", "-id").values_list("id", flat=True)[keep:]
+            RuleProfileSnapshot.objects.filter(id__in=list(stale)).delete()
+    return snapshot
+
+
+def trends(snapshot, keys, points=10):
+    """{(gid, sid): [avg/check per snapshot]} untuk `points` snapshot sampai `snapshot` (lama -> baru)."""
+    snapshot_ids = list(
+        RuleProfileSnapshot.objects.filter(captured_at__lte=snapshot.captured_at)
+        .order_by("-captured_at", "-id").values_list("id", flat=True)[:points]
+    )[::-1]
+    position = {snapshot_id: index for index, snapshot_id in enumerate(snapshot_ids)}
+    sids = {sid for _gid, sid in keys}
+    series = {key: [None] * len(snapshot_ids) for key in keys}
+    rows = RuleProfileEntry.objects.filter(snapshot_id__in=snapshot_ids, sid__in=sids).values_list(
+        "snapshot_id", "gid", "sid", "avg_check_us"
+    )
+    for snapshot_id, gid, sid, avg in rows:
+        values = series.get((gid, sid))
+        if values is not None:
+            values[position[snapshot_id]] = avg
+    return series
+
+
+_SPARK = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values):
+    present = [value for value in values if value is not None]
+    if not present:
+        return ""
+    low, high = min(present), max(present)
+    span = high - low or 1
+    return "".join(
+        " " if value is None else _SPARK[min(int((value - low) / span * (len(_SPARK) - 1)), len(_SPARK) - 1)]
+        for value in values
+    )
@@ -0,0 +1,271 @@
+import heapq
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import django
+from django.conf import settings
+
+from .alerts import Clock, decode_line, decode_lines
+from .filters import compile_filters
+from .reader import find_offset, iter_alerts_reversed, iter_matching_lines, mapped
+
+# Mesin pemindaian banyak file log: tiap file (dan file besar per rentang
+# byte yang diselaraskan ke newline) dipindai oleh proses terpisah lalu
+# hasilnya digabung dengan k-way merge berdasarkan timestamp.
+
+CHUNK_BYTES = 32 * 1024 * 1024
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+READ_BYTES = 4 * 1024 * 1024
+DECODE_BATCH = 5000
+# Jumlah pemindaian yang boleh memakai pool bersamaan; sisanya menunggu giliran
+CONCURRENT_SCANS = 2
+# Halaman terdalam yang dipindai paralel; lebih dalam dibaca bertahap saja
+MAX_PAGE = 200
+
+_OLDEST = datetime.min.replace(tzinfo=dt_timezone.utc)
+# Toleransi baris yang sedikit tidak berurutan saat memotong file per rentang waktu
+TIME_SLACK = timedelta(minutes=5)
+
+
+def sort_key(alert):
+    return alert.sort_key or _OLDEST
+
+
+def prefiltered(decode_batch, needle):
+    """decode_batch yang hanya men-decode baris yang memuat `needle`."""
+    if needle is None:
+        return decode_batch
+    search = needle.search
+    return lambda lines: decode_batch([line for line in lines if search(line)])
+
+
+def time_bounds(path, criteria):
+    """Rentang byte (awal, akhir) file yang bisa memuat alert dalam jendela waktu filter.
+
+    Log ditulis berurutan waktu sehingga batasnya cukup dicari dengan binary
+    search; tanpa filter waktu seluruh file dipakai.
+    """
+    start, end = 0, None
+    if criteria.time_from is not None:
+        lower = criteria.time_from - TIME_SLACK
+        start = find_offset(path, lambda alert: alert.sort_key is None or alert.sort_key >= lower, decode_line)
+    if criteria.time_to is not None:
+        upper = criteria.time_to + TIME_SLACK
+        end = find_offset(
+            path, lambda alert: alert.sort_key is not None and alert.sort_key > upper, decode_line, undecodable=False,
+        )
+    return start, end
+
+
+def iter_merged_reversed(paths, criteria=None, decode_batch=decode_lines):
+    """Alert cocok terbaru-dulu dari beberapa file sekaligus (lazy, tanpa proses tambahan).
+
+    Filter didorong ke pembaca: hanya rentang byte dalam jendela waktu yang
+    dibaca dan baris tanpa needle dibuang sebelum decode.
+    """
+    streams = []
+    for path in paths:
+        if criteria is None:
+            streams.append(iter_alerts_reversed(path, decode_batch))
+            continue
+        try:
+            start, end = time_bounds(path, criteria)
+        except OSError:
+            continue
+        alerts = iter_alerts_reversed(path, prefiltered(decode_batch, criteria.needle), start=start, end=end)
+        streams.append(criteria.apply(alerts))
+    if len(streams) == 1:
+        return streams[0]
+    return heapq.merge(*streams, key=sort_key, reverse=True)
+
+
+def split_ranges(path, chunk_bytes=CHUNK_BYTES, start=0, end=None):
+    """Bagi [start, end) file menjadi rentang (path, awal, akhir) yang berakhir tepat setelah newline."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return []
+    size = size if end is None else min(end, size)
+    ranges = []
+    with open(path, "rb") as handle:
+        while start < size:
+            end = start + chunk_bytes
+            if end >= size:
+                end = size
+            else:
+                handle.seek(end)
+                handle.readline()
+                end = min(handle.tell(), size)
+            ranges.append((path, start, end))
+            start = end
+    return ranges
+
+
+def _iter_line_batches(path, start, end):
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = end - start
+        carry = b""
+        while remaining > 0:
+            data = handle.read(min(READ_BYTES, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            lines = (carry + data).split(b"\n")
+            carry = lines.pop()
+            yield lines
+        if carry:
+            yield [carry]
+
+
+def _iter_candidate_batches(path, start, end, needle):
+    # Pencarian needle langsung di mmap; hanya baris kandidat yang disalin
+    with mapped(path) as view:
+        if view is None:
+            return
+        batch = []
+        for line in iter_matching_lines(view, needle, start, min(end, len(view))):
+            batch.append(line)
+            if len(batch) >= DECODE_BATCH:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def scan_range(path, start, end, params, limit=None):
+    """Dijalankan di proses worker: (alert cocok terbaru-dulu, maksimal `limit`; jumlah cocok).
+
+    Menerima parameter filter mentah (dict) karena predikat hasil kompilasi
+    tidak bisa di-pickle; kompilasi diulang di worker.
+    """
+    clock = Clock()
+    matched = 0
+    criteria = compile_filters(params)
+    needle = criteria.needle
+    if needle is None:
+        batches = _iter_line_batches(path, start, end)
+    else:
+        batches = _iter_candidate_batches(path, start, end, needle)
+
+    def matching():
+        nonlocal matched
+        for lines in batches:
+            for alert in criteria.apply(decode_lines(lines, clock)):
+                matched += 1
+                yield alert
+
+    if limit:
+        alerts = heapq.nlargest(limit, matching(), key=sort_key)
+    else:
+        alerts = sorted(matching(), key=sort_key, reverse=True)
+    return alerts, matched
+
+
+class ScanResult:
+    __slots__ = ("alerts", "matched", "ranges", "workers")
+
+    def __init__(self, alerts, matched, ranges, workers):
+        self.alerts = alerts
+        self.matched = matched
+        self.ranges = ranges
+        self.workers = workers
+
+
+# Satu pool per proses worker web, dibuat saat pertama dipakai. Start method
+# forkserver/spawn: worker tidak mewarisi thread dan koneksi server yang di-fork.
+# Initializer-nya django.setup langsung, sebab modul ini baru bisa di-import
+# (lewat filters -> models) setelah Django siap.
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_slots = None
+
+
+def _mp_context():
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _shared_pool():
+    global _pool, _pool_pid, _slots
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=worker_count(), mp_context=_mp_context(), initializer=django.setup
+            )
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(
+                getattr(settings, "SNORT_SCAN_CONCURRENCY", CONCURRENT_SCANS) or 1
+            )
+        return _pool, _slots
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def worker_count():
+    return getattr(settings, "SNORT_SCAN_WORKERS", 0) or os.cpu_count() or 1
+
+
+def should_parallelize(paths, criteria):
+    """Pool hanya sepadan untuk pencarian berfilter atas data yang cukup besar."""
+    if worker_count() < 2 or not criteria:
+        return False
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            continue
+    return total >= getattr(settings, "SNORT_SCAN_PARALLEL_MIN_BYTES", PARALLEL_MIN_BYTES)
+
+
+def scan(paths, criteria, limit=None, workers=None, chunk_bytes=None):
+    """Pindai semua `paths` secara paralel; hasil digabung terbaru-dulu.
+
+    Tiap worker hanya mengembalikan `limit` alert terbarunya sehingga data
+    yang dikirim antar proses tetap kecil, tetapi `matched` tetap jumlah
+    persis seluruh alert yang cocok.
+    """
+    chunk_bytes = chunk_bytes or getattr(settings, "SNORT_SCAN_CHUNK_BYTES", CHUNK_BYTES)
+    ranges = []
+    for path in paths:
+        try:
+            start, end = time_bounds(path, criteria)
+        except OSError:
+            continue
+        ranges.extend(split_ranges(path, chunk_bytes, start, end))
+    workers = min(workers or worker_count(), worker_count(), len(ranges)) or 1
+
+    args = [(path, start, end, criteria.params, limit) for path, start, end in ranges]
+    results = None
+    if workers > 1:
+        try:
+            pool, slots = _shared_pool()
+            with slots:
+                futures = [pool.submit(scan_range, *item) for item in args]
+                results = [future.result() for future in futures]
+        except BrokenProcessPool:
+            # Worker mati (mis. OOM): pool dibuat ulang pada pemindaian berikutnya
+            _discard_pool(pool)
+            results = None
+        except OSError:
+            # Mis. batas proses tercapai: pindai di proses ini saja
+            results = None
+    if results is None:
+        workers = 1
+        results = [scan_range(*item) for item in args]
+
+    merged = heapq.merge(*(alerts for alerts, _ in results), key=sort_key, reverse=True)
+    alerts = list(merged if not limit else (alert for _, alert in zip(range(limit), merged)))
+    return ScanResult(alerts, sum(count for _, count in results), len(ranges), workers)
@@ -0,0 +1,115 @@
+import hashlib
+import re
+import secrets
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import store
+from .alerts import decode_lines
+from .models import Sensor
+
+# Agregasi multi-sensor: tiap gateway Snort menjalankan agent/snort_agent.py
+# yang mengirim baris alert baru (NDJSON, gzip, per batch) ke endpoint
+# ingest dengan token sensornya. Alert masuk ke tabel Alert dengan kolom
+# sensor; file log lokal server ini tercatat sebagai sensor LOCAL (kolom kosong).
+
+LOCAL = "lokal"
+NAME_PATTERN = re.compile(r"[a-z0-9][a-z0-9_-]{0,63}")
+# Batas body setelah dekompresi (pelindung gzip bomb)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class IngestError(ValueError):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def validate_name(name):
+    if not NAME_PATTERN.fullmatch(name) or name == LOCAL:
+        raise ValueError(
+            f"Nama sensor tidak valid: {name!r} (huruf kecil, angka, '-' atau '_'; bukan '{LOCAL}')."
+        )
+    return name
+
+
+def issue_token(sensor):
+    """Token baru untuk sensor (hanya hash-nya yang disimpan); kembalikan token mentah."""
+    token = secrets.token_urlsafe(32)
+    sensor.token_hash = hash_token(token)
+    return token
+
+
+def field_value(name):
+    """Nilai kolom Alert.sensor untuk nama sensor di filter."""
+    return "" if name == LOCAL else name
+
+
+def names():
+    """Pilihan filter sensor: lokal lalu sensor terdaftar."""
+    return [LOCAL] + list(Sensor.objects.values_list("name", flat=True))
+
+
+def authenticate(request):
+    """Sensor aktif pemilik token 'Authorization: Bearer <token>', atau None."""
+    scheme, _, token = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    token = token.strip()
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return Sensor.objects.filter(token_hash=hash_token(token), active=True).first()
+
+
+def read_lines(request, max_bytes=None):
+    """Baris body request (NDJSON mentah atau Content-Encoding: gzip)."""
+    max_bytes = max_bytes or getattr(settings, "SNORT_INGEST_MAX_BYTES", DEFAULT_MAX_BYTES)
+    body = request.body
+    encoding = request.META.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+    if encoding == "gzip":
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            data = decompressor.decompress(body, max_bytes + 1)
+        except zlib.error as exc:
+            raise IngestError(f"Body gzip rusak: {exc}")
+        if decompressor.unconsumed_tail:
+            raise IngestError(f"Batch melebihi {max_bytes} byte setelah dekompresi.", status=413)
+        if not decompressor.eof and len(data) <= max_bytes:
+            # Seluruh body sudah dibaca tapi stream gzip belum selesai: kiriman terpotong
+            raise IngestError("Body gzip terpotong (stream tidak lengkap).")
+    elif encoding in ("", "identity"):
+        data = body
+    else:
+        raise IngestError(f"Content-Encoding tidak didukung: {encoding}", status=415)
+    if len(data) > max_bytes:
+        raise IngestError(f"Batch melebihi {max_bytes} byte setelah dekompresi.", status=413)
+    return data.splitlines()
+
+
+def ingest(sensor, lines, source="", agent_id="", batch=None, address=""):
+    """Simpan satu batch dari agent; kembalikan (jumlah alert, duplikat?).
+
+    Agent mengirim batch berurutan dengan nomor naik per instance; batch
+    yang dikirim ulang (respons sebelumnya hilang) dikenali dari nomornya
+    dan tidak disimpan dua kali.
+    """
+    records = decode_lines(lines)
+    with transaction.atomic():
+        sensor = Sensor.objects.select_for_update().get(pk=sensor.pk)
+        duplicate = bool(batch is not None and agent_id and agent_id == sensor.agent_id
+                         and batch <= sensor.last_batch)
+        inserted = 0
+        if not duplicate:
+            inserted = store.ingest_records(records, f"{sensor.name}:{source}", sensor=sensor.name)
+            sensor.alerts_received += inserted
+            if batch is not None:
+                sensor.agent_id, sensor.last_batch = agent_id[:64], batch
+        sensor.last_seen = timezone.now()
+        sensor.last_address = address[:45]
+        sensor.save(update_fields=["alerts_received", "agent_id", "last_batch", "last_seen", "last_address"])
+    return inserted, duplicate
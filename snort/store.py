@@ -0,0 +1,298 @@
+import logging
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from . import archive, rollup, sensors
+from .aggregator import AlertSnapshot
+from .alerts import Alert as AlertRecord, decode_lines
+from .models import Alert, AlertRollup, IngestCursor
+
+# Penyimpanan alert terindeks (SQLite) yang diisi oleh command ingest_alerts.
+# View logs membaca dari sini bila SNORT_ALERT_STORE aktif.
+
+READ_CHUNK_SIZE = 1024 * 1024
+DEFAULT_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled():
+    return getattr(settings, "SNORT_ALERT_STORE", False)
+
+
+def enable_sqlite_wal(sender, connection, **kwargs):
+    """WAL agar proses ingest bisa menulis selagi view membaca tanpa 'database is locked'."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL;")
+            cursor.execute("PRAGMA synchronous=NORMAL;")
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_text(value, max_length):
+    if value in (None, "N/A"):
+        return ""
+    return str(value)[:max_length]
+
+
+def _build_alert(record, source_file, sensor=""):
+    return Alert(
+        timestamp=record.sort_key,
+        action=record.action,
+        signature=_to_text(record.signature, 255),
+        src_ip=_to_text(record.src_ip, 45),
+        src_port=_to_int(record.src_port),
+        dst_ip=_to_text(record.dst_ip, 45),
+        dst_port=_to_int(record.dst_port),
+        protocol=_to_text(record.protocol, 16),
+        priority=_to_text(record.priority, 16),
+        gid=_to_int(record.gid), sid=_to_int(record.sid), rev=_to_int(record.rev),
+        classification=_to_text(record.classification, 128),
+        source_file=source_file, sensor=sensor,
+    )
+
+
+def alert_from_model(alert):
+    """Ubah baris tabel menjadi record Alert yang sama dengan hasil parser file."""
+    return AlertRecord(
+        sort_key=alert.timestamp, action=alert.action, signature=alert.signature or "N/A",
+        src_ip=alert.src_ip or "N/A", src_port=alert.src_port if alert.src_port is not None else "N/A",
+        dst_ip=alert.dst_ip or "N/A", dst_port=alert.dst_port if alert.dst_port is not None else "N/A",
+        protocol=alert.protocol or "N/A", priority=alert.priority or "N/A",
+        gid=alert.gid, sid=alert.sid, rev=alert.rev, classification=alert.classification or "N/A",
+    )
+
+
+def iter_alerts(criteria, chunk_size=2000):
+    """Record Alert hasil query_alerts secara streaming (terbaru dulu)."""
+    return (alert_from_model(alert) for alert in query_alerts(criteria).iterator(chunk_size=chunk_size))
+
+
+def _cursor_for(path, stats):
+    """IngestCursor path; posisi baca ikut pindah saat file dirotasi dengan rename."""
+    cursor, _ = IngestCursor.objects.get_or_create(path=path)
+    if (cursor.device, cursor.inode) == (stats.st_dev, stats.st_ino) and stats.st_size >= cursor.offset:
+        return cursor
+
+    origin = archive.origin_path(path)
+    if origin == path and cursor.inode is not None:
+        # File aktif dirotasi: posisi lama milik file rollover ber-inode sama
+        rolled = archive.rolled_files(path)
+        for rolled_path in rolled:
+            try:
+                rolled_stats = os.stat(rolled_path)
+            except OSError:
+                continue
+            if (rolled_stats.st_dev, rolled_stats.st_ino) == (cursor.device, cursor.inode):
+                IngestCursor.objects.get_or_create(path=rolled_path, defaults={
+                    "device": cursor.device, "inode": cursor.inode, "offset": cursor.offset,
+                })
+                break
+        # Cursor file rollover yang sudah disegel ke arsip
+        stale = [
+            other for other in IngestCursor.objects.filter(path__startswith=path + ".").values_list("path", flat=True)
+            if archive.origin_path(other) == path and other not in rolled
+        ]
+        IngestCursor.objects.filter(path__in=stale).delete()
+
+    offset = 0
+    if origin != path:
+        # File rollover yang belum punya cursor: lanjutkan dari posisi file aktif dulu
+        previous = IngestCursor.objects.filter(path=origin, device=stats.st_dev, inode=stats.st_ino).first()
+        if previous is not None and previous.offset <= stats.st_size:
+            offset = previous.offset
+    # Selain itu file baru atau di-truncate: mulai dari awal
+    cursor.device, cursor.inode, cursor.offset = stats.st_dev, stats.st_ino, offset
+    cursor.save()
+    return cursor
+
+
+def _skip_to_newline(handle, skipped, limit):
+    """Jumlah byte sampai dan termasuk newline berikutnya (atau sampai `limit` bila belum ada)."""
+    while skipped < limit:
+        data = handle.read(min(READ_CHUNK_SIZE, limit - skipped))
+        if not data:
+            break
+        newline = data.find(b"\n")
+        if newline >= 0:
+            return skipped + newline + 1
+        skipped += len(data)
+    return skipped
+
+
+def ingest_path(path, batch_size=DEFAULT_BATCH_SIZE, on_records=None):
+    """Baca byte baru dari path sejak offset tersimpan dan bulk-insert ke tabel Alert.
+
+    `on_records` (opsional) menerima tiap batch record Alert hasil decode,
+    mis. untuk pipeline autoblock.
+    """
+    try:
+        stats = os.stat(path)
+    except OSError:
+        return 0
+
+    cursor = _cursor_for(path, stats)
+
+    inserted = 0
+    pending = []
+    pending_offset = cursor.offset
+
+    def flush():
+        with transaction.atomic():
+            Alert.objects.bulk_create(pending, batch_size=batch_size)
+            rollup.record(pending)
+            cursor.offset = pending_offset
+            cursor.save(update_fields=["device", "inode", "offset", "updated_at"])
+        pending.clear()
+
+    with open(path, "rb") as handle:
+        handle.seek(cursor.offset)
+        while pending_offset < stats.st_size:
+            chunk = handle.read(min(READ_CHUNK_SIZE, stats.st_size - pending_offset))
+            if not chunk:
+                break
+            # Baris terakhir yang belum lengkap ditunda sampai putaran berikutnya
+            cut = chunk.rfind(b"\n")
+            if cut < 0:
+                if len(chunk) < READ_CHUNK_SIZE:
+                    break
+                # Satu "baris" lebih dari READ_CHUNK_SIZE bukan alert; tanpa dilewati
+                # ingest akan membaca ulang potongan yang sama selamanya
+                skipped = _skip_to_newline(handle, len(chunk), stats.st_size - pending_offset)
+                logger.warning("%s: %d byte tanpa newline dilewati mulai offset %d", path, skipped, pending_offset)
+                pending_offset += skipped
+                handle.seek(pending_offset)
+                continue
+            complete = chunk[:cut + 1]
+            handle.seek(pending_offset + len(complete))
+            pending_offset += len(complete)
+
+            records = decode_lines(complete.splitlines())
+            if on_records is not None:
+                on_records(records)
+            pending.extend(_build_alert(record, path) for record in records)
+            if len(pending) >= batch_size:
+                inserted += len(pending)
+                flush()
+
+    if pending or pending_offset != cursor.offset:
+        inserted += len(pending)
+        flush()
+    return inserted
+
+
+def ingest_records(records, source_file, sensor="", batch_size=DEFAULT_BATCH_SIZE):
+    """Bulk-insert record hasil decode (mis. batch dari agent sensor); panggil di dalam transaksi."""
+    alerts = [_build_alert(record, source_file[:512], sensor) for record in records]
+    Alert.objects.bulk_create(alerts, batch_size=batch_size)
+    rollup.record(alerts)
+    return len(alerts)
+
+
+def sensor_snapshot(sensor, since):
+    """AlertSnapshot (jumlah per tanggal/jam/action sejak `since`) untuk alert satu sensor."""
+    qs = Alert.objects.filter(sensor=sensor)
+    rows = (
+        qs.filter(timestamp__gte=since).annotate(hour=TruncHour("timestamp"))
+        .order_by().values_list("hour", "action").annotate(hits=Count("id"))
+    )
+    buckets = Counter()
+    for hour, action, hits in rows:
+        local = timezone.localtime(hour)
+        buckets[(local.date(), local.hour, action)] += hits
+    return AlertSnapshot(qs.count(), buckets)
+
+
+def clear_store():
+    Alert.objects.all().delete()
+    AlertRollup.objects.all().delete()
+
+
+def active_paths():
+    return list(IngestCursor.objects.order_by("path").values_list("path", flat=True))
+
+
+def _ip_condition(field, matcher):
+    if matcher.exact is not None:
+        return Q(**{f"{field}__in": list(matcher.exact)})
+    prefixes = matcher.prefixes()
+    if prefixes is None:
+        # CIDR IPv6 tidak bisa dinyatakan sebagai prefix string: cocokkan nilai unik di Python
+        values = Alert.objects.order_by().values_list(field, flat=True).distinct()
+        return Q(**{f"{field}__in": [value for value in values if matcher(value)]})
+    condition = Q()
+    for prefix in prefixes:
+        lookup = "startswith" if prefix.endswith(".") else "exact"
+        condition |= Q(**{f"{field}__{lookup}": prefix})
+    return condition
+
+
+def _port_condition(field, matcher):
+    condition = Q()
+    for low, high in matcher.ranges:
+        condition |= Q(**{f"{field}__range": (low, high)})
+    return condition
+
+
+def query_alerts(criteria):
+    """QuerySet alert terurut terbaru dengan filter FilterSet yang sama seperti pembaca file."""
+    qs = Alert.objects.all()
+    if criteria.sensor:
+        qs = qs.filter(sensor=sensors.field_value(criteria.sensor))
+    if criteria.action:
+        qs = qs.filter(action=criteria.action)
+    if criteria.protocols:
+        condition = Q()
+        for protocol in criteria.protocols:
+            condition |= Q(protocol__iexact=protocol)
+        qs = qs.filter(condition)
+    for field in ("src_ip", "dst_ip"):
+        matcher = getattr(criteria, field)
+        if matcher is not None:
+            qs = qs.filter(_ip_condition(field, matcher))
+    for field in ("src_port", "dst_port"):
+        matcher = getattr(criteria, field)
+        if matcher is not None:
+            qs = qs.filter(_port_condition(field, matcher))
+    if criteria.time_from is not None:
+        qs = qs.filter(timestamp__gte=criteria.time_from)
+    if criteria.time_to is not None:
+        qs = qs.filter(timestamp__lte=criteria.time_to)
+    if criteria.signature:
+        qs = qs.filter(signature__icontains=criteria.signature)
+    if criteria.signature_regex is not None:
+        qs = qs.filter(signature__iregex=criteria.signature_regex.pattern)
+    search = criteria.search
+    if search:
+        # Sama dengan predikat FilterSet untuk file: signature atau IP, tanpa timestamp
+        qs = qs.filter(
+            Q(signature__icontains=search) | Q(src_ip__icontains=search) | Q(dst_ip__icontains=search)
+        )
+    return qs
+
+
+def sid_hits(since=None, limit=None):
+    """[(gid, sid, jumlah, signature)] diagregasi di database, terbanyak dulu."""
+    qs = Alert.objects.exclude(sid=None)
+    if since is not None:
+        qs = qs.filter(timestamp__gte=since)
+    rows = (
+        qs.order_by().values("gid", "sid")
+        .annotate(hits=Count("id"), sample_signature=Max("signature"))
+        .order_by("-hits", "gid", "sid")
+    )
+    if limit:
+        rows = rows[:limit]
+    return [(row["gid"] or 1, row["sid"], row["hits"], row["sample_signature"] or "N/A") for row in rows]
@@ -0,0 +1,798 @@
+import importlib.util
+import io
+import os
+import random
+import tempfile
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import aggregator, archive, autoblock, ipset, ipsync, live, logfiles, rollup, scan, sensors, store
+from .alerts import Alert, Clock, decode_fast, decode_json, decode_line, decode_lines
+from .coalesce import coalesce
+from .filters import compile_filters
+from .heavy_hitters import SpaceSaving
+from .models import Alert as StoredAlert, AlertRollup, AutoBlock, IngestCursor, Sensor
+
+
+def _clock(year, month, day, hour=12):
+    return Clock(now=timezone.make_aware(datetime(year, month, day, hour)))
+
+
+class DecodeJsonTests(SimpleTestCase):
+    LINE = ('{"timestamp": "25/10/17-12:34:56.123456", "proto": "TCP", "src_addr": "10.0.0.1", '
+            '"src_port": 51000, "dst_addr": "10.0.0.2", "dst_port": 80, "gid": 1, "sid": 1000001, '
+            '"rev": 2, "action": "would_drop", "msg": "SCAN test", "class": "Attempted Recon", "priority": 2}')
+
+    def test_fields(self):
+        alert = decode_json(self.LINE, _clock(2025, 10, 18))
+        self.assertIsInstance(alert, Alert)
+        self.assertEqual(alert.sort_key, timezone.make_aware(datetime(2025, 10, 17, 12, 34, 56, 123456)))
+        self.assertEqual((alert.src_ip, alert.src_port, alert.dst_ip, alert.dst_port),
+                         ("10.0.0.1", 51000, "10.0.0.2", 80))
+        self.assertEqual((alert.gid, alert.sid, alert.rev), (1, 1000001, 2))
+        self.assertEqual(alert.action, "drop")
+        self.assertEqual(alert.signature, "SCAN test")
+        self.assertEqual(alert.classification, "Attempted Recon")
+
+    def test_missing_fields_default_to_na(self):
+        alert = decode_json('{"msg": ""}', _clock(2025, 10, 18))
+        self.assertIsNone(alert.sort_key)
+        self.assertEqual(alert.timestamp, "N/A")
+        self.assertEqual((alert.signature, alert.src_ip, alert.protocol, alert.action), ("N/A", "N/A", "N/A", "alert"))
+
+    def test_invalid_json(self):
+        self.assertIsNone(decode_json("{broken", _clock(2025, 10, 18)))
+        self.assertIsNone(decode_json("[1, 2]", _clock(2025, 10, 18)))
+        self.assertIsNone(decode_line("   ", _clock(2025, 10, 18)))
+
+    def test_decode_lines_matches_decode_line(self):
+        clock = _clock(2025, 10, 18)
+        lines = [self.LINE.encode(), b"", b"{broken", ('  ' + self.LINE).encode(), self.LINE]
+        expected = [decode_line(line, clock) for line in lines]
+        expected = [alert.as_dict() for alert in expected if alert]
+        self.assertEqual([alert.as_dict() for alert in decode_lines(lines, clock)], expected)
+        self.assertEqual(len(expected), 3)
+
+
+class DecodeFastTests(SimpleTestCase):
+    LINE = ('10/17-12:34:56.123456 [drop] [**] [1:1000001:3] "SCAN nmap" [**] '
+            '[Classification: Attempted Recon] [Priority: 2] {TCP} 192.168.1.5:51000 -> 10.0.0.2:443')
+
+    def test_fields(self):
+        alert = decode_fast(self.LINE, _clock(2025, 10, 18))
+        self.assertEqual(alert.sort_key, timezone.make_aware(datetime(2025, 10, 17, 12, 34, 56, 123456)))
+        self.assertEqual(alert.action, "drop")
+        self.assertEqual((alert.gid, alert.sid, alert.rev), (1, 1000001, 3))
+        self.assertEqual(alert.signature, "SCAN nmap")
+        self.assertEqual(alert.classification, "Attempted Recon")
+        self.assertEqual(alert.priority, 2)
+        self.assertEqual((alert.protocol, alert.src_ip, alert.src_port, alert.dst_ip, alert.dst_port),
+                         ("TCP", "192.168.1.5", 51000, "10.0.0.2", 443))
+
+    def test_bytes_and_decode_line(self):
+        clock = _clock(2025, 10, 18)
+        self.assertEqual(decode_fast(self.LINE.encode(), clock).as_dict(), decode_fast(self.LINE, clock).as_dict())
+        self.assertEqual(decode_line("  " + self.LINE + "\n", clock).as_dict(), decode_fast(self.LINE, clock).as_dict())
+
+    def test_endpoints_without_port(self):
+        alert = decode_fast('10/17-12:00:00 [**] [1:2:1] "ping" [**] {ICMP} 10.0.0.1 -> 10.0.0.2',
+                            _clock(2025, 10, 18))
+        self.assertEqual((alert.src_ip, alert.src_port, alert.dst_port), ("10.0.0.1", "N/A", "N/A"))
+        self.assertEqual(alert.action, "alert")
+        self.assertEqual(alert.priority, "N/A")
+
+    def test_ipv6_endpoints(self):
+        alert = decode_fast('10/17-12:00:00 [**] [1:2:1] "v6" [**] {TCP} 2001:db8::1:443 -> [2001:db8::2]:80',
+                            _clock(2025, 10, 18))
+        self.assertEqual((alert.src_ip, alert.src_port), ("2001:db8::1", 443))
+        self.assertEqual((alert.dst_ip, alert.dst_port), ("2001:db8::2", 80))
+
+    def test_year_rollover(self):
+        clock = _clock(2026, 1, 1, hour=0)
+        late = decode_fast('12/31-23:59:59 [**] [1:2:1] "x" [**]', clock)
+        early = decode_fast('01/01-00:00:01 [**] [1:2:1] "x" [**]', clock)
+        self.assertEqual(late.sort_key.year, 2025)
+        self.assertEqual(early.sort_key.year, 2026)
+        self.assertLess(late.sort_key, early.sort_key)
+
+    def test_explicit_year_is_kept(self):
+        alert = decode_fast('27/01/05-08:00:00 [**] [1:2:1] "x" [**]', _clock(2026, 1, 1))
+        self.assertEqual(alert.sort_key.year, 2027)
+
+    def test_invalid_lines(self):
+        clock = _clock(2025, 10, 18)
+        self.assertIsNone(decode_fast("not an alert", clock))
+        # Tanggal mustahil: alert tetap disimpan tanpa timestamp
+        self.assertIsNone(decode_fast('02/30-12:00:00 [**] [1:2:1] "x" [**]', clock).sort_key)
+
+
+def _alert(**fields):
+    base = dict(sort_key=timezone.make_aware(datetime(2025, 10, 17, 12, 0)), signature="ET SCAN Nmap",
+                src_ip="192.168.1.5", src_port=51000, dst_ip="10.0.0.2", dst_port=443, protocol="TCP")
+    base.update(fields)
+    return Alert(**base)
+
+
+class FilterSetTests(SimpleTestCase):
+    def test_no_params_matches_everything(self):
+        filters = compile_filters({})
+        self.assertFalse(filters)
+        self.assertTrue(filters(_alert()))
+
+    def test_exact_ip(self):
+        filters = compile_filters({"src_ip": "192.168.1.5"})
+        self.assertTrue(filters(_alert()))
+        self.assertFalse(filters(_alert(src_ip="192.168.1.6")))
+        self.assertEqual(filters.needle.pattern, b"192\\.168\\.1\\.5")
+
+    def test_cidr_and_list(self):
+        filters = compile_filters({"src_ip": "192.168.0.0/16, 172.16.0.1", "dst_ip": "10.0.0.0/8"})
+        self.assertEqual(filters.errors, [])
+        self.assertTrue(filters(_alert()))
+        self.assertTrue(filters(_alert(src_ip="172.16.0.1")))
+        self.assertFalse(filters(_alert(src_ip="172.16.0.2")))
+        self.assertFalse(filters(_alert(dst_ip="11.0.0.1")))
+        self.assertFalse(filters(_alert(src_ip="N/A")))
+        self.assertEqual(compile_filters({"src_ip": "10.0.16.0/20"}).src_ip.prefixes()[:2], ["10.0.16.", "10.0.17."])
+
+    def test_ipv6_cidr(self):
+        filters = compile_filters({"dst_ip": "2001:db8::/32"})
+        self.assertTrue(filters(_alert(dst_ip="2001:db8::1")))
+        self.assertFalse(filters(_alert(dst_ip="2001:db9::1")))
+
+    def test_ports(self):
+        filters = compile_filters({"dst_port": "80, 440-450", "src_port": "1024-65535"})
+        self.assertTrue(filters(_alert()))
+        self.assertTrue(filters(_alert(dst_port="80")))
+        self.assertFalse(filters(_alert(dst_port=8080)))
+        self.assertFalse(filters(_alert(dst_port="N/A")))
+        self.assertFalse(filters(_alert(src_port=53)))
+
+    def test_time_range(self):
+        filters = compile_filters({"time_from": "2025-10-17T11:00", "time_to": "2025-10-17"})
+        self.assertTrue(filters(_alert()))
+        self.assertTrue(filters(_alert(sort_key=timezone.make_aware(datetime(2025, 10, 17, 23, 59, 59)))))
+        self.assertFalse(filters(_alert(sort_key=timezone.make_aware(datetime(2025, 10, 17, 10, 59)))))
+        self.assertFalse(filters(_alert(sort_key=timezone.make_aware(datetime(2025, 10, 18, 0, 0)))))
+        self.assertFalse(filters(_alert(sort_key=None)))
+
+    def test_invalid_values_are_reported(self):
+        filters = compile_filters({"src_ip": "999.1.1.1", "dst_port": "90-80", "time_from": "kemarin",
+                                   "signature": "/[/"})
+        self.assertEqual(len(filters.errors), 4)
+
+    def test_search_covers_signature_and_ips(self):
+        filters = compile_filters({"search": "nmap"})
+        self.assertTrue(filters(_alert()))
+        self.assertTrue(compile_filters({"search": "10.0.0"})(_alert()))
+        self.assertFalse(compile_filters({"search": "tcp"})(_alert()))
+
+    def test_signature_regex_and_action(self):
+        filters = compile_filters({"signature": "/scan\\s+nmap/", "action": "drop"})
+        self.assertFalse(filters(_alert()))
+        self.assertTrue(filters(_alert(action="drop")))
+        self.assertFalse(filters(_alert(action="drop", signature="ET POLICY")))
+
+
+class SpaceSavingTests(SimpleTestCase):
+    CAPACITY = 20
+
+    def _stream(self, seed, size=5000):
+        rng = random.Random(seed)
+        # Beberapa kunci dominan di atas ekor panjang kunci unik
+        return [f"hot{rng.randrange(5)}" if rng.random() < 0.5 else f"key{rng.randrange(500)}"
+                for _ in range(size)]
+
+    def assertBounds(self, summary, truth):
+        total = sum(truth.values())
+        self.assertEqual(summary.total, total)
+        self.assertLessEqual(len(summary.counts), summary.capacity)
+        for key, count in summary.counts.items():
+            error = summary.errors[key]
+            self.assertLessEqual(count - error, truth[key])
+            self.assertLessEqual(truth[key], count)
+            self.assertLessEqual(error, total / summary.capacity)
+        for key, true_count in truth.items():
+            if true_count > total / summary.capacity:
+                self.assertIn(key, summary.counts)
+
+    def test_error_bounds(self):
+        stream = self._stream(1)
+        summary = SpaceSaving(self.CAPACITY)
+        for key in stream:
+            summary.add(key)
+        self.assertBounds(summary, Counter(stream))
+        self.assertEqual({key for key, _count, _error in summary.top(5)}, {f"hot{i}" for i in range(5)})
+
+    def test_exact_below_capacity(self):
+        summary = SpaceSaving(self.CAPACITY)
+        for key in ["a", "b", "a", "c", "a"]:
+            summary.add(key)
+        self.assertEqual(summary.top(2), [("a", 3, 0), ("b", 1, 0)])
+
+    def test_merge_keeps_bounds(self):
+        first, second = self._stream(2), self._stream(3)
+        merged = SpaceSaving(self.CAPACITY)
+        other = SpaceSaving(self.CAPACITY)
+        for key in first:
+            merged.add(key)
+        for key in second:
+            other.add(key)
+        merged.merge(other)
+        self.assertBounds(merged, Counter(first) + Counter(second))
+
+    def test_round_trip(self):
+        summary = SpaceSaving(self.CAPACITY)
+        for key in self._stream(4):
+            summary.add(key)
+        loaded = SpaceSaving.from_dict(summary.to_dict(), self.CAPACITY)
+        self.assertEqual(loaded.top(self.CAPACITY), summary.top(self.CAPACITY))
+        self.assertEqual(loaded.total, summary.total)
+
+
+class CoalesceTests(SimpleTestCase):
+    START = timezone.make_aware(datetime(2025, 10, 17, 12, 0))
+
+    def _at(self, seconds_ago, **fields):
+        fields.setdefault("sid", 1000001)
+        return _alert(sort_key=self.START - timedelta(seconds=seconds_ago), **fields)
+
+    def _groups(self, alerts, window=60):
+        return [(group.sid, group.count, group.last_seen, group.first_seen) for group in coalesce(alerts, window)]
+
+    def test_identical_alerts_within_window(self):
+        alerts = [self._at(0), self._at(20), self._at(60)]
+        self.assertEqual(self._groups(alerts), [(1000001, 3, self.START, self.START - timedelta(seconds=60))])
+
+    def test_window_boundary_starts_new_group(self):
+        alerts = [self._at(0), self._at(30), self._at(61), self._at(90)]
+        self.assertEqual(self._groups(alerts), [
+            (1000001, 2, self.START, self.START - timedelta(seconds=30)),
+            (1000001, 2, self.START - timedelta(seconds=61), self.START - timedelta(seconds=90)),
+        ])
+
+    def test_different_keys_stay_apart(self):
+        alerts = [self._at(0), self._at(5, sid=2), self._at(10, dst_port=80), self._at(15)]
+        groups = self._groups(alerts)
+        self.assertEqual([(sid, count) for sid, count, _last, _first in groups], [(1000001, 2), (2, 1), (1000001, 1)])
+
+    def test_output_stays_newest_first(self):
+        alerts = [self._at(0), self._at(10, sid=2), self._at(50), self._at(100, sid=2), self._at(200)]
+        last_seen = [last for _sid, _count, last, _first in self._groups(alerts)]
+        self.assertEqual(last_seen, sorted(last_seen, reverse=True))
+        self.assertEqual(len(last_seen), 4)
+
+    def test_timestamp_less_alerts_keep_position(self):
+        alerts = [self._at(0), _alert(sort_key=None, sid=9), self._at(200, sid=2), _alert(sort_key=None, sid=8)]
+        self.assertEqual([group.sid for group in coalesce(alerts, 60)], [1000001, 9, 2, 8])
+
+
+def _fast_line(sid, second=0):
+    return (f'10/17-12:00:{second:02d}.000000 [**] [1:{sid}:1] "rule {sid}" [**] [Priority: 2] '
+            f'{{TCP}} 10.0.0.1:1234 -> 10.0.0.2:80\n')
+
+
+class IngestPathTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "alert_fast.txt")
+
+    def _write(self, text, mode="a", path=None):
+        with open(path or self.path, mode, encoding="utf-8") as handle:
+            handle.write(text)
+
+    def _sids(self):
+        return sorted(StoredAlert.objects.values_list("sid", flat=True))
+
+    def test_incremental_and_partial_line(self):
+        self._write(_fast_line(1) + _fast_line(2))
+        self.assertEqual(store.ingest_path(self.path), 2)
+        self.assertEqual(store.ingest_path(self.path), 0)
+        partial = _fast_line(4)
+        self._write(_fast_line(3) + partial[:20])
+        self.assertEqual(store.ingest_path(self.path), 1)
+        self._write(partial[20:])
+        self.assertEqual(store.ingest_path(self.path), 1)
+        self.assertEqual(self._sids(), [1, 2, 3, 4])
+        self.assertEqual(IngestCursor.objects.get(path=self.path).offset, os.path.getsize(self.path))
+
+    def test_truncated_file_starts_over(self):
+        self._write(_fast_line(1) + _fast_line(2) + _fast_line(3))
+        store.ingest_path(self.path)
+        self._write(_fast_line(4), mode="w")
+        self.assertEqual(store.ingest_path(self.path), 1)
+        self.assertEqual(self._sids(), [1, 2, 3, 4])
+
+    def test_rotation_hands_offset_to_rolled_file(self):
+        self._write(_fast_line(1) + _fast_line(2))
+        store.ingest_path(self.path)
+        # Ditulis setelah putaran terakhir, lalu file dirotasi dengan rename
+        self._write(_fast_line(3))
+        rolled = self.path + ".1700000000"
+        os.rename(self.path, rolled)
+        self._write(_fast_line(4) + _fast_line(5))
+        # Urutan ingest_files: rollover dulu, lalu file aktif
+        self.assertEqual(store.ingest_path(rolled), 1)
+        self.assertEqual(store.ingest_path(self.path), 2)
+        self.assertEqual(store.ingest_path(rolled) + store.ingest_path(self.path), 0)
+        self.assertEqual(self._sids(), [1, 2, 3, 4, 5])
+
+    def test_rotation_seen_from_active_file_first(self):
+        self._write(_fast_line(1))
+        store.ingest_path(self.path)
+        self._write(_fast_line(2))
+        rolled = self.path + ".1700000000"
+        os.rename(self.path, rolled)
+        self._write(_fast_line(3))
+        self.assertEqual(store.ingest_path(self.path), 1)
+        self.assertEqual(store.ingest_path(rolled), 1)
+        self.assertEqual(self._sids(), [1, 2, 3])
+
+    def test_sealed_rolled_cursor_is_removed(self):
+        self._write(_fast_line(1))
+        store.ingest_path(self.path)
+        rolled = self.path + ".1700000000"
+        os.rename(self.path, rolled)
+        self._write(_fast_line(2))
+        store.ingest_path(self.path)
+        self.assertTrue(IngestCursor.objects.filter(path=rolled).exists())
+        os.remove(rolled)
+        os.rename(self.path, self.path + ".1700000100")
+        self._write(_fast_line(3))
+        store.ingest_path(self.path)
+        self.assertFalse(IngestCursor.objects.filter(path=rolled).exists())
+        self.assertEqual(self._sids(), [1, 2, 3])
+
+    def test_over_long_line_is_skipped(self):
+        self._write(_fast_line(1) + "x" * 1000 + "\n" + _fast_line(2))
+        with mock.patch.object(store, "READ_CHUNK_SIZE", 256), self.assertLogs("snort.store", "WARNING"):
+            self.assertEqual(store.ingest_path(self.path), 2)
+        self.assertEqual(self._sids(), [1, 2])
+
+
+def _json_line(sid, second=0):
+    return (f'{{"timestamp": "25/10/17-12:00:{second:02d}.000000", "gid": 1, "sid": {sid}, "rev": 1, '
+            f'"msg": "rule {sid}", "proto": "TCP", "src_addr": "10.0.0.{sid}", "src_port": 1234, '
+            f'"dst_addr": "10.0.0.2", "dst_port": 80, "action": "allow"}}\n')
+
+
+class RotateLogsTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive_dir = os.path.join(tmp.name, "archive")
+        self.json_path = os.path.join(tmp.name, "alert_json.txt")
+        self.fast_path = os.path.join(tmp.name, "alert_fast.txt")
+        # Pasangan alert_json + alert_fast dengan alert yang sama
+        with open(self.json_path, "w", encoding="utf-8") as handle:
+            handle.writelines(_json_line(sid, sid) for sid in range(1, 6))
+        with open(self.fast_path, "w", encoding="utf-8") as handle:
+            handle.writelines(_fast_line(sid, sid) for sid in range(1, 6))
+        patcher = mock.patch.object(logfiles, "candidate_paths", return_value=[self.json_path, self.fast_path])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        archive._segment_cache.clear()
+
+    def _rotate(self, reopen_command, *args):
+        with override_settings(SNORT_ARCHIVE_DIR=self.archive_dir, SNORT_ROTATE_REOPEN_COMMAND=reopen_command,
+                               SNORT_ARCHIVE_RETENTION_DAYS=0):
+            call_command("rotate_logs", *args, stdout=io.StringIO(), stderr=io.StringIO())
+            return archive.list_segments()
+
+    def test_force_seals_one_format_once(self):
+        segments = self._rotate("true", "--force")
+        self.assertEqual([segment.origin for segment in segments], [self.json_path])
+        self.assertEqual(segments[0].lines, 5)
+        with override_settings(SNORT_ARCHIVE_DIR=self.archive_dir):
+            self.assertEqual(len(list(archive.iter_archived_alerts())), 5)
+        # alert_fast tidak diputar maupun diarsipkan
+        self.assertEqual(archive.rolled_files(self.fast_path), [])
+        self.assertGreater(os.path.getsize(self.fast_path), 0)
+        self.assertEqual(os.path.getsize(self.json_path), 0)
+        # Putaran kedua: tidak ada yang diarsipkan ulang
+        self.assertEqual(len(self._rotate("true", "--force")), 1)
+
+    def test_without_reopen_command_only_snort_rollovers_are_sealed(self):
+        self.assertEqual(self._rotate("", "--force"), [])
+        self.assertEqual(archive.rolled_files(self.json_path), [])
+        # Rollover dari `limit` Snort: file aktif sudah berisi data baru
+        rolled = self.json_path + ".1700000000"
+        os.rename(self.json_path, rolled)
+        with open(self.json_path, "w", encoding="utf-8") as handle:
+            handle.write(_json_line(9, 9))
+        old = time.time() - 3600
+        os.utime(rolled, (old, old))
+        segments = self._rotate("")
+        self.assertEqual([segment.source for segment in segments], [rolled])
+        self.assertFalse(os.path.exists(rolled))
+        self.assertEqual(os.path.getsize(self.json_path), len(_json_line(9, 9)))
+
+
+class ArchiveSegmentTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = os.path.join(tmp.name, "archive")
+        self.path = os.path.join(tmp.name, "alert_json.txt.1700000000")
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.writelines(_json_line(sid, sid) for sid in range(1, 21))
+        archive._segment_cache.clear()
+
+    def test_ready_to_seal(self):
+        active = archive.origin_path(self.path)
+        with open(active, "w", encoding="utf-8"):
+            pass
+        self.assertFalse(archive.ready_to_seal(self.path, delay=0))
+        self.assertTrue(archive.ready_to_seal(self.path, delay=0, reopened=True))
+        with open(active, "w", encoding="utf-8") as handle:
+            handle.write(_json_line(30))
+        self.assertTrue(archive.ready_to_seal(self.path, delay=0))
+        self.assertFalse(archive.ready_to_seal(self.path, delay=3600))
+
+    def test_seal_writes_index(self):
+        segment_path = archive.seal_file(self.path, self.directory)
+        self.assertFalse(os.path.exists(self.path))
+        [segment] = archive.list_segments(self.directory)
+        self.assertEqual(segment.segment_path, segment_path)
+        self.assertEqual((segment.lines, segment.data["alerts"]), (20, 20))
+        self.assertEqual(segment.first_ts, timezone.make_aware(datetime(2025, 10, 17, 12, 0, 1)).timestamp())
+        self.assertEqual(segment.last_ts, timezone.make_aware(datetime(2025, 10, 17, 12, 0, 20)).timestamp())
+        self.assertTrue(segment.may_contain(src_ip="10.0.0.7", sid=7))
+        self.assertFalse(segment.may_contain(src_ip="192.0.2.1"))
+        self.assertFalse(segment.may_contain(time_from=segment.last_ts + 1))
+        alerts = list(archive.iter_archived_alerts(src_ip="10.0.0.7", directory=self.directory))
+        self.assertEqual(len(alerts), 20)
+        self.assertEqual(alerts[0].sid, 20)
+
+
+class AggregatorTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "alert_json.txt")
+        self.now = timezone.make_aware(datetime(2025, 10, 17, 13))
+        self.aggregator = aggregator.AlertAggregator()
+        archive._segment_cache.clear()
+        patcher = override_settings(SNORT_ARCHIVE_DIR=os.path.join(tmp.name, "archive"))
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+    def _write(self, text, mode="a", path=None):
+        with open(path or self.path, mode, encoding="utf-8") as handle:
+            handle.write(text)
+
+    def _counts(self):
+        snapshot = self.aggregator.snapshot(self.path, now=self.now)
+        return snapshot.total_lines, sum(snapshot.buckets.values())
+
+    def test_refresh_reads_only_appended_lines(self):
+        self._write(_json_line(1) + _json_line(2))
+        self.assertEqual(self._counts(), (2, 2))
+        state = self.aggregator._states[self.path]
+        self.assertEqual(state.offset, os.path.getsize(self.path))
+        partial = _json_line(3)
+        self._write(partial[:30])
+        with mock.patch.object(aggregator, "decode_lines", wraps=aggregator.decode_lines) as decode:
+            self.assertEqual(self._counts(), (2, 2))
+            decode.assert_not_called()
+            self._write(partial[30:])
+            self.assertEqual(self._counts(), (3, 3))
+            self.assertEqual(len(decode.call_args.args[0]), 1)
+
+    def test_truncate_restarts_from_zero(self):
+        self._write(_json_line(1) + _json_line(2) + _json_line(3))
+        self.assertEqual(self._counts(), (3, 3))
+        self._write(_json_line(4), mode="w")
+        self.assertEqual(self._counts(), (1, 1))
+
+    def test_rotation_keeps_counts_of_rolled_file(self):
+        self._write(_json_line(1) + _json_line(2))
+        self.assertEqual(self._counts(), (2, 2))
+        rolled = self.path + ".1700000000"
+        os.rename(self.path, rolled)
+        # Sisa yang masih ditulis ke inode lama ikut terhitung
+        self._write(_json_line(3), path=rolled)
+        self._write(_json_line(4))
+        self.assertEqual(self._counts(), (4, 4))
+        self.assertEqual(self.aggregator._states[rolled].offset, os.path.getsize(rolled))
+
+    def test_old_buckets_are_pruned(self):
+        self._write(_json_line(1))
+        self.assertEqual(self._counts(), (1, 1))
+        self.now += timedelta(days=aggregator.RETENTION_DAYS + 1)
+        self.assertEqual(self._counts(), (1, 0))
+
+
+class AutoBlockTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.blocklist = os.path.join(tmp.name, "blocklist.txt")
+        whitelist = os.path.join(tmp.name, "whitelist.txt")
+        with open(whitelist, "w", encoding="utf-8") as handle:
+            handle.write("172.16.0.0/12\n")
+        patcher = override_settings(SNORT_IP_BLOCKLIST_PATH=self.blocklist, SNORT_IP_WHITELIST_PATH=whitelist,
+                                    SNORT_NFT_APPLY=False)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        self.now = timezone.make_aware(datetime(2025, 10, 17, 12, 1))
+        self.blocker = autoblock.AutoBlocker(window=60, threshold=5, sid_threshold=3, ttl=600)
+
+    def _burst(self, src_ip, count, sid=None, second=0):
+        return [_alert(src_ip=src_ip, sid=sid, sort_key=self.now - timedelta(seconds=second + i)) for i in range(count)]
+
+    def _blocked(self):
+        return sorted(entry.ip for entry in ipset.IPList(self.blocklist).refresh().entries)
+
+    def test_threshold_block_then_release_after_ttl(self):
+        self.blocker.observe(self._burst("192.0.2.1", 4) + self._burst("192.0.2.2", 5), now=self.now)
+        # Alert di luar jendela tidak dihitung
+        self.blocker.observe(self._burst("192.0.2.3", 5, second=120), now=self.now)
+        self.assertEqual(self.blocker.flush(now=self.now), (1, 0))
+        self.assertEqual(self._blocked(), ["192.0.2.2"])
+        block = AutoBlock.objects.get()
+        self.assertEqual((block.ip, block.hits, block.expires_at), ("192.0.2.2", 5, self.now + timedelta(seconds=600)))
+
+        self.blocker.observe(self._burst("192.0.2.2", 5), now=self.now)
+        self.assertEqual(self.blocker.flush(now=self.now + timedelta(seconds=599)), (0, 0))
+        self.assertEqual(self.blocker.flush(now=self.now + timedelta(seconds=600)), (0, 1))
+        self.assertEqual(self._blocked(), [])
+        self.assertFalse(AutoBlock.objects.get().active)
+
+    def test_sid_threshold_and_whitelist(self):
+        self.blocker.observe(self._burst("192.0.2.9", 3, sid=2001) + self._burst("172.16.0.5", 5), now=self.now)
+        self.assertEqual(self.blocker.flush(now=self.now), (1, 0))
+        self.assertEqual(self._blocked(), ["192.0.2.9"])
+        self.assertEqual(AutoBlock.objects.get().sid, 2001)
+
+
+class IPSyncTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "blocklist.txt")
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.write("# daftar blokir\n10.0.0.1  # lama\n192.168.0.0/16\n")
+        patcher = override_settings(SNORT_IP_BLOCKLIST_PATH=self.path, SNORT_NFT_APPLY=False)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+    def _read(self, suffix=""):
+        with open(self.path + suffix, encoding="utf-8") as handle:
+            return handle.read()
+
+    def test_bulk_update_adds_removes_and_keeps_comments(self):
+        result = ipsync.bulk_update("blocklist", add=["10.0.0.1", "10.0.0.2", "2001:db8::/64", "x"],
+                                    remove=["192.168.0.0/16"], note="massal")
+        self.assertEqual([str(network) for network in result.added], ["10.0.0.2/32", "2001:db8::/64"])
+        self.assertEqual([str(network) for network in result.removed], ["192.168.0.0/16"])
+        self.assertEqual((result.invalid, result.total), (["x"], 3))
+        self.assertEqual(self._read().splitlines(),
+                         ["# daftar blokir", "10.0.0.1  # lama", "10.0.0.2  # massal", "2001:db8::/64  # massal"])
+        self.assertEqual([name for name in os.listdir(os.path.dirname(self.path))
+                          if name.startswith(".blocklist")], [])
+
+    def test_delta_refills_only_sets_with_removals(self):
+        ipsync.bulk_update("blocklist", add=["2001:db8::1"], remove=["10.0.0.1"])
+        delta = self._read(".delta.nft")
+        self.assertIn("flush set inet snort blocklist_v4\n", delta)
+        self.assertIn("add element inet snort blocklist_v4 { 192.168.0.0/16 }\n", delta)
+        self.assertNotIn("flush set inet snort blocklist_v6", delta)
+        self.assertIn("add element inet snort blocklist_v6 { 2001:db8::1 }\n", delta)
+        full = self._read(".nft")
+        self.assertIn("flush set inet snort blocklist_v6\n", full)
+        self.assertEqual(full.count("flush chain inet snort blocklist\n"), 1)
+
+    def test_replace_and_no_op(self):
+        result = ipsync.bulk_update("blocklist", add=["10.0.0.1"], replace=True)
+        self.assertEqual((result.added, [str(n) for n in result.removed], result.total), ([], ["192.168.0.0/16"], 1))
+        self.assertEqual(self._read(), "# daftar blokir\n10.0.0.1  # lama\n")
+        os.unlink(self.path + ".delta.nft")
+        result = ipsync.bulk_update("blocklist", add=["10.0.0.1"])
+        self.assertIsNone(result.delta_path)
+        self.assertFalse(os.path.exists(self.path + ".delta.nft"))
+
+    def test_render_nft_chunks_elements(self):
+        networks = [ipset.parse_network(f"10.0.{i // 256}.{i % 256}") for i in range(ipsync.NFT_CHUNK + 1)]
+        lines = ipsync.render_nft(networks, full=True)
+        elements = [line for line in lines if line.startswith("add element")]
+        self.assertEqual(len(elements), 2)
+        self.assertEqual(elements[1], "add element inet snort blocklist_v4 { 10.0.3.232 }\n")
+
+
+class IPListTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "whitelist.txt")
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.write("10.0.0.0/24 # kantor\n2001:db8::/32\nbukan-ip\n")
+        self.ip_list = ipset.IPList(self.path).refresh()
+
+    def test_covering_matches_ipv4_mapped_address(self):
+        self.assertEqual(self.ip_list.invalid, 1)
+        for address in ("10.0.0.1", "::ffff:10.0.0.1"):
+            self.assertIn(address, self.ip_list)
+            self.assertEqual([entry.ip for entry in self.ip_list.covering(address)], ["10.0.0.0/24"])
+        self.assertEqual([entry.ip for entry in self.ip_list.covering("2001:db8::1")], ["2001:db8::/32"])
+        self.assertEqual(self.ip_list.covering("10.0.1.1"), [])
+
+
+class ScanPoolTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.paths = []
+        for index in range(2):
+            path = os.path.join(tmp.name, f"alert_json{index}.txt")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.writelines(_json_line(sid, second) for second in range(40) for sid in (1, 2))
+            self.paths.append(path)
+        self.criteria = compile_filters({"src_ip": "10.0.0.1"})
+
+    @override_settings(SNORT_SCAN_WORKERS=2)
+    def test_pool_is_shared_and_matches_serial_scan(self):
+        parallel = scan.scan(self.paths, self.criteria, limit=10, chunk_bytes=1024)
+        pool = scan._pool
+        again = scan.scan(self.paths, self.criteria, limit=10, chunk_bytes=1024)
+        serial = scan.scan(self.paths, self.criteria, limit=10, workers=1, chunk_bytes=1024)
+        self.assertEqual(parallel.workers, 2)
+        self.assertIs(scan._pool, pool)
+        self.assertEqual(parallel.matched, 80)
+        self.assertEqual([a.sort_key for a in again.alerts], [a.sort_key for a in serial.alerts])
+        self.assertEqual(serial.matched, 80)
+
+
+@override_settings(SNORT_ALERT_STORE=True)
+class SensorIngestTests(TestCase):
+    def setUp(self):
+        self.sensor = Sensor(name="gw-1")
+        self.token = sensors.issue_token(self.sensor)
+        self.sensor.save()
+
+    def _post(self, lines, batch, agent_id="agent-a", token=None):
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        body = compressor.compress("".join(lines).encode()) + compressor.flush()
+        return self.client.post(
+            reverse("snort:ingest_api"), body, content_type="application/x-ndjson", HTTP_CONTENT_ENCODING="gzip",
+            HTTP_AUTHORIZATION=f"Bearer {token or self.token}", HTTP_X_AGENT_ID=agent_id,
+            HTTP_X_BATCH_SEQ=str(batch), HTTP_X_SOURCE_FILE="alert_json.txt",
+        )
+
+    def test_resent_batch_is_not_stored_twice(self):
+        lines = [_json_line(1, 1), _json_line(2, 2)]
+        self.assertEqual(self._post(lines, 1).json(), {"sensor": "gw-1", "accepted": 2, "duplicate": False})
+        self.assertEqual(self._post(lines, 1).json()["duplicate"], True)
+        self.assertEqual(StoredAlert.objects.filter(sensor="gw-1").count(), 2)
+        self.assertEqual(self._post([_json_line(3, 3)], 2).json()["accepted"], 1)
+        # Instance agent baru memulai nomor batch dari awal
+        self.assertEqual(self._post([_json_line(4, 4)], 1, agent_id="agent-b").json()["duplicate"], False)
+        self.sensor.refresh_from_db()
+        self.assertEqual(self.sensor.alerts_received, 4)
+        self.assertEqual((self.sensor.agent_id, self.sensor.last_batch), ("agent-b", 1))
+
+    def test_rejects_bad_token_and_truncated_gzip(self):
+        self.assertEqual(self._post([_json_line(1)], 1, token="salah").status_code, 401)
+        response = self.client.post(reverse("snort:ingest_api"), b"\x1f\x8b\x08\x00", content_type="application/x-ndjson",
+                                    HTTP_CONTENT_ENCODING="gzip", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StoredAlert.objects.exists())
+
+
+class RollupTests(TestCase):
+    BUCKET = timezone.make_aware(datetime(2025, 10, 17, 12, 0))
+
+    def _count(self, value, resolution="hour", dimension="src_ip"):
+        return AlertRollup.objects.get(
+            resolution=resolution, bucket_start=self.BUCKET, dimension=dimension, value=value,
+        ).count
+
+    def test_apply_counts_adds_to_existing_rows(self):
+        key = ("hour", self.BUCKET, "src_ip", "10.0.0.1")
+        rollup.apply_counts(Counter({key: 3}))
+        rollup.apply_counts(Counter({key: 4, ("hour", self.BUCKET, "src_ip", "10.0.0.2"): 1}))
+        self.assertEqual(self._count("10.0.0.1"), 7)
+        self.assertEqual(self._count("10.0.0.2"), 1)
+        self.assertEqual(AlertRollup.objects.count(), 2)
+
+    def test_increment_fallback(self):
+        key = ("hour", self.BUCKET, "src_ip", "10.0.0.1")
+        rollup._increment(key, 2)
+        rollup._increment(key, 5)
+        self.assertEqual(self._count("10.0.0.1"), 7)
+
+    def test_fold_tail_keeps_totals(self):
+        counts = Counter({("hour", self.BUCKET, "src_ip", f"10.0.1.{i}"): i + 1 for i in range(rollup.TOP_VALUES + 5)})
+        rollup.apply_counts(counts)
+        total = sum(counts.values())
+        self.assertEqual(rollup.fold_tail(now=self.BUCKET + rollup.FOLD_AFTER), 0)
+        folded = rollup.fold_tail(now=self.BUCKET + rollup.FOLD_AFTER + timedelta(hours=2))
+        self.assertEqual(folded, 5)
+        rows = AlertRollup.objects.filter(resolution="hour", dimension="src_ip", bucket_start=self.BUCKET)
+        self.assertEqual(rows.count(), rollup.TOP_VALUES + 1)
+        self.assertEqual(sum(rows.values_list("count", flat=True)), total)
+        self.assertEqual(self._count(rollup.OTHER), sum(range(1, 6)))
+        # Lipatan kedua tidak mengubah apa pun
+        self.assertEqual(rollup.fold_tail(now=self.BUCKET + timedelta(days=3)), 0)
+
+
+def _load_agent():
+    spec = importlib.util.spec_from_file_location("snort_agent", os.path.join(settings.BASE_DIR, "agent", "snort_agent.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class AgentTailTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.agent = _load_agent()
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "alert_json.txt")
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.write("a\nb\n")
+        self.tailed = self.agent.TailedFile(self.path)
+
+    def _read(self):
+        chunk, end = self.tailed.read(1024, 100)
+        self.tailed.offset = end
+        return chunk
+
+    def _append(self, text, path=None):
+        with open(path or self.path, "a", encoding="utf-8") as handle:
+            handle.write(text)
+
+    def test_rolled_file_is_drained_before_switching(self):
+        self.assertEqual(self._read(), b"a\nb\n")
+        self._append("c\n")
+        rolled = self.path + ".1700000000"
+        os.rename(self.path, rolled)
+        self._append("")
+        # Penulis masih di inode lama: file baru kosong
+        self._append("d\n", rolled)
+        self.assertEqual(self._read(), b"c\nd\n")
+        self.assertEqual(self._read(), b"")
+        self._append("e", rolled)
+        self._append("f\n")
+        # Baris terakhir tanpa newline di file lama ikut terkirim, lalu pindah
+        self.assertEqual(self._read(), b"e\n")
+        self.assertEqual(self._read(), b"f\n")
+        self.assertEqual(self.tailed.inode, os.stat(self.path).st_ino)
+
+    def test_sealed_rolled_file_switches_to_new_file(self):
+        self._read()
+        os.rename(self.path, self.path + ".1700000000")
+        os.remove(self.path + ".1700000000")
+        self._append("x\n")
+        self.assertEqual(self._read(), b"x\n")
+
+    def test_truncate_starts_over(self):
+        self._read()
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.write("z\n")
+        self.assertEqual(self._read(), b"z\n")
+
+
+class LiveEventTests(SimpleTestCase):
+    def test_delta_carries_full_count(self):
+        now = timezone.localtime()
+        alerts = [Alert(sort_key=now - timedelta(seconds=i), sid=i) for i in range(live.MAX_ALERTS_PER_EVENT + 250)]
+        events = dict(live.build_events(alerts))
+        self.assertEqual(len(events["alerts"]), live.MAX_ALERTS_PER_EVENT)
+        self.assertEqual(events["delta"]["total"], len(alerts))
+        # Baris terbaru dulu
+        self.assertEqual(events["alerts"][0]["sid"], alerts[-1].sid)
@@ -0,0 +1,263 @@
+import os
+
+from . import ipsync
+
+# Topologi inline multi-queue: trafik FORWARD dibagi ke beberapa NFQUEUE
+# (queue-balance, hash simetris per flow sehingga kedua arah satu koneksi
+# masuk ke queue yang sama) dan tiap queue dilayani satu packet thread
+# Snort (mode "threads") atau satu proses/unit systemd (mode "units").
+# Keluaran tiap queue ditulis ke subdirektori bernomor di direktori log
+# (<log_dir>/<queue>/alert_json.txt, perf_monitor_*.csv) yang dibaca ulang
+# oleh dashboard untuk hitungan per queue.
+
+MODES = ("threads", "units")
+FIREWALLS = ("nftables", "iptables")
+# Satu format alert per instance; dashboard membaca alert_json lebih dulu
+ALERT_FORMATS = ("json", "fast")
+MAX_QUEUES = 64
+DEFAULT_QUEUE_MAXLEN = 8192
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def default_queue_count(cores=None, reserve=1):
+    """Satu queue per core; `reserve` core disisakan untuk softirq/kernel bila core > 2."""
+    cores = cores or available_cores()
+    if cores > 2:
+        cores -= reserve
+    return max(1, min(cores, MAX_QUEUES))
+
+
+def queue_of(path):
+    """Nomor queue dari path <log_dir>/<queue>/<file>, atau None untuk file di luar subdirektori queue."""
+    name = os.path.basename(os.path.dirname(path))
+    return int(name) if name.isdigit() else None
+
+
+def queue_dirs(log_dir):
+    """[(queue, direktori)] subdirektori bernomor di log_dir, urut nomor queue."""
+    try:
+        entries = os.listdir(log_dir)
+    except OSError:
+        return []
+    dirs = [(int(name), os.path.join(log_dir, name)) for name in entries if name.isdigit()]
+    return sorted(item for item in dirs if os.path.isdir(item[1]))
+
+
+def queue_files(path):
+    """[(queue, path)] salinan per queue dari sebuah file log (<dir>/<queue>/<nama file>) yang ada."""
+    directory, name = os.path.split(path)
+    files = []
+    for queue, queue_dir in queue_dirs(directory):
+        candidate = os.path.join(queue_dir, name)
+        if os.path.isfile(candidate):
+            files.append((queue, candidate))
+    return files
+
+
+class Topology:
+    def __init__(self, queues, first_queue=0, mode="threads", firewall="nftables", wan_if="ens33",
+                 lan_if="ens37", log_dir="/var/log/snort", snort_binary="/usr/local/bin/snort",
+                 config="/usr/local/etc/snort/snort.lua", rules=None, queue_maxlen=DEFAULT_QUEUE_MAXLEN,
+                 cores=None, lua_path="/usr/local/etc/snort/nfq_topology.lua", alert_format="json"):
+        if mode not in MODES:
+            raise ValueError(f"Mode tidak dikenal: {mode}")
+        if firewall not in FIREWALLS:
+            raise ValueError(f"Firewall tidak dikenal: {firewall}")
+        if alert_format not in ALERT_FORMATS:
+            raise ValueError(f"Format alert tidak dikenal: {alert_format}")
+        if not 1 <= queues <= MAX_QUEUES:
+            raise ValueError(f"Jumlah queue harus 1-{MAX_QUEUES}.")
+        if first_queue < 0 or first_queue + queues - 1 > 65535:
+            raise ValueError("Nomor queue harus 0-65535.")
+        self.queues = queues
+        self.first_queue = first_queue
+        self.mode = mode
+        self.firewall = firewall
+        self.wan_if = wan_if
+        self.lan_if = lan_if
+        self.log_dir = log_dir.rstrip("/") or "/"
+        self.snort_binary = snort_binary
+        self.config = config
+        self.rules = rules
+        self.queue_maxlen = queue_maxlen
+        self.cores = cores or available_cores()
+        self.lua_path = lua_path
+        self.alert_format = alert_format
+
+    @property
+    def queue_numbers(self):
+        return list(range(self.first_queue, self.first_queue + self.queues))
+
+    @property
+    def queue_range(self):
+        last = self.first_queue + self.queues - 1
+        return str(self.first_queue) if last == self.first_queue else f"{self.first_queue}-{last}"
+
+    def core_for(self, index):
+        """Core untuk queue ke-index; core 0 dilewati bila ada core cadangan."""
+        offset = 1 if self.cores > self.queues else 0
+        return (index + offset) % self.cores
+
+    # -- Snort ---------------------------------------------------------------
+
+    def _snort_args(self, inputs, log_dir, extra=()):
+        """Argumen Snort dikelompokkan per opsi (satu kelompok per baris ExecStart)."""
+        groups = [
+            (self.snort_binary, "-c", self.config),
+            ("-Q", "--daq", "nfq"),
+            ("--daq-var", f"queue_maxlen={self.queue_maxlen}"),
+            ("-i", inputs),
+            *extra,
+        ]
+        if self.rules:
+            groups.append(("-R", self.rules))
+        groups.append(("-l", log_dir))
+        groups.append(("--lua", f"\"dofile('{self.lua_path}')\""))
+        return groups
+
+    @staticmethod
+    def _exec_start(groups):
+        return "ExecStart=" + " \\\n    ".join(" ".join(group) for group in groups)
+
+    def lua(self):
+        """Potongan konfigurasi Snort: afinitas thread (mode threads) dan output per instance."""
+        lines = [
+            "-- Generated by manage.py generate_nfq_topology",
+            f"-- Output per queue dibaca dashboard (alert_{self.alert_format} + perf_monitor CSV).",
+        ]
+        # Hanya satu logger: alert_json dan alert_fast berisi alert yang sama
+        if self.alert_format == "json":
+            lines += [
+                "alert_json = { file = true, limit = 0,",
+                "    fields = 'timestamp pkt_num proto pkt_gen pkt_len dir src_addr src_port dst_addr dst_port "
+                "gid sid rev action msg class priority' }",
+            ]
+        else:
+            lines.append("alert_fast = { file = true, limit = 0 }")
+        lines += [
+            "perf_monitor = { base = true, cpu = true, format = 'csv', seconds = 60 }",
+            "latency = { packet = { max_time = 500 } }",
+        ]
+        if self.mode == "threads":
+            lines.append("process = {")
+            lines.append("    threads = {")
+            for index in range(self.queues):
+                lines.append(f"        {{ thread = {index}, cpuset = '{self.core_for(index)}' }},")
+            lines.append("    },")
+            lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def units(self):
+        """{nama file: isi} unit systemd untuk mode yang dipilih."""
+        if self.mode == "threads":
+            inputs = '"' + " ".join(str(queue) for queue in self.queue_numbers) + '"'
+            # --id-offset: nomor instance (= subdirektori log) sama dengan nomor queue
+            args = self._snort_args(inputs, self.log_dir, extra=[
+                ("--max-packet-threads", str(self.queues)),
+                ("--id-offset", str(self.first_queue), "--id-subdir"),
+            ])
+            pre = "\n".join(f"ExecStartPre=/bin/mkdir -p {self.log_dir}/{queue}" for queue in self.queue_numbers)
+            return {"snort.service": (
+                "[Unit]\n"
+                f"Description=Snort 3 IPS Daemon ({self.queues} NFQUEUE {self.queue_range})\n"
+                "After=network.target\n\n"
+                "[Service]\n"
+                "Type=simple\n"
+                f"# {self.queues} packet thread; tiap thread membaca satu queue dan menulis ke {self.log_dir}/<queue>/\n"
+                f"{pre}\n"
+                f"{self._exec_start(args)}\n"
+                "Restart=always\n"
+                "RestartSec=2\n\n"
+                "[Install]\n"
+                "WantedBy=multi-user.target\n"
+            )}
+
+        args = self._snort_args("%i", f"{self.log_dir}/%i")
+        files = {
+            "snort@.service": (
+                "[Unit]\n"
+                "Description=Snort 3 IPS NFQUEUE %i\n"
+                "After=network.target\n"
+                "PartOf=snort-nfq.target\n\n"
+                "[Service]\n"
+                "Type=simple\n"
+                f"ExecStartPre=/bin/mkdir -p {self.log_dir}/%i\n"
+                f"{self._exec_start(args)}\n"
+                "Restart=always\n"
+                "RestartSec=2\n\n"
+                "[Install]\n"
+                "WantedBy=snort-nfq.target\n"
+            ),
+            "snort-nfq.target": (
+                "[Unit]\n"
+                f"Description=Snort 3 IPS ({self.queues} NFQUEUE {self.queue_range})\n"
+                "Wants=" + " ".join(f"snort@{queue}.service" for queue in self.queue_numbers) + "\n\n"
+                "[Install]\n"
+                "WantedBy=multi-user.target\n"
+            ),
+        }
+        for index, queue in enumerate(self.queue_numbers):
+            files[f"snort@{queue}.service.d/affinity.conf"] = (
+                f"[Service]\nCPUAffinity={self.core_for(index)}\n"
+            )
+        return files
+
+    # -- Firewall ------------------------------------------------------------
+
+    def firewall_rules(self):
+        """(nama file, isi) aturan NFQUEUE untuk FORWARD LAN <-> WAN."""
+        # Blocklist (update_iplist/autoblock) dibuang di chain prerouting sebelum
+        # aturan queue, jadi trafik IP yang sudah diblokir tidak lagi membebani Snort.
+        blocklist = (
+            "# Set blocklist + chain drop (prerouting, sebelum NFQUEUE). Elemen set diisi\n"
+            "# dari <blocklist>.nft / <blocklist>.delta.nft yang ditulis update_iplist/autoblock.\n"
+            + "".join(ipsync.render_nft_table())
+        )
+        if self.firewall == "nftables":
+            # Tanpa flag fanout: fanout memilih queue per CPU, bukan per flow,
+            # sehingga dua arah satu koneksi bisa terpecah ke thread Snort berbeda.
+            target = f"queue num {self.queue_range} bypass"
+            return "nfqueue.nft", (
+                "#!/usr/sbin/nft -f\n"
+                "# Generated by manage.py generate_nfq_topology\n"
+                f"{blocklist}"
+                "table inet snort_nfq\n"
+                "delete table inet snort_nfq\n"
+                "table inet snort_nfq {\n"
+                "    chain forward {\n"
+                "        type filter hook forward priority -10; policy accept;\n"
+                f'        iifname "{self.lan_if}" oifname "{self.wan_if}" {target}\n'
+                f'        iifname "{self.wan_if}" oifname "{self.lan_if}" {target}\n'
+                "    }\n"
+                "}\n"
+            )
+        if self.queues == 1:
+            target = f"--queue-num {self.first_queue}"
+        else:
+            target = f"--queue-balance {self.first_queue}:{self.first_queue + self.queues - 1}"
+        return "nfqueue-iptables.sh", (
+            "#!/bin/sh\n"
+            "# Generated by manage.py generate_nfq_topology\n"
+            "# Menggantikan dua aturan NFQUEUE --queue-num di service/router/router.sh.\n"
+            "# Tanpa --queue-cpu-fanout: queue dipilih dari hash flow (simetris), bukan CPU.\n"
+            "set -e\n"
+            "nft -f - <<'NFT'\n"
+            f"{blocklist}"
+            "NFT\n"
+            f'iptables -I FORWARD 1 -i "{self.lan_if}" -o "{self.wan_if}" -j NFQUEUE {target} --queue-bypass\n'
+            f'iptables -I FORWARD 2 -i "{self.wan_if}" -o "{self.lan_if}" -j NFQUEUE {target} --queue-bypass\n'
+        )
+
+    def render(self):
+        """{path relatif: isi} semua file topologi."""
+        files = dict(self.units())
+        files[os.path.basename(self.lua_path)] = self.lua()
+        name, content = self.firewall_rules()
+        files[name] = content
+        return files
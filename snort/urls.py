@@ -5,9 +5,16 @@ app_name = "snort"
 
 urlpatterns = [
     path("logs/", views.logs, name="logs"),
+    path("logs/export/", views.logs_export, name="logs_export"),
     path("rules/", views.rules, name="rules"),
+    path("rules/hits/", views.rule_hits, name="rule_hits"),
+    path("rules/costs/", views.rule_costs, name="rule_costs"),
+    path("stream/", views.alert_stream, name="alert_stream"),
 
     # Tambahan baru
     path("whitelist/", views.ip_whitelist, name="ip_whitelist"),
     path("blocklist/", views.ip_blocklist, name="ip_blocklist"),
+    path("api/ip-check/", views.ip_check, name="ip_check"),
+    path("api/ip-list/<str:kind>/bulk/", views.ip_list_bulk, name="ip_list_bulk"),
+    path("api/ingest/", views.ingest_api, name="ingest_api"),
 ]
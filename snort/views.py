@@ -5,10 +5,28 @@ from django.conf import settings
 from django.utils import timezone
 from django.contrib import messages
 from django.urls import reverse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from django.core.exceptions import RequestDataTooBig
+from django.core.handlers.asgi import ASGIRequest
+from django.db import OperationalError
+from asgiref.sync import sync_to_async
 import json
 import os
 import re
-from datetime import datetime, timezone as dt_timezone
+from datetime import datetime, timedelta
+from itertools import chain, islice
+
+from . import archive, coalesce, export, ipset, ipsync, logfiles, scan, sensors, store, topology
+from .aggregator import aggregator
+from .alerts import decode_lines
+from .filters import compile_filters, extract_params
+from .live import event_stream
+from .reader import LOOKAHEAD_PAGES, paginate_stream
+from .rule_index import rule_index
 
 # --- ROLE CHECKER ---
 
@@ -18,58 +36,17 @@ def is_admin_staff(user):
 
 # --- INTERNAL HELPER FUNCTIONS ---
 
-def _candidate_log_paths():
-    candidates = [
-        getattr(settings, "SNORT_LOG_JSON_PATH", ""),
-        getattr(settings, "SNORT_LOG_PATH", ""),
-        getattr(settings, "SNORT_LOG_FAST_PATH", ""),
-        "/var/log/snort/alert_json.txt",
-        "/var/log/snort/alert_fast.txt",
-    ]
-    seen = set()
-    ordered = []
-    for path in candidates:
-        if path and path not in seen:
-            seen.add(path)
-            ordered.append(path)
-    return ordered
-
-def _iter_existing_files():
-    for candidate in _candidate_log_paths():
-        for path in _resolve_candidate_files(candidate):
-            yield path
-
-def _resolve_candidate_files(candidate):
-    if os.path.isdir(candidate):
-        try:
-            entries = sorted(os.listdir(candidate))
-        except (FileNotFoundError, PermissionError):
-            return []
-        files = [os.path.join(candidate, name) for name in entries if os.path.isfile(os.path.join(candidate, name))]
-        try:
-            files.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-        except OSError:
-            files.sort(reverse=True)
-        return files
-    if os.path.exists(candidate):
-        return [candidate]
-    return []
-
-def _list_all_log_files():
-    files = []
-    seen = set()
-    for candidate in _candidate_log_paths():
-        for path in _resolve_candidate_files(candidate):
-            if path not in seen:
-                seen.add(path)
-                files.append(path)
-    return files
+def _page_number(request):
+    try:
+        return max(1, int(request.GET.get('page', 1)))
+    except (TypeError, ValueError):
+        return 1
 
 def _clear_log_files(target_paths=None):
     cleared = 0
     errors = []
     seen = set()
-    paths = target_paths if target_paths is not None else _list_all_log_files()
+    paths = target_paths if target_paths is not None else logfiles.all_files()
     for path in paths:
         if path in seen: continue
         seen.add(path)
@@ -88,97 +65,90 @@ def _candidate_rule_dirs():
 
 def _list_rule_files():
     files = []
-    seen = set()
-    for directory in _candidate_rule_dirs():
-        if not os.path.isdir(directory): continue
-        try:
-            entries = sorted(os.listdir(directory))
-        except: continue
-        for name in entries:
-            if not name.endswith(".rules"): continue
-            path = os.path.join(directory, name)
-            if path in seen or not os.path.isfile(path): continue
-            seen.add(path)
-            try: stats = os.stat(path)
-            except: stats = None
-            rule_count = None
-            if stats and stats.st_size <= 5 * 1024 * 1024:
-                try:
-                    with open(path, "r", encoding="utf-8", errors="ignore") as h:
-                        rule_count = sum(1 for ln in h if ln.strip() and not ln.lstrip().startswith("#"))
-                except: rule_count = None
-            files.append({
-                "name": name, "path": path, "directory": directory, "size": stats.st_size if stats else None,
-                "modified": datetime.fromtimestamp(stats.st_mtime, timezone.get_current_timezone()) if stats else None,
-                "rule_count": rule_count,
-            })
+    for entry in rule_index.refresh(_candidate_rule_dirs()):
+        files.append({
+            "name": entry.name, "path": entry.path, "directory": entry.directory, "size": entry.size,
+            "modified": datetime.fromtimestamp(entry.mtime, timezone.get_current_timezone()),
+            "rule_count": entry.rule_count,
+        })
     files.sort(key=lambda item: item["name"].lower())
     return files
 
 def _read_rule_file(file_path, search_term=None, max_lines=5000):
     if not file_path: return [], None, False
-    search_lower = search_term.lower() if search_term else None
     rows, error, truncated = [], None, False
     try:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as handle:
-            for idx, raw_line in enumerate(handle, start=1):
-                line = raw_line.rstrip("\n")
-                if search_lower and search_lower not in line.lower(): continue
-                rows.append({"number": idx, "content": line, "is_comment": line.lstrip().startswith("#")})
-                if len(rows) >= max_lines:
-                    truncated = True
-                    break
+        lines, truncated = rule_index.read_lines(file_path, search_term=search_term, max_lines=max_lines)
+        rows = [{"number": idx, "content": line, "is_comment": line.lstrip().startswith("#")} for idx, line in lines]
     except Exception as exc: error = str(exc)
     return rows, error, truncated
 
+def _lookup_rules(query, limit=200):
+    """Cari rule di semua direktori: 'sid', 'gid:sid', 'classtype:nama' atau potongan msg."""
+    query = query.strip()
+    if not query: return []
+    rule_index.refresh(_candidate_rule_dirs())
+    if query.isdigit():
+        rule = rule_index.lookup_sid(int(query))
+        return [rule] if rule else []
+    gid_sid = re.fullmatch(r"(\d+):(\d+)", query)
+    if gid_sid:
+        rule = rule_index.lookup_sid(int(gid_sid.group(2)), gid=int(gid_sid.group(1)))
+        return [rule] if rule else []
+    if query.lower().startswith("classtype:"):
+        return rule_index.by_classtype(query.split(":", 1)[1].strip())[:limit]
+    return rule_index.search_msg(query, limit=limit)
+
+def _annotate_alerts(alerts):
+    """(alert, rule pemicu, status IP sumber di whitelist/blocklist) untuk tiap alert."""
+    rule_index.refresh(_candidate_rule_dirs())
+    lists = ipset.current_lists()
+    return [(alert, rule_index.resolve(alert), ipset.classify(alert.src_ip, lists)) for alert in alerts]
+
+def _sid_hit_rows(days):
+    since = timezone.localdate() - timedelta(days=days - 1)
+    if store.is_enabled():
+        start = timezone.make_aware(datetime.combine(since, datetime.min.time()))
+        hits = store.sid_hits(since=start)
+    else:
+        path = next(logfiles.iter_existing_files(), None)
+        hits = aggregator.snapshot(path).top_sids(since) if path else []
+    rule_index.refresh(_candidate_rule_dirs())
+    total = sum(count for _gid, _sid, count, _sig in hits) or 1
+    return [
+        {"gid": gid, "sid": sid, "hits": count, "signature": signature,
+         "share": count * 100.0 / total, "rule": rule_index.lookup_sid(sid, gid=gid)}
+        for gid, sid, count, signature in hits
+    ]
+
 def _extract_filter_params(params):
-    filters = {k: params.get(k, "").strip() for k in ["search", "signature", "src_ip", "dst_ip", "src_port", "dst_port", "protocol", "action", "time_from", "time_to"]}
-    parsed = {"time_from": None, "time_to": None, "src_port": int(filters["src_port"]) if filters["src_port"].isdigit() else None, "dst_port": int(filters["dst_port"]) if filters["dst_port"].isdigit() else None}
-    return filters, parsed
+    filters = extract_params(params)
+    return filters, compile_filters(filters)
 
-def _apply_filters(alerts, filters, parsed):
-    results = []
-    search = filters["search"].lower()
-    for alert in alerts:
-        if filters["action"] and filters["action"] != alert.get("action"): continue
-        if search:
-            haystack = f"{alert.get('timestamp')} {alert.get('signature')} {alert.get('src_ip')} {alert.get('dst_ip')}".lower()
-            if search not in haystack: continue
-        results.append(alert)
-    return results
-
-def _normalize_timestamp(value):
-    if not value: return None, "N/A"
-    try:
-        # Gunakan timezone aware agar tidak error saat sorting
-        dt = timezone.now() 
-        return dt, dt.strftime("%Y-%m-%d %H:%M:%S")
-    except: return None, value
-
-def _parse_json_line(line):
-    try: 
-        raw = json.loads(line)
-        dt, ts_display = _normalize_timestamp(raw.get("timestamp"))
-        return {
-            "timestamp": ts_display, "signature": raw.get("msg", "N/A") or raw.get("message", "N/A"),
-            "src_ip": raw.get("src_ip", "N/A"), "src_port": raw.get("src_port", "N/A"),
-            "dst_ip": raw.get("dest_ip", "N/A"), "dst_port": raw.get("dest_port", "N/A"),
-            "protocol": raw.get("proto", "N/A"), "priority": raw.get("priority", "N/A"),
-            "action": "drop" if "drop" in str(raw.get("action")).lower() else "alert",
-            "sort_key": dt,
-        }
-    except: return None
+def _iter_filtered(alerts, criteria):
+    return criteria.apply(alerts)
 
-def _parse_fast_line(line):
-    if "[**]" not in line: return None
-    try:
-        dt, ts_display = _normalize_timestamp(line.split(" ")[0])
-        return {
-            "timestamp": ts_display, "signature": "Fast Alert", "src_ip": "N/A", "src_port": "N/A",
-            "dst_ip": "N/A", "dst_port": "N/A", "protocol": "N/A", "priority": "N/A",
-            "action": "alert", "sort_key": dt,
-        }
-    except: return None
+def _apply_filters(alerts, criteria):
+    return list(_iter_filtered(alerts, criteria))
+
+def _iter_archived(criteria):
+    # Segmen arsip yang rentang waktu/bloom filter-nya menolak filter dilewati tanpa dekompresi
+    epoch = lambda value: value.timestamp() if value is not None else None
+    archived = archive.iter_archived_alerts(
+        src_ip=criteria.src_ip.single if criteria.src_ip else None,
+        dst_ip=criteria.dst_ip.single if criteria.dst_ip else None,
+        time_from=epoch(criteria.time_from), time_to=epoch(criteria.time_to),
+        decode_batch=scan.prefiltered(decode_lines, criteria.needle),
+    )
+    return _iter_filtered(archived, criteria)
+
+def _iter_log_alerts(source_files, filters, criteria):
+    """Alert cocok terbaru-dulu dari file log (+ arsip bila diminta), tanpa materialisasi."""
+    # Filter didorong ke pembaca: rentang waktu & needle sebelum decode JSON
+    current = scan.iter_merged_reversed(source_files, criteria)
+    if not filters["archive"] or criteria.skips_local:
+        return current
+    return chain(current, _iter_archived(criteria))
 
 # --- VIEW FUNCTIONS ---
 
@@ -190,34 +160,111 @@ def logs(request):
             return redirect('snort:logs')
         if request.POST.get("action") == "clear":
             cleared, errors = _clear_log_files()
+            if store.is_enabled(): store.clear_store()
             if cleared: messages.success(request, f"{cleared} log berhasil dikosongkan.")
         return redirect('snort:logs')
 
-    alerts = []
-    source_files = []
-    try:
-        for path in _iter_existing_files():
-            with open(path, "r") as handle:
-                for ln in handle:
-                    parsed = _parse_json_line(ln) or _parse_fast_line(ln)
-                    if parsed: alerts.append(parsed)
-            if alerts: source_files.append(path); break
-    except: pass
+    filters, criteria = _extract_filter_params(request.GET)
+    # Tampilan digabung (?coalesce=<detik>): alert identik dalam satu jendela menjadi satu baris
+    window = coalesce.window_from(request.GET)
+    view_context = {'coalesce_window': window, 'coalesce_windows': coalesce.window_choices(window)}
+
+    if store.is_enabled():
+        if window is None:
+            paginator = Paginator(store.query_alerts(criteria), 50)
+            page_obj = paginator.get_page(request.GET.get('page'))
+            page_obj.object_list = [store.alert_from_model(a) for a in page_obj.object_list]
+        else:
+            # Baris dibaca berurutan dari indeks hanya sampai halaman yang diminta
+            paginator, page_obj = paginate_stream(
+                lambda: coalesce.coalesce(store.iter_alerts(criteria), window), 50, request.GET.get('page')
+            )
+        params = request.GET.copy()
+        params.pop('page', None)
+        context = {
+            'page_obj': page_obj, 'alert_rows': _annotate_alerts(page_obj), 'total_alerts': paginator.count, 'filters': filters,
+            'active_log_files': [{"name": os.path.basename(p), "path": p} for p in store.active_paths()],
+            'page_query': params.urlencode(), 'filter_errors': criteria.errors, 'parquet_export': export.parquet_available(),
+            'sensor_choices': sensors.names(), 'is_admin': is_admin_staff(request.user), **view_context
+        }
+        return render(request, 'snort/logs.html', context)
 
-    alerts.sort(key=lambda x: x.get("sort_key") or datetime.min.replace(tzinfo=dt_timezone.utc), reverse=True)
-    filters, parsed_filters = _extract_filter_params(request.GET)
-    alerts = _apply_filters(alerts, filters, parsed_filters)
+    source_files = [] if criteria.skips_local else logfiles.scan_files()
+    scan_result = None
+    # Pemindaian paralel dibatasi jumlah alert mentah, tidak cocok untuk tampilan digabung
+    page = _page_number(request)
+    # Halaman sangat dalam tidak dipindai paralel: `limit` alert per worker akan ikut membengkak
+    deep_page = page > getattr(settings, "SNORT_SCAN_MAX_PAGE", scan.MAX_PAGE)
+    if window is None and not deep_page and scan.should_parallelize(source_files, criteria):
+        # Pencarian riwayat penuh: file dibagi per rentang byte ke beberapa proses
+        limit = (page + LOOKAHEAD_PAGES) * 50
+        scan_result = scan.scan(source_files, criteria, limit=limit)
 
-    paginator = Paginator(alerts, 50)
-    page_obj = paginator.get_page(request.GET.get('page'))
+    def all_alerts():
+        if scan_result is None:
+            return _iter_log_alerts(source_files, filters, criteria)
+        if not filters["archive"]:
+            return iter(scan_result.alerts)
+        return chain(scan_result.alerts, _iter_archived(criteria))
+
+    make_iter = all_alerts if window is None else (lambda: coalesce.coalesce(all_alerts(), window))
+    paginator, page_obj = paginate_stream(make_iter, 50, request.GET.get('page'))
+    if scan_result is not None and not filters["archive"]:
+        paginator.count, paginator.count_is_lower_bound = scan_result.matched, False
+    params = request.GET.copy()
+    params.pop('page', None)
 
     context = {
-        'page_obj': page_obj, 'total_alerts': len(alerts), 'filters': filters,
+        'page_obj': page_obj, 'alert_rows': _annotate_alerts(page_obj), 'total_alerts': paginator.count, 'filters': filters,
+        'total_is_lower_bound': paginator.count_is_lower_bound,
         'active_log_files': [{"name": os.path.basename(p), "path": p} for p in source_files],
-        'is_admin': is_admin_staff(request.user)
+        'archive_segments': len(archive.list_segments()) if filters["archive"] else None,
+        'page_query': params.urlencode(), 'filter_errors': criteria.errors, 'parquet_export': export.parquet_available(),
+        # Mode file: tanpa database, hanya alert sensor lokal
+        'sensor_choices': [], 'is_admin': is_admin_staff(request.user), **view_context
     }
     return render(request, 'snort/logs.html', context)
 
+@login_required
+def logs_export(request):
+    """Unduh alert hasil filter halaman logs sebagai CSV, NDJSON atau Parquet (streaming)."""
+    fmt = request.GET.get("format", "csv")
+    if fmt not in export.FORMATS:
+        return JsonResponse({"error": f"Format tidak dikenal: {fmt}"}, status=400)
+    if fmt == "parquet" and not export.parquet_available():
+        return JsonResponse({"error": "Ekspor Parquet membutuhkan paket pyarrow."}, status=400)
+
+    filters, criteria = _extract_filter_params(request.GET)
+    max_rows = getattr(settings, "SNORT_EXPORT_MAX_ROWS", 500000)
+    limit = request.GET.get("limit", "")
+    if limit.isdigit() and int(limit) > 0:
+        max_rows = min(int(limit), max_rows)
+
+    if store.is_enabled():
+        alerts = store.iter_alerts(criteria)
+    else:
+        alerts = _iter_log_alerts([] if criteria.skips_local else logfiles.scan_files(), filters, criteria)
+    window = coalesce.window_from(request.GET)
+    if window is not None:
+        alerts = coalesce.coalesce(alerts, window)
+    stream = export.encode(fmt, islice(alerts, max_rows), coalesced=window is not None)
+
+    content_type, extension = export.FORMATS[fmt]
+    filename = f"snort-alerts-{timezone.localtime().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    content_encoding = None
+    if request.GET.get("compress") == "gzip":
+        # File .gz utuh untuk diunduh
+        stream, content_type, filename = compress_sequence(stream), "application/gzip", filename + ".gz"
+    elif fmt != "parquet" and "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+        stream, content_encoding = compress_sequence(stream), "gzip"
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    if content_encoding:
+        response["Content-Encoding"] = content_encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
 @login_required
 def rules(request):
     search_term = request.GET.get("search", "").strip()
@@ -225,29 +272,245 @@ def rules(request):
     rule_files = _list_rule_files()
     selected_file = next((f for f in rule_files if requested_file in (f["name"], f["path"])), rule_files[0] if rule_files else None)
     rules_preview, read_error, truncated = _read_rule_file(selected_file["path"], search_term=search_term) if selected_file else ([], None, False)
+    lookup = request.GET.get("lookup", "").strip()
+    lookup_results = _lookup_rules(lookup) if lookup else []
 
     context = {
         "rule_files": rule_files, "selected_file": selected_file, "rules_preview": rules_preview,
         "search_term": search_term, "read_error": read_error, "truncated": truncated,
         "total_rule_files": len(rule_files), "total_rules_all": sum(f.get("rule_count") or 0 for f in rule_files),
+        "lookup": lookup, "lookup_results": lookup_results,
         'is_admin': is_admin_staff(request.user)
     }
     return render(request, "snort/rules.html", context)
 
+@login_required
+def rule_hits(request):
+    try:
+        days = min(max(int(request.GET.get("days", 7)), 1), aggregator.retention_days)
+    except ValueError:
+        days = 7
+    rows = _sid_hit_rows(days)
+    paginator = Paginator(rows, 50)
+    page_obj = paginator.get_page(request.GET.get("page"))
+    context = {
+        "page_obj": page_obj, "days": days, "day_options": [1, 3, 7],
+        "total_sids": len(rows), "total_hits": sum(row["hits"] for row in rows),
+        "unresolved": sum(1 for row in rows if row["rule"] is None),
+        'is_admin': is_admin_staff(request.user)
+    }
+    return render(request, "snort/rule_hits.html", context)
+
+RULE_COST_SORTS = {
+    "time": "time_us", "avg": "avg_check_us", "checks": "checks",
+    "matches": "matches", "alerts": "alerts", "timeouts": "timeouts",
+}
+RULE_COST_COLUMNS = [
+    ("checks", "Check"), ("matches", "Match"), ("alerts", "Alert"),
+    ("time", "Total (µs)"), ("avg", "µs/Check"), ("timeouts", "Timeout"),
+]
+
+def _trend_change(values):
+    """Perubahan avg/check (%) snapshot terakhir terhadap snapshot sebelumnya yang memuat rule ini."""
+    present = [value for value in values if value is not None]
+    if len(present) < 2 or not present[-2]:
+        return None
+    return (present[-1] - present[-2]) * 100.0 / present[-2]
+
+@login_required
+def rule_costs(request):
+    from . import rule_profile
+    from .models import RuleProfileSnapshot
+
+    snapshots = list(RuleProfileSnapshot.objects.all()[:50])
+    requested = request.GET.get("snapshot", "")
+    selected = next((s for s in snapshots if str(s.id) == requested), snapshots[0] if snapshots else None)
+    sort = request.GET.get("sort", "time")
+    if sort not in RULE_COST_SORTS:
+        sort = "time"
+    descending = request.GET.get("dir", "desc") != "asc"
+
+    page_obj, rows, unresolved = None, [], 0
+    if selected is not None:
+        field = RULE_COST_SORTS[sort]
+        entries = selected.entries.order_by(f"-{field}" if descending else field, "gid", "sid")
+        page_obj = Paginator(entries, 50).get_page(request.GET.get("page"))
+        # Join dengan file .rules yang sama dengan halaman Rule Library
+        _list_rule_files()
+        unresolved = sum(
+            1 for gid, sid in selected.entries.values_list("gid", "sid").iterator()
+            if rule_index.lookup_sid(sid, gid=gid) is None
+        )
+        keys = [(entry.gid, entry.sid) for entry in page_obj]
+        series = rule_profile.trends(selected, keys)
+        total = selected.total_time_us or 1
+        for entry in page_obj:
+            values = series[(entry.gid, entry.sid)]
+            rows.append({
+                "entry": entry, "rule": rule_index.lookup_sid(entry.sid, gid=entry.gid),
+                "share": entry.time_us * 100.0 / total,
+                "trend": rule_profile.sparkline(values), "change": _trend_change(values),
+            })
+
+    context = {
+        "snapshots": snapshots, "selected": selected, "page_obj": page_obj, "rows": rows,
+        "sort": sort, "dir": "desc" if descending else "asc", "unresolved": unresolved,
+        "columns": [
+            {"key": key, "label": label, "active": key == sort,
+             "next_dir": "asc" if key == sort and descending else "desc"}
+            for key, label in RULE_COST_COLUMNS
+        ],
+        'is_admin': is_admin_staff(request.user)
+    }
+    return render(request, "snort/rule_costs.html", context)
+
+def _ip_list_context(request, kind):
+    ip_list = ipset.get_list(kind)
+    filters = {k: request.GET.get(k, "").strip() for k in ["ip", "note"]}
+    entries = ip_list.entries
+    if filters["ip"]:
+        if ipset.parse_address(filters["ip"]) is not None:
+            # Alamat lengkap: tampilkan entri (IP/CIDR) yang mencakupnya
+            entries = ip_list.covering(filters["ip"])
+        else:
+            entries = [e for e in entries if filters["ip"] in e.ip]
+    if filters["note"]:
+        note = filters["note"].lower()
+        entries = [e for e in entries if note in e.note.lower()]
+    page_obj = Paginator(entries, 50).get_page(request.GET.get("page"))
+    params = request.GET.copy()
+    params.pop("page", None)
+    return {
+        "page_obj": page_obj, "filters": filters, "page_query": params.urlencode(),
+        "total": len(ip_list.entries), "invalid": ip_list.invalid, "ranges": len(ip_list.ipset),
+        'is_admin': is_admin_staff(request.user)
+    }
+
+def _ip_list_post(request, kind):
+    url_name = f"snort:ip_{kind}"
+    if not is_admin_staff(request.user):
+        messages.error(request, f"Akses Ditolak: Anda tidak memiliki izin mengubah {kind}.")
+        return redirect(url_name)
+    action = request.POST.get("action")
+    try:
+        if action == "add":
+            result = ipsync.bulk_update(kind, add=[request.POST.get("new_ip", "")], note=request.POST.get("new_note", "").strip())
+        elif action == "delete":
+            result = ipsync.bulk_update(kind, remove=[request.POST.get("ip", "")])
+        elif action == "clear":
+            result = ipsync.bulk_update(kind, replace=True)
+        else:
+            return redirect(url_name)
+    except (OSError, ValueError) as exc:
+        messages.error(request, f"Gagal menyimpan {kind}: {exc}")
+        return redirect(url_name)
+
+    if result.invalid:
+        messages.error(request, f"Alamat tidak valid: {', '.join(result.invalid[:5])}")
+    elif result.added or result.removed:
+        messages.success(request, f"{kind.capitalize()} diperbarui: +{len(result.added)} / -{len(result.removed)}.")
+    if result.error:
+        messages.warning(request, f"Delta nftables gagal diterapkan: {result.error}")
+    return redirect(url_name)
+
 @login_required
 def ip_whitelist(request):
-    path = getattr(settings, "SNORT_IP_WHITELIST_PATH", "")
-    entries = []
-    if os.path.isfile(path):
-        with open(path, "r") as f:
-            entries = [ln.strip() for ln in f if ln.strip() and not ln.lstrip().startswith("#")]
-    return render(request, "snort/whitelist.html", {"entries": entries, "total": len(entries), 'is_admin': is_admin_staff(request.user)})
+    if request.method == "POST":
+        return _ip_list_post(request, "whitelist")
+    return render(request, "snort/whitelist.html", _ip_list_context(request, "whitelist"))
 
 @login_required
 def ip_blocklist(request):
-    path = getattr(settings, "SNORT_IP_BLOCKLIST_PATH", "")
-    entries = []
-    if os.path.isfile(path):
-        with open(path, "r") as f:
-            entries = [ln.strip() for ln in f if ln.strip() and not ln.lstrip().startswith("#")]
-    return render(request, "snort/blocklist.html", {"entries": entries, "total": len(entries), 'is_admin': is_admin_staff(request.user)})
\ No newline at end of file
+    if request.method == "POST":
+        return _ip_list_post(request, "blocklist")
+    return render(request, "snort/blocklist.html", _ip_list_context(request, "blocklist"))
+
+@login_required
+@require_POST
+def ip_list_bulk(request, kind):
+    """Update massal: body JSON {"add": [...], "remove": [...], "replace": bool, "note": ""} atau teks per baris."""
+    if kind not in ipset.LIST_SETTINGS:
+        raise Http404
+    if not is_admin_staff(request.user):
+        return JsonResponse({"error": "Akses ditolak."}, status=403)
+
+    if request.content_type == "application/json":
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"error": "Body JSON tidak valid."}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({"error": "Body JSON harus berupa object."}, status=400)
+    else:
+        payload = {"add": request.body.decode("utf-8", errors="ignore").splitlines()}
+
+    add, remove = payload.get("add") or [], payload.get("remove") or []
+    if not isinstance(add, list) or not isinstance(remove, list):
+        return JsonResponse({"error": "'add' dan 'remove' harus berupa list."}, status=400)
+    try:
+        result = ipsync.bulk_update(
+            kind, add=add, remove=remove, replace=bool(payload.get("replace")), note=str(payload.get("note", "")),
+        )
+    except (OSError, ValueError) as exc:
+        return JsonResponse({"error": str(exc)}, status=500)
+    return JsonResponse(result.as_dict(), status=200 if not result.error else 502)
+
+@login_required
+def ip_check(request):
+    """Cek keanggotaan IP di whitelist/blocklist: ?ip=1.2.3.4 (boleh diulang)."""
+    addresses = request.GET.getlist("ip")
+    if not addresses:
+        return JsonResponse({"error": "Parameter 'ip' wajib diisi."}, status=400)
+    lists = ipset.current_lists()
+    results = []
+    for address in addresses[:1000]:
+        if ipset.parse_address(address) is None:
+            results.append({"ip": address, "error": "Alamat IP tidak valid."})
+            continue
+        result = {"ip": address, "status": ipset.classify(address, lists)}
+        for kind, ip_list in lists.items():
+            result[kind] = [entry.ip for entry in ip_list.covering(address)]
+        results.append(result)
+    return JsonResponse({"results": results})
+
+@csrf_exempt
+@require_POST
+def ingest_api(request):
+    """Terima batch alert dari agent sensor (Authorization: Bearer <token>, NDJSON gzip)."""
+    if not store.is_enabled():
+        return JsonResponse({"error": "Penyimpanan alert (SNORT_ALERT_STORE) tidak aktif."}, status=503)
+    sensor = sensors.authenticate(request)
+    if sensor is None:
+        return JsonResponse({"error": "Token sensor tidak valid."}, status=401)
+    batch = request.META.get("HTTP_X_BATCH_SEQ", "")
+    try:
+        lines = sensors.read_lines(request)
+        inserted, duplicate = sensors.ingest(
+            sensor, lines, source=request.META.get("HTTP_X_SOURCE_FILE", ""),
+            agent_id=request.META.get("HTTP_X_AGENT_ID", ""), batch=int(batch) if batch.isdigit() else None,
+            address=request.META.get("REMOTE_ADDR", ""),
+        )
+    except RequestDataTooBig:
+        return JsonResponse({"error": "Batch terlalu besar."}, status=413)
+    except sensors.IngestError as exc:
+        return JsonResponse({"error": str(exc)}, status=exc.status)
+    except OperationalError:
+        # Database sibuk (mis. SQLite terkunci): agent menyimpan batch di spool dan mencoba lagi
+        response = JsonResponse({"error": "Database sibuk, coba lagi."}, status=503)
+        response["Retry-After"] = "5"
+        return response
+    return JsonResponse({"sensor": sensor.name, "accepted": inserted, "duplicate": duplicate})
+
+async def alert_stream(request):
+    """Server-Sent Events berisi alert baru + delta grafik (butuh server ASGI)."""
+    is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not is_authenticated:
+        return JsonResponse({"error": "Login diperlukan."}, status=401)
+    if not isinstance(request, ASGIRequest):
+        # Di bawah WSGI stream tak berujung akan menahan worker; klien kembali ke polling
+        return JsonResponse({"error": "Stream live hanya tersedia lewat ASGI (core.asgi)."}, status=503)
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -137,9 +137,14 @@ document.addEventListener('DOMContentLoaded', function () {
     /* ===============================
        UPDATE DASHBOARD
     =============================== */
+    // Pilihan sensor (multi-sensor, hanya tampil bila ada sensor terdaftar)
+    const sensorSelect = document.getElementById('dashboardSensor');
+
     async function updateDashboard() {
         try {
-            const res = await fetch(window.dashboardApiUrl);
+            const sensor = sensorSelect ? sensorSelect.value : '';
+            const url = sensor ? `${window.dashboardApiUrl}?${new URLSearchParams({ sensor })}` : window.dashboardApiUrl;
+            const res = await fetch(url);
             const data = await res.json();
 
             document.getElementById('threats-count').textContent = data.total_alerts || 0;
@@ -182,6 +187,53 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
+    /* ===============================
+       LIVE STREAM (SSE) — delta grafik
+    =============================== */
+    function applyDelta(chart, buckets) {
+        if (!chart || !buckets) return;
+        ["alert", "drop"].forEach((action, datasetIndex) => {
+            Object.entries(buckets[action] || {}).forEach(([label, count]) => {
+                const idx = chart.data.labels.indexOf(label);
+                if (idx >= 0) chart.data.datasets[datasetIndex].data[idx] += count;
+            });
+        });
+        chart.update('none');
+    }
+
+    let pollTimer = null;
+
+    function schedulePolling(intervalMs) {
+        if (pollTimer) clearInterval(pollTimer);
+        pollTimer = setInterval(updateDashboard, intervalMs);
+    }
+
+    function connectLiveStream() {
+        if (!window.alertStreamUrl || !window.EventSource) return;
+
+        const source = new EventSource(window.alertStreamUrl);
+
+        // Saat stream aktif, polling penuh cukup sesekali untuk sinkronisasi ulang
+        source.addEventListener('open', () => schedulePolling(30000));
+
+        source.addEventListener('delta', (event) => {
+            // Delta stream hanya untuk log lokal; sensor lain diperbarui lewat polling
+            if (sensorSelect && sensorSelect.selectedIndex > 0) return;
+            const delta = JSON.parse(event.data);
+            const counter = document.getElementById('threats-count');
+            counter.textContent = (parseInt(counter.textContent, 10) || 0) + delta.total;
+            applyDelta(hourlyChart, delta.hour);
+            applyDelta(weeklyChart, delta.weekday);
+        });
+
+        source.addEventListener('error', () => {
+            // Server WSGI menjawab 503: tutup dan kembali ke polling biasa
+            if (source.readyState === EventSource.CLOSED) schedulePolling(5000);
+        });
+    }
+
+    if (sensorSelect) sensorSelect.addEventListener('change', updateDashboard);
     updateDashboard();
-    setInterval(updateDashboard, 5000);
+    schedulePolling(5000);
+    connectLiveStream();
 });
@@ -0,0 +1,88 @@
+document.addEventListener('DOMContentLoaded', function () {
+
+    if (!window.alertStreamUrl || !window.EventSource) return;
+
+    const tbody = document.querySelector('.ids-table tbody');
+    const counter = document.querySelector('.ids-counter strong');
+    const banner = document.getElementById('ids-live-banner');
+    const perPage = 50;
+
+    // Baris hanya disisipkan langsung di halaman pertama tanpa filter
+    const params = new URLSearchParams(window.location.search);
+    params.delete('page');
+    const isLiveView = !params.toString() && !/[?&]page=(?!1\b)/.test(window.location.search);
+
+    let pending = 0;
+
+    function cell(text, className) {
+        const td = document.createElement('td');
+        if (className) td.className = className;
+        td.textContent = (text === null || text === undefined || text === 'N/A') ? '—' : text;
+        return td;
+    }
+
+    function buildRow(alert) {
+        const tr = document.createElement('tr');
+        const ts = alert.timestamp || '';
+        tr.appendChild(cell(ts.slice(0, 10)));
+        tr.appendChild(cell(ts.slice(11, 19)));
+
+        const status = document.createElement('td');
+        status.className = 'ids-status';
+        const pill = document.createElement('span');
+        const isDrop = (alert.action || '').toLowerCase() === 'drop';
+        pill.className = 'status-pill ' + (isDrop ? 'status-pill--drop' : 'status-pill--alert');
+        pill.textContent = isDrop ? 'drop' : 'alert';
+        status.appendChild(pill);
+        tr.appendChild(status);
+
+        const rule = document.createElement('td');
+        rule.className = 'ids-rule';
+        const name = document.createElement('div');
+        name.className = 'ids-rule__name';
+        name.textContent = alert.signature || '-';
+        rule.appendChild(name);
+        tr.appendChild(rule);
+
+        ['src_ip', 'src_port', 'dst_ip', 'dst_port', 'protocol', 'priority'].forEach(
+            (key) => tr.appendChild(cell(alert[key]))
+        );
+        return tr;
+    }
+
+    const source = new EventSource(window.alertStreamUrl);
+
+    source.addEventListener('alerts', (event) => {
+        const alerts = JSON.parse(event.data);
+        if (!alerts.length) return;
+
+        if (isLiveView && tbody) {
+            const emptyRow = tbody.querySelector('.ids-table-empty-row');
+            if (emptyRow) emptyRow.remove();
+            // alerts sudah berurutan terbaru-dulu
+            for (let i = alerts.length - 1; i >= 0; i--) {
+                tbody.insertBefore(buildRow(alerts[i]), tbody.firstChild);
+            }
+            while (tbody.rows.length > perPage) tbody.deleteRow(-1);
+        }
+    });
+
+    // Event 'alerts' dibatasi MAX_ALERTS_PER_EVENT baris; jumlah sebenarnya ada di delta.total
+    source.addEventListener('delta', (event) => {
+        const total = JSON.parse(event.data).total || 0;
+        if (!total) return;
+
+        if (counter) {
+            counter.textContent = (parseInt(counter.textContent, 10) || 0) + total;
+        }
+        if (!(isLiveView && tbody) && banner) {
+            pending += total;
+            banner.querySelector('[data-live-count]').textContent = pending;
+            banner.hidden = false;
+        }
+    });
+
+    source.addEventListener('error', () => {
+        if (source.readyState === EventSource.CLOSED && banner) banner.hidden = true;
+    });
+});
@@ -0,0 +1,97 @@
+document.addEventListener('DOMContentLoaded', function () {
+
+    /* ===============================
+       DATA-PLANE SNORT — perf_monitor
+    =============================== */
+    const canvas = document.getElementById('perfChart');
+    const rangeSelect = document.getElementById('perfRange');
+    if (!canvas || !window.perfUrl) return;
+
+    let perfChart = null;
+
+    function formatLabel(iso, range) {
+        const d = new Date(iso);
+        const pad = (n) => String(n).padStart(2, '0');
+        const time = `${pad(d.getHours())}.${pad(d.getMinutes())}`;
+        return range === 'live' || range === '24h' ? time : `${pad(d.getDate())}/${pad(d.getMonth() + 1)} ${time}`;
+    }
+
+    function setStat(id, text) {
+        const el = document.getElementById(id);
+        if (el) el.textContent = text;
+    }
+
+    function renderStats(latest) {
+        if (!latest) {
+            ["perf-pps", "perf-drops", "perf-latency", "perf-cpu"].forEach((id) => setStat(id, "-"));
+            return;
+        }
+        const cpu = Object.values(latest.cpu_percent);
+        setStat("perf-pps", Math.round(latest.packets_per_second).toLocaleString());
+        setStat("perf-drops", `${latest.daq_drops.toLocaleString()} (${latest.daq_drop_percent}%)`);
+        setStat("perf-latency", latest.latency_avg_usecs === null ? "-" : `${latest.latency_avg_usecs} µs`);
+        setStat("perf-cpu", cpu.length ? `${Math.max(...cpu)}%` : "-");
+    }
+
+    async function loadPerf() {
+        const range = rangeSelect ? rangeSelect.value : 'live';
+        try {
+            const res = await fetch(`${window.perfUrl}?${new URLSearchParams({ range })}`);
+            const data = await res.json();
+            if (!res.ok) throw new Error(data.error);
+            renderStats(data.latest);
+
+            const labels = data.points.map((p) => formatLabel(p.timestamp, range));
+            const datasets = [
+                {
+                    label: "Paket/detik",
+                    data: data.points.map((p) => p.packets_per_second),
+                    borderColor: "rgba(59, 130, 246, 1)",
+                    backgroundColor: "rgba(59, 130, 246, 1)",
+                    yAxisID: 'y'
+                },
+                {
+                    label: "DAQ drop %",
+                    data: data.points.map((p) => p.daq_drop_percent),
+                    borderColor: "rgba(255, 0, 0, 1)",
+                    backgroundColor: "rgba(255, 0, 0, 1)",
+                    yAxisID: 'y1'
+                },
+                {
+                    label: "Latensi (µs)",
+                    data: data.points.map((p) => p.latency_avg_usecs),
+                    borderColor: "rgba(234, 179, 8, 1)",
+                    backgroundColor: "rgba(234, 179, 8, 1)",
+                    yAxisID: 'y2'
+                }
+            ].map((dataset) => Object.assign(dataset, { borderWidth: 1.5, pointRadius: 0, tension: 0.25 }));
+
+            if (perfChart) perfChart.destroy();
+            perfChart = new Chart(canvas.getContext('2d'), {
+                type: 'line',
+                data: { labels, datasets },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    animation: false,
+                    interaction: { mode: 'index', intersect: false },
+                    plugins: {
+                        legend: { labels: { color: "#e5e7eb", font: { size: 11 }, boxWidth: 12 } }
+                    },
+                    scales: {
+                        x: { ticks: { color: "#9ca3af", font: { size: 10 }, maxTicksLimit: 12 }, grid: { display: false } },
+                        y: { beginAtZero: true, ticks: { color: "#9ca3af", font: { size: 10 } }, grid: { color: "rgba(255,255,255,0.04)" } },
+                        y1: { beginAtZero: true, position: 'right', ticks: { color: "#f87171", font: { size: 10 } }, grid: { display: false } },
+                        y2: { beginAtZero: true, position: 'right', ticks: { color: "#facc15", font: { size: 10 } }, grid: { display: false } }
+                    }
+                }
+            });
+        } catch (err) {
+            console.error("Perf API error:", err);
+        }
+    }
+
+    if (rangeSelect) rangeSelect.addEventListener('change', loadPerf);
+    loadPerf();
+    setInterval(loadPerf, 30000);
+});
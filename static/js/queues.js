@@ -0,0 +1,49 @@
+document.addEventListener('DOMContentLoaded', function () {
+
+    /* ===============================
+       ANTRIAN NFQUEUE — hitungan per instance Snort
+    =============================== */
+    const panel = document.getElementById('queue-panel');
+    const tbody = document.getElementById('queue-rows');
+    if (!panel || !tbody || !window.queuesUrl) return;
+
+    function cell(text) {
+        const td = document.createElement('td');
+        td.textContent = text;
+        return td;
+    }
+
+    function render(queues) {
+        // Topologi satu queue: panel disembunyikan
+        panel.hidden = queues.length === 0;
+        tbody.innerHTML = '';
+        queues.forEach((q) => {
+            const perf = q.perf;
+            const tr = document.createElement('tr');
+            [
+                q.queue,
+                q.total_alerts.toLocaleString(),
+                q.today.alert.toLocaleString(),
+                q.today.drop.toLocaleString(),
+                perf ? Math.round(perf.packets_per_second).toLocaleString() : '-',
+                perf ? `${perf.daq_drops.toLocaleString()} (${perf.daq_drop_percent}%)` : '-',
+                perf && perf.latency_avg_usecs !== null ? `${perf.latency_avg_usecs} µs` : '-'
+            ].forEach((text) => tr.appendChild(cell(text)));
+            tbody.appendChild(tr);
+        });
+    }
+
+    async function loadQueues() {
+        try {
+            const res = await fetch(window.queuesUrl);
+            if (!res.ok) return;
+            const data = await res.json();
+            render(data.queues);
+        } catch (err) {
+            console.error("Gagal memuat data queue:", err);
+        }
+    }
+
+    loadQueues();
+    setInterval(loadQueues, 30000);
+});
@@ -0,0 +1,51 @@
+document.addEventListener('DOMContentLoaded', function () {
+
+    /* ===============================
+       TOP TALKER — heavy hitters per jendela waktu
+    =============================== */
+    const windowSelect = document.getElementById('topWindow');
+    if (!windowSelect || !window.topTalkersUrl) return;
+
+    const dimensions = ["src_ip", "dst_ip", "dst_port", "signature"];
+
+    function render(list, data) {
+        list.replaceChildren();
+        if (!data || !data.items.length) {
+            const empty = document.createElement('li');
+            empty.textContent = "Belum ada data";
+            list.appendChild(empty);
+            return;
+        }
+        data.items.forEach((item) => {
+            const li = document.createElement('li');
+            const value = document.createElement('span');
+            const count = document.createElement('span');
+            value.textContent = item.value;
+            value.title = item.value;
+            // Space-Saving: hitungan bisa lebih besar dari sebenarnya paling banyak `error`
+            count.textContent = item.error ? `~${item.count.toLocaleString()}` : item.count.toLocaleString();
+            if (item.error) count.title = `± ${item.error.toLocaleString()}`;
+            li.append(value, count);
+            list.appendChild(li);
+        });
+    }
+
+    async function loadTopTalkers() {
+        const params = new URLSearchParams({ window: windowSelect.value, limit: 10 });
+        try {
+            const res = await fetch(`${window.topTalkersUrl}?${params}`);
+            const data = await res.json();
+            if (!res.ok) throw new Error(data.error);
+            dimensions.forEach((name) => {
+                const list = document.getElementById(`top-${name}`);
+                if (list) render(list, data.dimensions[name]);
+            });
+        } catch (err) {
+            console.error("Top talkers API error:", err);
+        }
+    }
+
+    windowSelect.addEventListener('change', loadTopTalkers);
+    loadTopTalkers();
+    setInterval(loadTopTalkers, 30000);
+});
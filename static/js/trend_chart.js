@@ -0,0 +1,67 @@
+document.addEventListener('DOMContentLoaded', function () {
+
+    /* ===============================
+       TREN ALERT — dari tabel rollup
+    =============================== */
+    const canvas = document.getElementById('trendChart');
+    const rangeSelect = document.getElementById('trendRange');
+    if (!canvas || !window.alertSeriesUrl) return;
+
+    const colors = {
+        alert: "rgba(255, 102, 0, 1)",
+        drop: "rgba(255, 0, 0, 1)"
+    };
+    let trendChart = null;
+
+    function formatLabel(iso, bucket) {
+        const d = new Date(iso);
+        const pad = (n) => String(n).padStart(2, '0');
+        const date = `${pad(d.getDate())}/${pad(d.getMonth() + 1)}`;
+        if (bucket === 'day' || bucket === 'week') return date;
+        return `${date} ${pad(d.getHours())}.${pad(d.getMinutes())}`;
+    }
+
+    async function loadTrend() {
+        const params = new URLSearchParams({ range: rangeSelect ? rangeSelect.value : '24h' });
+        try {
+            const res = await fetch(`${window.alertSeriesUrl}?${params}`);
+            const data = await res.json();
+            if (!res.ok) throw new Error(data.error);
+
+            const labels = data.labels.map((iso) => formatLabel(iso, data.bucket));
+            const datasets = ["alert", "drop"].map((action) => ({
+                label: action === "alert" ? "Alert" : "Drop",
+                data: data.series[action] || labels.map(() => 0),
+                borderColor: colors[action],
+                backgroundColor: colors[action],
+                borderWidth: 1.5,
+                pointRadius: 0,
+                tension: 0.25
+            }));
+
+            if (trendChart) trendChart.destroy();
+            trendChart = new Chart(canvas.getContext('2d'), {
+                type: 'line',
+                data: { labels, datasets },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    interaction: { mode: 'index', intersect: false },
+                    plugins: {
+                        legend: { labels: { color: "#e5e7eb", font: { size: 11 }, boxWidth: 12 } }
+                    },
+                    scales: {
+                        x: { ticks: { color: "#9ca3af", font: { size: 10 }, maxTicksLimit: 12 }, grid: { display: false } },
+                        y: { beginAtZero: true, ticks: { color: "#9ca3af", font: { size: 10 } }, grid: { color: "rgba(255,255,255,0.04)" } }
+                    }
+                }
+            });
+        } catch (err) {
+            console.error("Alert series API error:", err);
+        }
+    }
+
+    if (rangeSelect) rangeSelect.addEventListener('change', loadTrend);
+    loadTrend();
+    setInterval(loadTrend, 60000);
+});